@@ -4,7 +4,6 @@ from fastapi import Depends
 from ..repositories.admin_sqlalchemy import AdminRepository
 from ..repositories.subscription_sqlalchemy import SubscriptionRepository
 from ..repositories.vehicle_sqlalchemy import VehicleRepository
-from ..services.gate import GateService
 from ..services.subscriptions import SubscriptionService
 from ..services.vehicles import VehicleService
 from ..repositories.driver_sqlalchemy import DriverRepository
@@ -16,6 +15,8 @@ from ..repositories.session_sqlalchemy import ParkingSessionRepository
 from ..services.sessions import ParkingSessionService
 from ..repositories.payment_sqlalchemy import PaymentRepository
 from ..services.payments import PaymentService
+from ..repositories.gate_sqlalchemy import GateRepository
+from ..services.gates import GateRegistryService
 
 from ..db.database import get_db, SessionLocal
 
@@ -47,6 +48,6 @@ def get_payment_service(db: Session = Depends(get_db)) -> PaymentService:
     repo = PaymentRepository(db)
     return PaymentService(repo)
 
-def get_gate_service(db: Session = Depends(get_db)) -> GateService:
-    return GateService(db)
-
+def get_gate_registry_service(db: Session = Depends(get_db)) -> GateRegistryService:
+    repo = GateRepository(db)
+    return GateRegistryService(repo)
@@ -0,0 +1,69 @@
+# backend/app/src/api/pagination.py
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional
+
+from fastapi import HTTPException, Query, Response
+
+from ..repositories.pagination import Page
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class CountMode(str, Enum):
+    exact = "exact"
+    approximate = "approximate"  # planner estimate on PostgreSQL, exact elsewhere
+    none = "none"
+
+
+def encode_cursor(last_id: int) -> str:
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        last_id = json.loads(raw)["id"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="invalid_cursor")
+    if not isinstance(last_id, int):
+        raise HTTPException(status_code=400, detail="invalid_cursor")
+    return last_id
+
+
+@dataclass
+class PageParams:
+    after_id: Optional[int]
+    limit: Optional[int]
+    count: CountMode
+
+    @property
+    def requested(self) -> bool:
+        """False for a plain request: the endpoint keeps returning the whole list."""
+        return self.after_id is not None or self.limit is not None or self.count != CountMode.none
+
+
+def page_params(
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous X-Next-Cursor header"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; enables cursor pagination"),
+    count: CountMode = Query(CountMode.none, description="X-Total-Count: exact | approximate | none"),
+) -> PageParams:
+    after_id = decode_cursor(cursor) if cursor else None
+    if after_id is not None and limit is None:
+        limit = DEFAULT_PAGE_SIZE
+    return PageParams(after_id=after_id, limit=limit, count=count)
+
+
+def set_page_headers(response: Response, page: Page) -> None:
+    """List endpoints keep a plain JSON array body; paging metadata travels in headers."""
+    if page.last_id is not None:
+        response.headers["X-Next-Cursor"] = encode_cursor(page.last_id)
+    if page.total is not None:
+        response.headers["X-Total-Count"] = str(page.total)
+        if page.total_is_estimate:
+            response.headers["X-Total-Count-Estimated"] = "true"
@@ -1,6 +1,7 @@
 from fastapi import APIRouter
 from . import auth, admins, drivers, payments, plans, sessions, subscriptions, vehicles, receipts
 from . import scans  # <- make sure this exists
+from . import gates
 
 api_router = APIRouter(prefix="/api")
 api_router.include_router(admins.router)
@@ -11,5 +12,6 @@ api_router.include_router(sessions.router)
 api_router.include_router(subscriptions.router)
 api_router.include_router(vehicles.router)
 api_router.include_router(scans.router)  # <- include scans
+api_router.include_router(gates.router)
 api_router.include_router(auth.router)
 api_router.include_router(receipts.router)
\ No newline at end of file
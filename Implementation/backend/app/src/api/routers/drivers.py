@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from ...schemas.driver import DriverCreate, DriverRead
 from ...services.drivers import DriverService
 from ..deps import get_driver_service
+from ..pagination import PageParams, page_params, set_page_headers
 
 router = APIRouter(prefix="/drivers", tags=["drivers"])
 
@@ -20,5 +21,13 @@ def get_driver(driver_id: int, svc: DriverService = Depends(get_driver_service))
     return d
 
 @router.get("", response_model=list[DriverRead])
-def list_drivers(svc: DriverService = Depends(get_driver_service)):
-    return svc.list()
+def list_drivers(
+    response: Response,
+    paging: PageParams = Depends(page_params),
+    svc: DriverService = Depends(get_driver_service),
+):
+    if not paging.requested:
+        return svc.list()
+    page = svc.page(after_id=paging.after_id, limit=paging.limit, count=paging.count.value)
+    set_page_headers(response, page)
+    return page.items
@@ -0,0 +1,42 @@
+# backend/app/src/api/routers/gates.py
+from fastapi import APIRouter, Depends
+
+from ..deps import get_gate_registry_service
+from ...core.security import get_current_admin
+from ...schemas.gate import GateCreate, GateRead, GateUpdate
+from ...services.gates import GateRegistryService
+
+router = APIRouter(prefix="/gates", tags=["gates"], dependencies=[Depends(get_current_admin)])
+
+@router.post("", response_model=GateRead, status_code=201)
+def create_gate(
+    payload: GateCreate,
+    svc: GateRegistryService = Depends(get_gate_registry_service),
+):
+    return svc.create(payload)
+
+@router.get("", response_model=list[GateRead])
+def list_gates(svc: GateRegistryService = Depends(get_gate_registry_service)):
+    return svc.list()
+
+@router.get("/{id_}", response_model=GateRead)
+def get_gate(
+    id_: int,
+    svc: GateRegistryService = Depends(get_gate_registry_service),
+):
+    return svc.get(id_)
+
+@router.patch("/{id_}", response_model=GateRead)
+def update_gate(
+    id_: int,
+    payload: GateUpdate,
+    svc: GateRegistryService = Depends(get_gate_registry_service),
+):
+    return svc.update(id_, payload)
+
+@router.delete("/{id_}", status_code=204)
+def delete_gate(
+    id_: int,
+    svc: GateRegistryService = Depends(get_gate_registry_service),
+):
+    svc.delete(id_)
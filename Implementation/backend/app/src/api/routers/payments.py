@@ -1,16 +1,20 @@
 from typing import Optional
-from fastapi import APIRouter, Depends, Query, HTTPException, Request
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
 import stripe
 
 from ..deps import get_payment_service, get_db
+from ..pagination import PageParams, page_params, set_page_headers
 from ...core.settings import settings
 from ...models import Vehicle
 from ...repositories.payment_sqlalchemy import PaymentRepository
+from ...repositories.gate_sqlalchemy import GateRepository
 from ...repositories.session_sqlalchemy import ParkingSessionRepository
 from ...services.payments import PaymentService
 from ...schemas.payment import PaymentCreate, PaymentRead, PaymentUpdateStatus, PaymentStatus
 from ...models.subscription import Subscription
 from ...services.gate import _barrier_pulse_open  # <--- barrier helper
+from ...services.subscription_index import subscription_index
+from ...repositories.subscription_sqlalchemy import SubscriptionRepository
 
 
 # Stripe currency minimums
@@ -44,12 +48,21 @@ def get_payment(
 
 @router.get("", response_model=list[PaymentRead])
 def list_payments(
+    response: Response,
     session_id: Optional[int] = Query(default=None),
     subscription_id: Optional[int] = Query(default=None),
     status: Optional[PaymentStatus] = Query(default=None),
+    paging: PageParams = Depends(page_params),
     svc: PaymentService = Depends(get_payment_service),
 ):
-    return svc.list(session_id=session_id, subscription_id=subscription_id, status=status)
+    if not paging.requested:
+        return svc.list(session_id=session_id, subscription_id=subscription_id, status=status)
+    page = svc.page(
+        session_id=session_id, subscription_id=subscription_id, status=status,
+        after_id=paging.after_id, limit=paging.limit, count=paging.count.value,
+    )
+    set_page_headers(response, page)
+    return page.items
 
 
 @router.post("/{payment_id}/status", response_model=PaymentRead)
@@ -222,8 +235,8 @@ async def stripe_webhook(request: Request, db=Depends(get_db)):
                         s.status = "closed" if s.ended_at else "paid"
                         sessions.db.commit()
 
-                        # Open barrier on successful visitor payment
-                        _barrier_pulse_open(seconds=5)
+                        # Open barrier on successful visitor payment (the lane they exited at)
+                        _barrier_pulse_open(gate_id=s.exit_gate_id, gates=GateRepository(sessions.db))
 
         return {"ok": True}
 
@@ -249,7 +262,7 @@ async def stripe_webhook(request: Request, db=Depends(get_db)):
                     sessions.db.commit()
 
                     # Open barrier on successful PaymentIntent for session
-                    _barrier_pulse_open(seconds=5)
+                    _barrier_pulse_open(gate_id=s.exit_gate_id, gates=GateRepository(sessions.db))
 
         return {"ok": True}
 
@@ -270,6 +283,7 @@ async def stripe_webhook(request: Request, db=Depends(get_db)):
                     veh.is_blacklisted = False
                 db.commit()
                 db.refresh(sub)
+                subscription_index.refresh_vehicle(SubscriptionRepository(db), sub.vehicle_id)
 
         return {"ok": True}
 
@@ -295,6 +309,7 @@ async def stripe_webhook(request: Request, db=Depends(get_db)):
                 sub.status = "canceled"
             db.commit()
             db.refresh(sub)
+            subscription_index.refresh_vehicle(SubscriptionRepository(db), sub.vehicle_id)
 
         return {"ok": True}
 
@@ -341,6 +356,6 @@ def confirm_checkout(cs: str, db = Depends(get_db)):
                 sess_repo.db.commit()
 
                 # Open barrier on manual confirm success
-                _barrier_pulse_open(seconds=5)
+                _barrier_pulse_open(gate_id=s.exit_gate_id, gates=GateRepository(sess_repo.db))
 
     return {"ok": True, "session_id": p.session_id}
@@ -1,9 +1,10 @@
 from typing import Optional
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.orm import Session
 
 from ..deps import get_plan_service
 from ...schemas.plan import PlanCreate, PlanRead, PlanUpdate, PlanType
+from ...services.plan_catalog import plan_catalog
 from ...services.plans import PlanService
 
 router = APIRouter(prefix="/plans", tags=["plans"])
@@ -24,10 +25,13 @@ def get_plan(
 
 @router.get("", response_model=list[PlanRead])
 def list_plans(
+    response: Response,
     type: Optional[PlanType] = Query(default=None, description="Filter by type (subscription | visitor)"),
     svc: PlanService = Depends(get_plan_service),
 ):
-    return svc.list(type_=type)
+    plans = svc.list(type_=type)
+    response.headers["X-Plan-Catalog-Version"] = str(plan_catalog.version)
+    return plans
 
 @router.patch("/{plan_id}", response_model=PlanRead)
 def update_plan(
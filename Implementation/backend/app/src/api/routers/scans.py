@@ -1,36 +1,149 @@
 # backend/app/src/api/routers/scans.py
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from ..deps import get_db
-from ...schemas.scan import EntryScanRequest, EntryScanResponse,  ExitScanRequest, ExitScanResponse
-from ...services.gate import GateService
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from ...db.database import get_async_db
+from ...core.security import get_current_admin
+from ...schemas.scan import (
+    BatchScanRequest,
+    BatchScanResponse,
+    EntryScanRequest,
+    EntryScanResponse,
+    ExitScanRequest,
+    ExitScanResponse,
+)
+from ...services.access_cache import plate_access_cache
+from ...services.barrier import barrier_dispatcher
+from ...services.gate_async import AsyncGateService
+from ...services.gate_registry import gate_registry
+from ...services.plan_catalog import plan_catalog
+from ...services.subscription_index import subscription_index
+from ...services.scan_idempotency import CachedDecision, scan_idempotency
 
 router = APIRouter(prefix="/scans", tags=["scans"])
 
+def _replay(response: Response, cached: CachedDecision, model):
+    # duplicate scan: answer with the first decision, don't touch the DB or the barrier
+    headers = {"Idempotent-Replayed": "true"}
+    if cached.status_code >= 400:
+        raise HTTPException(status_code=cached.status_code, detail=cached.body.get("detail"), headers=headers)
+    response.headers.update(headers)
+    return model(**cached.body)
+
+
 @router.post("/entry", response_model=EntryScanResponse, status_code=status.HTTP_201_CREATED)
-def entry_scan(payload: EntryScanRequest, db: Session = Depends(get_db)):
-    svc = GateService(db)
+async def entry_scan(
+    payload: EntryScanRequest,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
+):
+    plate = {"region_code": payload.region_code, "plate_text": payload.plate_text}
+    key = scan_idempotency.key_for("entry", gate_id=payload.gate_id, idempotency_key=idempotency_key, **plate)
+    cached = await scan_idempotency.lookup(db, key)
+    if cached is not None:
+        return _replay(response, cached, EntryScanResponse)
+
+    svc = AsyncGateService(db)
     try:
-        result = svc.handle_entry_scan(
+        result = await svc.handle_entry_scan(
             region_code=payload.region_code,
             plate_text=payload.plate_text,
             gate_id=payload.gate_id,
             source=payload.source,
+            captured_at=payload.captured_at,
         )
     except HTTPException as e:
         # AC: clear, helpful, consistent
-        if e.status_code == 403:
-            raise HTTPException(status_code=403, detail=e.detail)  # "blacklisted" | "not_allowed"
+        if e.status_code in (403, 422):
+            # "blacklisted" | "not_allowed" | "captured_at_in_future" | "captured_at_too_old"
+            if e.status_code == 403:
+                await scan_idempotency.record(
+                    db, key, direction="entry", status_code=403, body={"detail": e.detail}, **plate
+                )
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
         raise HTTPException(status_code=400, detail="Invalid request")
 
-    return EntryScanResponse(**result)
+    out = EntryScanResponse(**result)
+    await scan_idempotency.record(
+        db, key, direction="entry", status_code=201, body=out.model_dump(mode="json"), **plate
+    )
+    return out
+
+
 @router.post("/exit", response_model=ExitScanResponse, status_code=status.HTTP_200_OK)
-def exit_scan(payload: ExitScanRequest, db: Session = Depends(get_db)):
-    svc = GateService(db)
-    result = svc.handle_exit_scan(
+async def exit_scan(
+    payload: ExitScanRequest,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
+):
+    plate = {"region_code": payload.region_code, "plate_text": payload.plate_text}
+    key = scan_idempotency.key_for("exit", gate_id=payload.gate_id, idempotency_key=idempotency_key, **plate)
+    cached = await scan_idempotency.lookup(db, key)
+    if cached is not None:
+        return _replay(response, cached, ExitScanResponse)
+
+    svc = AsyncGateService(db)
+    result = await svc.handle_exit_scan(
         region_code=payload.region_code,
         plate_text=payload.plate_text,
         gate_id=payload.gate_id,
         source=payload.source,
+        captured_at=payload.captured_at,
     )
-    return ExitScanResponse(**result)
+    out = ExitScanResponse(**result)
+    await scan_idempotency.record(
+        db, key, direction="exit", status_code=200, body=out.model_dump(mode="json"), **plate
+    )
+    return out
+
+
+@router.post("/batch", response_model=BatchScanResponse, status_code=status.HTTP_200_OK)
+async def batch_scan(payload: BatchScanRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Replay events a recognizer buffered while the API was unreachable.
+    One connection and one transaction for the whole batch: every commit inside
+    AsyncGateService becomes a savepoint release, so a failing event only rolls back
+    itself. Replayed events are recorded but never move a barrier. Events carrying an
+    idempotency_key are deduplicated against earlier posts and batches.
+    """
+    async with db.bind.connect() as conn:
+        await conn.begin()
+        if conn.dialect.name == "sqlite":
+            # pysqlite defers BEGIN, so the first RELEASE SAVEPOINT would commit on its own
+            await conn.exec_driver_sql("BEGIN")
+        batch_db = AsyncSession(
+            bind=conn,
+            join_transaction_mode="create_savepoint",
+            autoflush=False,
+            expire_on_commit=False,
+        )
+        svc = AsyncGateService(batch_db, actuate=False)
+        try:
+            results = await svc.handle_batch(payload.events)
+            await conn.commit()
+        except BaseException:
+            # drop what the batch cached from the rolled-back transaction (vehicle ids
+            # it may have created, decisions it recorded); the rest of the caches stay
+            for vehicle_id in svc.cached_vehicle_ids:
+                plate_access_cache.invalidate_vehicle(vehicle_id)
+            scan_idempotency.forget(svc.idempotency_keys)
+            raise
+        finally:
+            await batch_db.close()
+
+    failed = sum(1 for r in results if r["status_code"] >= 400)
+    return BatchScanResponse(processed=len(results) - failed, failed=failed, results=results)
+
+
+@router.get("/metrics")
+def scan_metrics(_admin = Depends(get_current_admin)):
+    # hot-path counters for this API process
+    return {
+        "plate_cache": plate_access_cache.stats(),
+        "barrier": barrier_dispatcher.stats(),
+        "gates": gate_registry.stats(),
+        "plans": plan_catalog.stats(),
+        "subscriptions": subscription_index.stats(),
+        "idempotency": scan_idempotency.stats(),
+    }
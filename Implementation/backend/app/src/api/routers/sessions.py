@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 from typing import Optional
 
 from ..deps import get_session_service
+from ..pagination import PageParams, page_params, set_page_headers
 from ...schemas.session import SessionCreate, SessionRead, SessionEnd
 from ...services.sessions import ParkingSessionService
 
@@ -23,10 +24,16 @@ def get_session(
 
 @router.get("", response_model=list[SessionRead])
 def list_sessions(
+    response: Response,
     vehicle_id: int = Query(..., description="Filter by vehicle"),
+    paging: PageParams = Depends(page_params),
     svc: ParkingSessionService = Depends(get_session_service),
 ):
-    return svc.list_for_vehicle(vehicle_id)
+    if not paging.requested:
+        return svc.list_for_vehicle(vehicle_id)
+    page = svc.page_for_vehicle(vehicle_id, after_id=paging.after_id, limit=paging.limit, count=paging.count.value)
+    set_page_headers(response, page)
+    return page.items
 
 @router.post("/{session_id}/end", response_model=SessionRead)
 def end_session(
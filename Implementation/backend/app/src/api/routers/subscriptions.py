@@ -1,18 +1,22 @@
 from typing import Optional
-from fastapi import APIRouter, Depends, Query, HTTPException, Body
+from fastapi import APIRouter, Depends, Query, HTTPException, Body, Response
 from fastapi.responses import RedirectResponse
 from pydantic import BaseModel, EmailStr
 from datetime import datetime, timezone, timedelta
 import stripe
 
 from ..deps import get_db, get_subscription_service
+from ..pagination import PageParams, page_params, set_page_headers
 from ...repositories.subscription_sqlalchemy import SubscriptionRepository
 from ...services.subscriptions import SubscriptionService
 from ...schemas.subscription import (
     SubscriptionCreate, SubscriptionRead, SubscriptionStatusUpdate, SubscriptionActivateOnPayment
 )
 from ...core.settings import settings
+from ...core.security import get_current_admin
 from ...core.security import create_plate_claim_token, decode_plate_claim_token
+from ...services.access_cache import plate_access_cache
+from ...services.subscription_index import subscription_index
 from ...services.emailer import send_verification_email, send_payment_link_email
 from ...models.driver import Driver
 from ...models.vehicle import Vehicle
@@ -60,7 +64,9 @@ def _create_or_reassign_vehicle(db, *, driver: Driver, region_code: str, plate_t
     vrepo = VehicleRepository(db)
     v = vrepo.get_by_plate(region_code=region_code, plate_text=plate_text)
     if not v:
-        return vrepo.create(driver_id=driver.id, region_code=region_code, plate_text=plate_text)
+        v = vrepo.create(driver_id=driver.id, region_code=region_code, plate_text=plate_text)
+        plate_access_cache.invalidate_plate(region_code, plate_text)  # an exact plate now beats folded matches
+        return v
 
     if v.driver_id == driver.id:
         return v
@@ -211,10 +217,32 @@ def create_subscription(payload: SubscriptionCreate, svc: SubscriptionService =
 
 @router.get("", response_model=list[SubscriptionRead])
 def list_subscriptions(
+    response: Response,
     vehicle_id: int = Query(...),
+    paging: PageParams = Depends(page_params),
     svc: SubscriptionService = Depends(get_subscription_service),
 ):
-    return svc.list_for_vehicle(vehicle_id)
+    if not paging.requested:
+        return svc.list_for_vehicle(vehicle_id)
+    page = svc.page_for_vehicle(vehicle_id, after_id=paging.after_id, limit=paging.limit, count=paging.count.value)
+    set_page_headers(response, page)
+    return page.items
+
+@router.get("/index/check")
+def check_subscription_index(
+    repair: bool = Query(False, description="Reload the index if it disagrees with the database"),
+    db=Depends(get_db),
+    _admin=Depends(get_current_admin),
+):
+    """Compare this process's in-memory subscription index with the database."""
+    repo = SubscriptionRepository(db)
+    rows = repo.list_active_windows()
+    report = subscription_index.check(rows)
+    if repair and not report["consistent"]:
+        subscription_index.load(rows)
+    report["repaired"] = repair and not report["consistent"]
+    report["index"] = subscription_index.stats()
+    return report
 
 @router.get("/{subscription_id}", response_model=SubscriptionRead)
 def get_subscription(subscription_id: int, svc: SubscriptionService = Depends(get_subscription_service)):
@@ -1,14 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import func
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from ...core.security import get_current_admin
 from ...db.database import get_db
-from ...models import Vehicle
-from ...repositories.subscription_sqlalchemy import SubscriptionRepository
+from ...repositories.vehicle_sqlalchemy import VehicleRepository
 from ...services.vehicles import VehicleService
 from ...schemas.vehicle import VehicleCreate, VehicleRead
 from ..deps import get_vehicle_service
+from ..pagination import DEFAULT_PAGE_SIZE, CountMode, PageParams, page_params, set_page_headers
 
 router = APIRouter(prefix="/vehicles", tags=["vehicles"])
 
@@ -25,6 +26,40 @@ def register_vehicle(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.get("/plate-collisions")
+def plate_collisions(
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    _admin = Depends(get_current_admin),
+):
+    """
+    Vehicles that share an OCR-confusion key (plate_match_key). A gate reading
+    that spells one of them exactly gets that vehicle; any other reading of the
+    group resolves to `resolves_to`, the oldest. Usually one row is a visitor
+    auto-registered from a misread and can be merged or deleted.
+    """
+    groups = VehicleRepository(db).plate_collisions(limit=limit)
+    return {
+        "collisions": len(groups),
+        "groups": [
+            {
+                "plate_match_key": vs[0].plate_match_key,
+                "resolves_to": vs[0].id,
+                "vehicles": [
+                    {
+                        "id": v.id,
+                        "driver_id": v.driver_id,
+                        "region_code": v.region_code,
+                        "plate_text": v.plate_text,
+                        "is_blacklisted": v.is_blacklisted,
+                    }
+                    for v in vs
+                ],
+            }
+            for vs in groups
+        ],
+    }
+
 @router.get("/{vehicle_id}", response_model=VehicleRead)
 def get_vehicle(
     vehicle_id: int,
@@ -37,6 +72,7 @@ def get_vehicle(
 
 @router.get("")  # NOTE: no response_model so we can return {items,total}
 def list_vehicles(
+    response: Response,
     q: str = Query("", min_length=0),
     # now OPTIONAL
     driver_id: int | None = Query(None, description="Filter by driver if provided"),
@@ -46,43 +82,23 @@ def list_vehicles(
         None,
         description="Derived access status: pending | authorized | suspended",
     ),
-    # pagination
-    page: int = Query(1, ge=1),
-    page_size: int = Query(50, ge=1, le=200),
+    paging: PageParams = Depends(page_params),
 
     db: Session = Depends(get_db),
     _admin = Depends(get_current_admin),  # protect with admin auth
 ):
-    query = db.query(Vehicle)
-
-    if driver_id is not None:
-        query = query.filter(Vehicle.driver_id == driver_id)
-
-    if q:
-        like = f"%{q.lower()}%"
-        query = query.filter(
-            (func.lower(Vehicle.region_code).like(like)) |
-            (func.lower(Vehicle.plate_text).like(like))
-        )
-
-    if is_blacklisted is not None:
-        query = query.filter(Vehicle.is_blacklisted == is_blacklisted)
-
-    total = query.count()
-    rows = (
-        query.order_by(Vehicle.id.desc())
-             .offset((page - 1) * page_size)
-             .limit(page_size)
-             .all()
+    # a plain request keeps its old answer: the first page with an exact total
+    page = VehicleRepository(db).search_with_access_status(
+        at=datetime.now(timezone.utc),
+        q=q,
+        driver_id=driver_id,
+        is_blacklisted=is_blacklisted,
+        status=status.lower().strip() if status else None,
+        after_id=paging.after_id,
+        limit=paging.limit or DEFAULT_PAGE_SIZE,
+        count=paging.count.value if paging.requested else CountMode.exact.value,
     )
-
-    # 👇 derive access_status for each row
-    srepo = SubscriptionRepository(db)
-    def derive_access_status(v: Vehicle) -> str:
-        if v.is_blacklisted:
-            return "suspended"
-        return "authorized" if srepo.has_active_now(v.id) else "pending"
-
+    set_page_headers(response, page)
     items = [
         {
             "id": v.id,
@@ -90,14 +106,8 @@ def list_vehicles(
             "region_code": v.region_code,
             "plate_text": v.plate_text,
             "is_blacklisted": v.is_blacklisted,
-            "access_status": derive_access_status(v),
+            "access_status": access_status,
         }
-        for v in rows
+        for v, access_status in page.items
     ]
-
-    # optional filter by derived status
-    if status:
-        s = status.lower().strip()
-        items = [i for i in items if i["access_status"] == s]
-
-    return {"items": items, "total": total}
\ No newline at end of file
+    return {"items": items, "total": page.total}
@@ -27,6 +27,18 @@ class Settings(BaseSettings):
     STRIPE_WEBHOOK_SECRET: SecretStr = SecretStr("")
     PUBLIC_BASE_URL: str = "http://localhost:8000"
     BARRIER_PI_BASE_URL: str = "http://192.168.1.160:5000"
+    # Barrier dispatcher (background queue per gate, see services/barrier.py)
+    BARRIER_TIMEOUT_SECONDS: float = 0.5
+    BARRIER_MAX_RETRIES: int = 2
+    BARRIER_RETRY_BACKOFF_SECONDS: float = 0.2
+    BARRIER_QUEUE_SIZE: int = 32
+    # Per-lane barrier endpoints live in the gates table; this is how often each
+    # API process re-reads it (local writes invalidate immediately)
+    GATE_REGISTRY_REFRESH_SECONDS: int = 30
+    # Same for the plans table (services/plan_catalog.py)
+    PLAN_CATALOG_REFRESH_SECONDS: int = 60
+    # ...and for active subscription windows (services/subscription_index.py)
+    SUBSCRIPTION_INDEX_REFRESH_SECONDS: int = 60
     GOOGLE_APPLICATION_CREDENTIALS: Optional[str] = None
     FIREBASE_STORAGE_BUCKET: Optional[str] = None
 
@@ -52,6 +64,17 @@ class Settings(BaseSettings):
     PRICING_ROUND_UP: bool = True
     GRACE_AUTOCLOSE_ENABLED: bool = False
 
+    # Scans carry the recognizer's captured_at; it is trusted within these bounds
+    SCAN_MAX_CLOCK_SKEW_SECONDS: int = 120   # how far in the future a capture may be
+    SCAN_MAX_AGE_HOURS: int = 72             # oldest capture a replayed backlog may contain
+
+    # Gate hot path: plate -> vehicle cache (0 entries disables it). Blacklist
+    # flags and open sessions are always read from the DB.
+    GATE_CACHE_MAX_ENTRIES: int = 10_000
+    GATE_CACHE_TTL_SECONDS: int = 300
+    # Recent scan decisions kept in memory for duplicate posts (window: IDEMPOTENCY_WINDOW)
+    IDEMPOTENCY_MAX_ENTRIES: int = 10_000
+
     @field_validator("DATABASE_URL", mode="before")
     @classmethod
     def build_database_url_if_missing(cls, v, info: ValidationInfo):
@@ -1,5 +1,7 @@
 # backend/app/src/db/database.py
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from src.core.settings import settings
 
@@ -17,3 +19,24 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def async_database_url(url: str) -> str:
+    """Same database through an asyncio driver (psycopg 3 async mode / aiosqlite)."""
+    u = make_url(url)
+    driver = {"postgresql": "postgresql+psycopg", "sqlite": "sqlite+aiosqlite"}.get(u.get_backend_name())
+    if driver is None:
+        return url
+    return u.set(drivername=driver).render_as_string(hide_password=False)
+
+
+# Async engine for the gate hot path (/scans/*): no threadpool hop per request.
+# Nothing connects until the first query.
+async_engine = create_async_engine(async_database_url(settings.DATABASE_URL), pool_pre_ping=True)
+
+# expire_on_commit=False: attributes stay readable after commit without implicit IO
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
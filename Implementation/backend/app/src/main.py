@@ -1,11 +1,49 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from sqlalchemy import text
 from src.core.settings import settings
-from src.db.database import engine
+from src.db.database import AsyncSessionLocal, async_engine, engine
+from src.repositories.subscription_sqlalchemy import AsyncSubscriptionRepository
+from src.services.barrier import barrier_dispatcher
+from src.services.subscription_index import subscription_index
 from .api import api_router  # <- central router (from api/routers/__init__.py)
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI(title="Barrier Control API")
+
+async def _load_subscription_index() -> None:
+    async with AsyncSessionLocal() as db:
+        subscription_index.load(await AsyncSubscriptionRepository(db).list_active_windows())
+
+
+async def _refresh_subscription_index() -> None:
+    # full reloads happen here, never on a scan (picks up other workers' writes)
+    while True:
+        await asyncio.sleep(subscription_index.refresh_seconds)
+        try:
+            await _load_subscription_index()
+        except Exception as e:
+            print(f"[SUBSCRIPTIONS] index reload failed: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # exits ask the subscription index; load it before the first scan arrives
+    try:
+        await _load_subscription_index()
+    except Exception as e:
+        # exits read the scanned vehicle until the refresher loads it; don't keep the API from starting
+        print(f"[STARTUP] subscription index not loaded: {e}")
+    refresher = asyncio.create_task(_refresh_subscription_index())
+    yield
+    refresher.cancel()
+    # flush queued barrier commands before the process exits
+    barrier_dispatcher.shutdown()
+    await async_engine.dispose()
+
+
+app = FastAPI(title="Barrier Control API", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -17,6 +55,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # paging metadata of the list endpoints (api/pagination.py)
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "X-Total-Count-Estimated"],
 )
 
 app.include_router(api_router)
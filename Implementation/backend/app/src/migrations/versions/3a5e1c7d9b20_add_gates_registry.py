@@ -0,0 +1,47 @@
+"""add gates registry and sessions.exit_gate_id
+
+Revision ID: 3a5e1c7d9b20
+Revises: b71ce8f92036
+Create Date: 2026-10-18 12:14:52.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a5e1c7d9b20'
+down_revision: Union[str, Sequence[str], None] = 'b71ce8f92036'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_table('gates',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('gate_id', sa.String(length=64), nullable=False),
+    sa.Column('name', sa.String(length=120), nullable=True),
+    sa.Column('direction', sa.Enum('entry', 'exit', 'both', name='gatedirection'), nullable=False),
+    sa.Column('barrier_base_url', sa.String(length=255), nullable=True),
+    sa.Column('pulse_seconds', sa.Integer(), nullable=False, server_default='5'),
+    sa.Column('timeout_ms', sa.Integer(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=False, server_default=sa.true()),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_gates_id'), 'gates', ['id'], unique=False)
+    op.create_index(op.f('ix_gates_gate_id'), 'gates', ['gate_id'], unique=True)
+
+    with op.batch_alter_table("sessions") as batch:
+        batch.add_column(sa.Column("exit_gate_id", sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("sessions") as batch:
+        batch.drop_column("exit_gate_id")
+
+    op.drop_index(op.f('ix_gates_gate_id'), table_name='gates')
+    op.drop_index(op.f('ix_gates_id'), table_name='gates')
+    op.drop_table('gates')
+    sa.Enum(name='gatedirection').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,46 @@
+"""add OCR-confusion plate_match_key to vehicles
+
+Revision ID: 4b8d2e6f1a93
+Revises: c3f9a6d2e817
+Create Date: 2026-10-18 20:41:07.552318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b8d2e6f1a93'
+down_revision: Union[str, Sequence[str], None] = 'c3f9a6d2e817'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same folding as models.vehicle.PLATE_CONFUSIONS (copied: migrations don't import models)
+_CONFUSIONS = [
+    (" ", ""), ("-", ""),
+    ("O", "0"), ("Q", "0"),
+    ("I", "1"), ("L", "1"),
+    ("S", "5"), ("B", "8"),
+    ("Z", "2"), ("T", "7"),
+]
+
+
+def upgrade():
+    op.add_column("vehicles", sa.Column("plate_match_key", sa.String(32), nullable=True))
+
+    folded = "UPPER(TRIM(plate_text))"
+    for src, dst in _CONFUSIONS:
+        folded = f"REPLACE({folded}, '{src}', '{dst}')"
+    op.execute(f"UPDATE vehicles SET plate_match_key = UPPER(TRIM(region_code)) || ':' || {folded}")
+
+    with op.batch_alter_table("vehicles") as batch:
+        batch.alter_column("plate_match_key", existing_type=sa.String(32), nullable=False)
+
+    op.create_index("ix_vehicles_plate_match_key", "vehicles", ["plate_match_key"], unique=False)
+
+
+def downgrade():
+    op.drop_index("ix_vehicles_plate_match_key", table_name="vehicles")
+    op.drop_column("vehicles", "plate_match_key")
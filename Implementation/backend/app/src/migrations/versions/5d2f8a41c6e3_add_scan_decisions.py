@@ -0,0 +1,38 @@
+"""add scan_decisions (scan idempotency)
+
+Revision ID: 5d2f8a41c6e3
+Revises: 3a5e1c7d9b20
+Create Date: 2026-10-18 15:02:37.114920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2f8a41c6e3'
+down_revision: Union[str, Sequence[str], None] = '3a5e1c7d9b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_table('scan_decisions',
+    sa.Column('key', sa.String(length=255), nullable=False),
+    sa.Column('plate_key', sa.String(length=32), nullable=False),
+    sa.Column('direction', sa.String(length=8), nullable=False),
+    sa.Column('status_code', sa.Integer(), nullable=False),
+    sa.Column('response', sa.JSON(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index('ix_scan_decisions_plate_key', 'scan_decisions', ['plate_key'], unique=False)
+    op.create_index('ix_scan_decisions_expires_at', 'scan_decisions', ['expires_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_scan_decisions_expires_at', table_name='scan_decisions')
+    op.drop_index('ix_scan_decisions_plate_key', table_name='scan_decisions')
+    op.drop_table('scan_decisions')
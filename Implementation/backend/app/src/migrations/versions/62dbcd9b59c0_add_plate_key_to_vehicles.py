@@ -0,0 +1,38 @@
+"""add normalized plate_key to vehicles
+
+Revision ID: 62dbcd9b59c0
+Revises: fc6234edba14
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '62dbcd9b59c0'
+down_revision: Union[str, Sequence[str], None] = 'fc6234edba14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.add_column("vehicles", sa.Column("plate_key", sa.String(32), nullable=True))
+
+    # Backfill existing rows with the same normalization as models.vehicle.make_plate_key
+    op.execute(
+        "UPDATE vehicles "
+        "SET plate_key = UPPER(TRIM(region_code)) || ':' || UPPER(TRIM(plate_text))"
+    )
+
+    with op.batch_alter_table("vehicles") as batch:
+        batch.alter_column("plate_key", existing_type=sa.String(32), nullable=False)
+
+    op.create_index("ix_vehicles_plate_key", "vehicles", ["plate_key"], unique=False)
+
+
+def downgrade():
+    op.drop_index("ix_vehicles_plate_key", table_name="vehicles")
+    op.drop_column("vehicles", "plate_key")
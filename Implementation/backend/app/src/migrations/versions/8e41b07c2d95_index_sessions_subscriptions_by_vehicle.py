@@ -0,0 +1,28 @@
+"""index sessions and subscriptions by vehicle (exit context query)
+
+Revision ID: 8e41b07c2d95
+Revises: 5d2f8a41c6e3
+Create Date: 2026-10-18 16:21:09.482615
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e41b07c2d95'
+down_revision: Union[str, Sequence[str], None] = '5d2f8a41c6e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_index('ix_sessions_vehicle_id_id', 'sessions', ['vehicle_id', 'id'], unique=False)
+    op.create_index('ix_subscriptions_vehicle_id', 'subscriptions', ['vehicle_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_subscriptions_vehicle_id', table_name='subscriptions')
+    op.drop_index('ix_sessions_vehicle_id_id', table_name='sessions')
@@ -0,0 +1,51 @@
+"""unique open session per vehicle (partial index)
+
+Revision ID: b71ce8f92036
+Revises: 62dbcd9b59c0
+Create Date: 2026-10-18 11:03:27.560411
+
+The data change is lossy: where past races left a vehicle with several open
+sessions, the earliest one (the real arrival) stays open and the later ones
+are ended at their own start with status 'superseded' and no duration, so
+they are neither billed nor mistaken for a free visit. downgrade() drops the
+index only; it does not reopen them.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b71ce8f92036'
+down_revision: Union[str, Sequence[str], None] = '62dbcd9b59c0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Supersede duplicate open sessions left by past races, keeping the earliest per vehicle
+    # (it holds the arrival time), otherwise the unique index can't be built.
+    op.execute(
+        "UPDATE sessions "
+        "SET ended_at = started_at, status = 'superseded', duration = NULL "
+        "WHERE ended_at IS NULL AND EXISTS ("
+        "  SELECT 1 FROM sessions AS earlier "
+        "  WHERE earlier.vehicle_id = sessions.vehicle_id AND earlier.ended_at IS NULL "
+        "  AND (earlier.started_at < sessions.started_at "
+        "       OR (earlier.started_at = sessions.started_at AND earlier.id < sessions.id))"
+        ")"
+    )
+
+    op.create_index(
+        "uq_sessions_vehicle_open",
+        "sessions",
+        ["vehicle_id"],
+        unique=True,
+        postgresql_where=sa.text("ended_at IS NULL"),
+        sqlite_where=sa.text("ended_at IS NULL"),
+    )
+
+
+def downgrade():
+    op.drop_index("uq_sessions_vehicle_open", table_name="sessions")
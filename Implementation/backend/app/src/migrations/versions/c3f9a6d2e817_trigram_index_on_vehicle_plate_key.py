@@ -0,0 +1,42 @@
+"""trigram index on vehicles.plate_key (admin plate search)
+
+Revision ID: c3f9a6d2e817
+Revises: 8e41b07c2d95
+Create Date: 2026-10-18 19:02:44.113208
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f9a6d2e817'
+down_revision: Union[str, Sequence[str], None] = '8e41b07c2d95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return  # no pg_trgm: plate search uses a plain LIKE elsewhere
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # CONCURRENTLY: don't block gate writes to vehicles while a large table is indexed
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_vehicles_plate_key_trgm',
+            'vehicles',
+            ['plate_key'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'plate_key': 'gin_trgm_ops'},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_vehicles_plate_key_trgm', table_name='vehicles', postgresql_concurrently=True)
@@ -9,4 +9,5 @@ from .plan import Plan
 from .subscription import Subscription
 from .payment import Payment
 from .audit import AuditEvent
-
+from .gate import Gate
+from .scan_decision import ScanDecision
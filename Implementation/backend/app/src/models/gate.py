@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, Boolean, Enum
+import enum
+from .base import Base
+
+class GateDirection(str, enum.Enum):
+    entry = "entry"
+    exit = "exit"
+    both = "both"
+
+class Gate(Base):
+    __tablename__ = "gates"
+
+    id = Column(Integer, primary_key=True, index=True)
+    gate_id = Column(String(64), nullable=False, unique=True, index=True)  # as sent by the recognizer
+    name = Column(String(120), nullable=True)
+    direction = Column(Enum(GateDirection), nullable=False, default=GateDirection.both)
+
+    barrier_base_url = Column(String(255), nullable=True)  # e.g. http://192.168.1.160:5000
+    pulse_seconds = Column(Integer, nullable=False, default=5)
+    timeout_ms = Column(Integer, nullable=True)  # barrier HTTP timeout; NULL -> BARRIER_TIMEOUT_SECONDS
+
+    is_active = Column(Boolean, nullable=False, default=True)
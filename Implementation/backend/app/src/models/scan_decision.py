@@ -0,0 +1,16 @@
+from sqlalchemy import Column, DateTime, Index, Integer, JSON, String
+from .base import Base
+
+class ScanDecision(Base):
+    """A recent gate decision, replayed to duplicate scans (see services/scan_idempotency.py)."""
+    __tablename__ = "scan_decisions"
+
+    key = Column(String(255), primary_key=True)   # Idempotency-Key or direction:gate:plate_key
+    plate_key = Column(String(32), nullable=False)  # plate_match_key: invalidated per confusion class
+    direction = Column(String(8), nullable=False)  # "entry" | "exit"
+    status_code = Column(Integer, nullable=False)
+    response = Column(JSON, nullable=False)       # response body as sent the first time
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+Index("ix_scan_decisions_plate_key", ScanDecision.plate_key)
+Index("ix_scan_decisions_expires_at", ScanDecision.expires_at)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, String
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, String, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .base import Base
@@ -13,11 +13,24 @@ class Session(Base):
     # It can be computed on the fly the duration
 
     plan_id = Column(Integer, ForeignKey("plans.id", ondelete="RESTRICT"), nullable=True)
-    status = Column(String(24), nullable=True)  # "open" | "awaiting_payment" | "closed"
+    status = Column(String(24), nullable=True)  # "open" | "awaiting_payment" | "closed" | "superseded" (migration b71ce8f92036)
     duration = Column(Integer, nullable=True)  # minutes
     amount_charged = Column(Integer, nullable=True)  # cents
+    exit_gate_id = Column(String(64), nullable=True)  # lane the visitor is waiting at to pay
 
     vehicle = relationship("Vehicle", back_populates="sessions")
     payments = relationship("Payment", back_populates="session", cascade="all, delete-orphan")
 
     plan = relationship("Plan", back_populates="sessions", lazy="joined")
+
+# Per-vehicle lookups (latest session, awaiting payment) walk this newest-first
+Index("ix_sessions_vehicle_id_id", Session.vehicle_id, Session.id)
+
+# At most one open session (ended_at IS NULL) per vehicle, enforced by the DB
+Index(
+    "uq_sessions_vehicle_open",
+    Session.vehicle_id,
+    unique=True,
+    postgresql_where=Session.ended_at.is_(None),
+    sqlite_where=Session.ended_at.is_(None),
+)
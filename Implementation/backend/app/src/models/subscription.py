@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, Boolean, DateTime, String
+from sqlalchemy import Column, Integer, ForeignKey, Boolean, DateTime, String, Index
 from sqlalchemy.orm import relationship
 from .base import Base
 
@@ -17,3 +17,5 @@ class Subscription(Base):
     stripe_subscription_id = Column(String(64), nullable=True, index=True)
     vehicle = relationship("Vehicle", back_populates="subscriptions")
     plan = relationship("Plan")
+
+Index("ix_subscriptions_vehicle_id", Subscription.vehicle_id)
@@ -1,7 +1,38 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Index, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import DDL, Column, Integer, String, ForeignKey, Index, Boolean, event
+from sqlalchemy.orm import relationship, validates
 from .base import Base
 
+
+def make_plate_key(region_code: str | None, plate_text: str | None) -> str | None:
+    """Normalized lookup key for a plate: 'REGION:PLATE', uppercased and trimmed."""
+    if region_code is None or plate_text is None:
+        return None
+    return f"{region_code.strip().upper()}:{plate_text.strip().upper()}"
+
+
+# Characters the recognizers' OCR mixes up, folded onto the one normalize_ocr()
+# (ops/lp_recognizer*.py) emits. Separators are dropped as well.
+PLATE_CONFUSIONS = {
+    " ": "", "-": "",
+    "O": "0", "Q": "0",
+    "I": "1", "L": "1",
+    "S": "5", "B": "8",
+    "Z": "2", "T": "7",
+}
+_CONFUSION_TABLE = str.maketrans(PLATE_CONFUSIONS)
+
+
+def make_plate_match_key(region_code: str | None, plate_text: str | None) -> str | None:
+    """
+    Confusion-class key for a plate: 'REGION:PLATE' with the plate folded through
+    PLATE_CONFUSIONS, so "CB1234AT" and its OCR reading "C81234A7" share one key.
+    Several vehicles may share a match key; see VehicleRepository.resolve_plate.
+    """
+    if region_code is None or plate_text is None:
+        return None
+    return f"{region_code.strip().upper()}:{plate_text.strip().upper().translate(_CONFUSION_TABLE)}"
+
+
 class Vehicle(Base):
     __tablename__ = "vehicles"
 
@@ -11,9 +42,39 @@ class Vehicle(Base):
     plate_text = Column(String(16), nullable=False)
     is_blacklisted = Column(Boolean, nullable=False, default=False)
 
+    # both kept in sync with region_code/plate_text by the validator below
+    plate_key = Column(String(32), nullable=False)
+    plate_match_key = Column(String(32), nullable=False)
+
     driver = relationship("Driver", back_populates="vehicles")
     sessions = relationship("Session", back_populates="vehicle", cascade="all, delete-orphan")
     subscriptions = relationship("Subscription", back_populates="vehicle", cascade="all, delete-orphan")
     # ...
+
+    @validates("region_code", "plate_text")
+    def _sync_plate_key(self, key, value):
+        region_code = value if key == "region_code" else self.region_code
+        plate_text = value if key == "plate_text" else self.plate_text
+        self.plate_key = make_plate_key(region_code, plate_text)
+        self.plate_match_key = make_plate_match_key(region_code, plate_text)
+        return value
+
 # Fast lookup on plates
 Index("ix_vehicles_plate_unique", Vehicle.region_code, Vehicle.plate_text, unique=True)
+# Index-friendly gate lookup (no function calls on the column side)
+Index("ix_vehicles_plate_key", Vehicle.plate_key)
+# Gate lookups that tolerate OCR confusions (not unique: see the collision report)
+Index("ix_vehicles_plate_match_key", Vehicle.plate_match_key)
+# Substring plate search (admin list ?q=): trigram GIN on PostgreSQL only.
+# SQLite has no trigram index; the search falls back to a plain LIKE there.
+Index(
+    "ix_vehicles_plate_key_trgm",
+    Vehicle.plate_key,
+    postgresql_using="gin",
+    postgresql_ops={"plate_key": "gin_trgm_ops"},
+).ddl_if(dialect="postgresql")
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
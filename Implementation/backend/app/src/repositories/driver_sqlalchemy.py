@@ -1,5 +1,8 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from ..models.driver import Driver
+from .pagination import Page, paginate
 
 class DriverRepository:
     def __init__(self, db: Session):
@@ -20,3 +23,23 @@ class DriverRepository:
 
     def list(self) -> list[Driver]:
         return self.db.query(Driver).order_by(Driver.id.desc()).all()
+
+    def page(self, *, after_id: int | None, limit: int | None, count: str = "none") -> Page[Driver]:
+        return paginate(self.db, select(Driver), key=Driver.id, after_id=after_id, limit=limit, count=count)
+
+
+class AsyncDriverRepository:
+    """Async subset of DriverRepository used by the gate hot path."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, *, name: str, email: str) -> Driver:
+        d = Driver(name=name, email=email)
+        self.db.add(d)
+        await self.db.commit()
+        await self.db.refresh(d)
+        return d
+
+    async def get_by_email(self, email: str) -> Driver | None:
+        return await self.db.scalar(select(Driver).where(Driver.email == email).limit(1))
@@ -0,0 +1,47 @@
+from typing import Optional, List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ..models.gate import Gate
+
+class GateRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create(self, **kwargs) -> Gate:
+        gate = Gate(**kwargs)
+        self.db.add(gate)
+        self.db.commit()
+        self.db.refresh(gate)
+        return gate
+
+    def get(self, id_: int) -> Optional[Gate]:
+        return self.db.get(Gate, id_)
+
+    def get_by_gate_id(self, gate_id: str) -> Optional[Gate]:
+        return self.db.query(Gate).filter(Gate.gate_id == gate_id).first()
+
+    def list(self) -> List[Gate]:
+        return self.db.query(Gate).order_by(Gate.gate_id).all()
+
+    def list_active(self) -> List[Gate]:
+        return self.db.query(Gate).filter(Gate.is_active.is_(True)).all()
+
+    def update(self, gate: Gate, **kwargs) -> Gate:
+        for k, v in kwargs.items():
+            setattr(gate, k, v)
+        self.db.commit()
+        self.db.refresh(gate)
+        return gate
+
+    def delete(self, gate: Gate) -> None:
+        self.db.delete(gate)
+        self.db.commit()
+
+
+class AsyncGateRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def list_active(self) -> List[Gate]:
+        return list(await self.db.scalars(select(Gate).where(Gate.is_active.is_(True))))
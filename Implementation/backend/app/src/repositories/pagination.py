@@ -0,0 +1,76 @@
+# backend/app/src/repositories/pagination.py
+from dataclasses import dataclass
+from typing import Generic, List, Optional, TypeVar
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+T = TypeVar("T")
+
+
+@dataclass
+class Page(Generic[T]):
+    items: List[T]
+    last_id: Optional[int] = None     # key of the last item when more rows follow, else None
+    total: Optional[int] = None       # None when no count was asked for
+    total_is_estimate: bool = False
+
+
+def paginate(
+    db: Session,
+    stmt,
+    *,
+    key,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = None,
+    count: str = "none",
+    rank=None,
+) -> Page:
+    """
+    Keyset page of `stmt` ordered by `key` DESC (an integer primary key): rows
+    with key < after_id, at most `limit` of them. One extra row is fetched to
+    know whether another page follows; deep pages cost the same as the first.
+
+    `rank` (an ORDER BY expression, e.g. search relevance) sorts ahead of the
+    key. Such pages can't be continued from a key, so they never return last_id.
+
+    count: "exact" runs COUNT(*) over the same filters, "approximate" asks the
+    PostgreSQL planner for its row estimate (exact on other databases), "none"
+    skips it.
+    """
+    q = stmt
+    if after_id is not None:
+        q = q.where(key < after_id)
+    q = q.order_by(key.desc()) if rank is None else q.order_by(rank, key.desc())
+    if limit is not None:
+        q = q.limit(limit + 1)
+
+    result = db.execute(q)
+    single = len(stmt.column_descriptions) == 1
+    items = list(result.scalars().all() if single else result.all())
+    last_id = None
+    if limit is not None and len(items) > limit:
+        items = items[:limit]
+        last = items[-1] if single else items[-1][0]
+        last_id = getattr(last, key.key) if rank is None else None
+
+    total, estimated = count_rows(db, stmt, count)
+    return Page(items=items, last_id=last_id, total=total, total_is_estimate=estimated)
+
+
+def count_rows(db: Session, stmt, mode: str) -> tuple[Optional[int], bool]:
+    """(row count of stmt, whether it is an estimate) for the given count mode."""
+    if mode == "none":
+        return None, False
+    if mode == "approximate" and db.get_bind().dialect.name == "postgresql":
+        return _planner_estimate(db, stmt), True
+    counted = stmt.with_only_columns(func.count(), maintain_column_froms=True).order_by(None)
+    return int(db.scalar(counted) or 0), False
+
+
+def _planner_estimate(db: Session, stmt) -> int:
+    # EXPLAIN only plans the query: its top-level "Plan Rows" is the estimate the
+    # planner derived from table statistics, without reading the rows
+    compiled = stmt.compile(dialect=db.get_bind().dialect)
+    plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
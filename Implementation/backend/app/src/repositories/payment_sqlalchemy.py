@@ -1,7 +1,9 @@
 # backend/app/src/repositories/payment_sqlalchemy.py
 from typing import Optional, List
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from ..models.payment import Payment
+from .pagination import Page, paginate
 
 class PaymentRepository:
     def __init__(self, db: Session):
@@ -17,21 +19,44 @@ class PaymentRepository:
     def get(self, payment_id: int) -> Optional[Payment]:
         return self.db.get(Payment, payment_id)
 
-    def list(
-        self,
+    @staticmethod
+    def _select(
         *,
         session_id: Optional[int] = None,
         subscription_id: Optional[int] = None,
         status: Optional[str] = None,
-    ) -> List[Payment]:
-        q = self.db.query(Payment)
+    ):
+        stmt = select(Payment)
         if session_id is not None:
-            q = q.filter(Payment.session_id == session_id)
+            stmt = stmt.where(Payment.session_id == session_id)
         if subscription_id is not None:
-            q = q.filter(Payment.subscription_id == subscription_id)
+            stmt = stmt.where(Payment.subscription_id == subscription_id)
         if status is not None:
-            q = q.filter(Payment.status == status)
-        return q.order_by(Payment.id.desc()).all()
+            stmt = stmt.where(Payment.status == status)
+        return stmt
+
+    def list(
+        self,
+        *,
+        session_id: Optional[int] = None,
+        subscription_id: Optional[int] = None,
+        status: Optional[str] = None,
+    ) -> List[Payment]:
+        stmt = self._select(session_id=session_id, subscription_id=subscription_id, status=status)
+        return list(self.db.scalars(stmt.order_by(Payment.id.desc())))
+
+    def page(
+        self,
+        *,
+        session_id: Optional[int] = None,
+        subscription_id: Optional[int] = None,
+        status: Optional[str] = None,
+        after_id: Optional[int],
+        limit: Optional[int],
+        count: str = "none",
+    ) -> Page[Payment]:
+        stmt = self._select(session_id=session_id, subscription_id=subscription_id, status=status)
+        return paginate(self.db, stmt, key=Payment.id, after_id=after_id, limit=limit, count=count)
 
     def set_status(self, p: Payment, status: str) -> Payment:
         p.status = status
@@ -1,4 +1,6 @@
 from typing import Optional, List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from ..models.plan import Plan, PlanType
 
@@ -39,4 +41,14 @@ class PlanRepository:
             .filter(Plan.type == PlanType.visitor)
             .order_by(Plan.id.desc())
             .first()
-        )
\ No newline at end of file
+        )
+
+
+class AsyncPlanRepository:
+    """Async subset of PlanRepository used by the gate hot path."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def list(self) -> List[Plan]:
+        return list(await self.db.scalars(select(Plan).order_by(Plan.id.desc())))
@@ -0,0 +1,31 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models.scan_decision import ScanDecision
+
+class AsyncScanDecisionRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_fresh(self, key: str, now: datetime) -> Optional[ScanDecision]:
+        return await self.db.scalar(
+            select(ScanDecision).where(ScanDecision.key == key, ScanDecision.expires_at > now)
+        )
+
+    async def put(self, **kwargs) -> None:
+        # no commit: the caller batches this with delete_for_plate()
+        await self.db.merge(ScanDecision(**kwargs))
+
+    async def delete_for_plate(self, plate_key: str, direction: str) -> None:
+        # only decisions keyed by the plate; an Idempotency-Key names one event for good
+        await self.db.execute(
+            delete(ScanDecision).where(
+                ScanDecision.plate_key == plate_key,
+                ScanDecision.direction == direction,
+                ScanDecision.key.startswith("scan:"),
+            )
+        )
+
+    async def purge_expired(self, now: datetime) -> None:
+        await self.db.execute(delete(ScanDecision).where(ScanDecision.expires_at <= now))
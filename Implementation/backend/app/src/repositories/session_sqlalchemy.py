@@ -1,9 +1,98 @@
+from dataclasses import dataclass
 from typing import Optional, List
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased, joinedload, lazyload
+from sqlalchemy import bindparam, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from ..models.plan import Plan
 from ..models.session import Session as SessionModel
+from ..models.vehicle import Vehicle, make_plate_key, make_plate_match_key
+from .pagination import Page, paginate
+from .vehicle_sqlalchemy import plate_resolution_order
 from datetime import datetime
 
+
+def _open_session_upsert(dialect: str, values: dict):
+    """INSERT ... ON CONFLICT DO NOTHING RETURNING against uq_sessions_vehicle_open, or None."""
+    insert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}.get(dialect)
+    if insert is None:
+        return None
+    return (
+        insert(SessionModel)
+        .values(**values)
+        .on_conflict_do_nothing(
+            index_elements=[SessionModel.vehicle_id],
+            index_where=SessionModel.ended_at.is_(None),
+        )
+        .returning(SessionModel)
+    )
+
+@dataclass
+class ExitContext:
+    """Everything an exit decision reads, loaded by one statement (see _build_exit_context_stmt)."""
+    vehicle: Optional[Vehicle] = None
+    session: Optional[SessionModel] = None        # latest session still open (ended_at IS NULL)
+    session_plan: Optional[Plan] = None
+    awaiting: Optional[SessionModel] = None       # latest priced session awaiting payment
+    awaiting_plan: Optional[Plan] = None
+
+
+def _build_exit_context_stmt():
+    """
+    The vehicle row for the plate, outer-joined to each piece of state the exit
+    branches need, so the whole snapshot is a single round trip. The vehicle is
+    matched on plate_match_key so OCR confusions still find it, collisions
+    settled by plate_resolution_order. The open session
+    is unique per vehicle (uq_sessions_vehicle_open); "latest awaiting" is a
+    correlated subquery served by ix_sessions_vehicle_id_id.
+    Built once (aliasing is costly); bind :match_key and :plate_key when executing.
+    """
+    open_s = aliased(SessionModel, name="open_session")
+    open_plan = aliased(Plan, name="open_plan")
+    awaiting_s = aliased(SessionModel, name="awaiting_session")
+    awaiting_plan = aliased(Plan, name="awaiting_plan")
+
+    awaiting_id = (
+        select(SessionModel.id)
+        .where(
+            SessionModel.vehicle_id == Vehicle.id,
+            SessionModel.status == "awaiting_payment",
+            SessionModel.amount_charged.isnot(None),
+            SessionModel.ended_at.isnot(None),
+        )
+        .order_by(SessionModel.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    return (
+        select(Vehicle, open_s, open_plan, awaiting_s, awaiting_plan)
+        .select_from(Vehicle)
+        .outerjoin(open_s, (open_s.vehicle_id == Vehicle.id) & open_s.ended_at.is_(None))
+        .outerjoin(open_plan, open_plan.id == open_s.plan_id)
+        .outerjoin(awaiting_s, awaiting_s.id == awaiting_id)
+        .outerjoin(awaiting_plan, awaiting_plan.id == awaiting_s.plan_id)
+        .where(Vehicle.plate_match_key == bindparam("match_key"))
+        .order_by(*plate_resolution_order(bindparam("plate_key")))
+        .options(lazyload("*"))  # the plans are joined explicitly above
+        .limit(1)
+    )
+
+
+_EXIT_CONTEXT = _build_exit_context_stmt()
+
+
+def _exit_context(row) -> ExitContext:
+    if row is None:
+        return ExitContext()
+    vehicle, session, session_plan, awaiting, awaiting_plan = row
+    return ExitContext(
+        vehicle=vehicle,
+        session=session,
+        session_plan=session_plan,
+        awaiting=awaiting,
+        awaiting_plan=awaiting_plan,
+    )
+
 class ParkingSessionRepository:
     def __init__(self, db: Session):
         self.db = db
@@ -15,6 +104,46 @@ class ParkingSessionRepository:
         self.db.refresh(s)
         return s
 
+    def get_or_create_open(
+        self, vehicle_id: int, *, started_at: datetime | None = None
+    ) -> tuple[SessionModel, bool]:
+        """
+        Open a session for the vehicle unless one is already open.
+        Returns (session, created). On Postgres/SQLite this is a single
+        INSERT ... ON CONFLICT DO NOTHING RETURNING against uq_sessions_vehicle_open,
+        so concurrent scans of the same plate can't open two sessions.
+        """
+        values = {"vehicle_id": vehicle_id}
+        if started_at is not None:
+            values["started_at"] = started_at
+
+        stmt = _open_session_upsert(self.db.get_bind().dialect.name, values)
+        if stmt is None:
+            # no upsert support: best-effort check-then-insert
+            active = self.get_active_for_vehicle(vehicle_id)
+            if active is not None:
+                return active, False
+            return self.create(**values), True
+
+        # second attempt only if the conflicting row was closed before we could read it
+        for _ in range(2):
+            created = self.db.scalars(stmt).first()
+            self.db.commit()
+            if created is not None:
+                return created, True
+            # lost the race (or already inside): fall back to the existing open row
+            existing = self.get_active_for_vehicle(vehicle_id)
+            if existing is not None:
+                return existing, False
+        raise RuntimeError(f"could not open a session for vehicle {vehicle_id}")
+
+    def get_exit_context(self, region_code: str, plate_text: str) -> ExitContext:
+        params = {
+            "match_key": make_plate_match_key(region_code, plate_text),
+            "plate_key": make_plate_key(region_code, plate_text),
+        }
+        return _exit_context(self.db.execute(_EXIT_CONTEXT, params).first())
+
     def get(self, session_id: int) -> Optional[SessionModel]:
         return (
             self.db.query(SessionModel)
@@ -34,6 +163,12 @@ class ParkingSessionRepository:
             .all()
         )
 
+    def page_by_vehicle(
+        self, vehicle_id: int, *, after_id: Optional[int], limit: Optional[int], count: str = "none"
+    ) -> Page[SessionModel]:
+        stmt = select(SessionModel).where(SessionModel.vehicle_id == vehicle_id)
+        return paginate(self.db, stmt, key=SessionModel.id, after_id=after_id, limit=limit, count=count)
+
     def get_active_for_vehicle(self, vehicle_id: int) -> Optional[SessionModel]:
         return (
             self.db.query(SessionModel)
@@ -77,3 +212,62 @@ class ParkingSessionRepository:
             .first()
         )
 
+
+class AsyncParkingSessionRepository:
+    """Async subset of ParkingSessionRepository used by the gate hot path."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, **kwargs) -> SessionModel:
+        s = SessionModel(**kwargs)
+        self.db.add(s)
+        await self.db.commit()
+        await self.db.refresh(s)
+        return s
+
+    async def get_or_create_open(
+        self, vehicle_id: int, *, started_at: datetime | None = None
+    ) -> tuple[SessionModel, bool]:
+        """See ParkingSessionRepository.get_or_create_open."""
+        values = {"vehicle_id": vehicle_id}
+        if started_at is not None:
+            values["started_at"] = started_at
+
+        stmt = _open_session_upsert(self.db.get_bind().dialect.name, values)
+        if stmt is None:
+            active = await self.get_active_for_vehicle(vehicle_id)
+            if active is not None:
+                return active, False
+            return await self.create(**values), True
+
+        for _ in range(2):
+            created = (await self.db.scalars(stmt)).first()
+            await self.db.commit()
+            if created is not None:
+                return created, True
+            existing = await self.get_active_for_vehicle(vehicle_id)
+            if existing is not None:
+                return existing, False
+        raise RuntimeError(f"could not open a session for vehicle {vehicle_id}")
+
+    async def get_exit_context(self, region_code: str, plate_text: str) -> ExitContext:
+        params = {
+            "match_key": make_plate_match_key(region_code, plate_text),
+            "plate_key": make_plate_key(region_code, plate_text),
+        }
+        return _exit_context((await self.db.execute(_EXIT_CONTEXT, params)).first())
+
+    async def get_active_for_vehicle(self, vehicle_id: int) -> Optional[SessionModel]:
+        return await self.db.scalar(
+            select(SessionModel)
+            .where(SessionModel.vehicle_id == vehicle_id, SessionModel.ended_at.is_(None))
+            .order_by(SessionModel.id.desc())
+            .limit(1)
+        )
+
+    async def end_session(self, s: SessionModel, *, ended_at) -> SessionModel:
+        s.ended_at = ended_at
+        await self.db.commit()
+        await self.db.refresh(s)
+        return s
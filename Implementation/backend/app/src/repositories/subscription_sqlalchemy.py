@@ -1,12 +1,33 @@
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, select
 
 from .session_sqlalchemy import ParkingSessionRepository
 from ..models import Vehicle
 from ..models.subscription import Subscription
 from ..models.payment import Payment  # 👈 import payment model
 from ..models.plan import Plan, PlanType
+from ..core.settings import settings
+from .pagination import Page, paginate
+
+
+def _active_windows_stmt(vehicle_id: Optional[int] = None):
+    """
+    (id, vehicle_id, valid_from, valid_to, plan type) of every active subscription
+    that can still cover a scan: scans older than SCAN_MAX_AGE_HOURS are rejected.
+    """
+    horizon = datetime.now(timezone.utc) - timedelta(hours=settings.SCAN_MAX_AGE_HOURS)
+    stmt = (
+        select(Subscription.id, Subscription.vehicle_id, Subscription.valid_from, Subscription.valid_to, Plan.type)
+        .join(Plan, Plan.id == Subscription.plan_id)
+        .where(Subscription.status == "active", Subscription.valid_to > horizon)
+    )
+    if vehicle_id is not None:
+        stmt = stmt.where(Subscription.vehicle_id == vehicle_id)
+    return stmt
+
 
 class SubscriptionRepository:
     def __init__(self, db: Session):
@@ -30,6 +51,12 @@ class SubscriptionRepository:
             .all()
         )
 
+    def page_by_vehicle(
+        self, vehicle_id: int, *, after_id: Optional[int], limit: Optional[int], count: str = "none"
+    ) -> Page[Subscription]:
+        stmt = select(Subscription).where(Subscription.vehicle_id == vehicle_id)
+        return paginate(self.db, stmt, key=Subscription.id, after_id=after_id, limit=limit, count=count)
+
     def has_overlapping_active(self, vehicle_id: int, start: datetime, end: datetime) -> bool:
         q = (
             self.db.query(Subscription)
@@ -162,6 +189,10 @@ class SubscriptionRepository:
         self.db.commit()
         return int(updated)
 
+    def list_active_windows(self, vehicle_id: Optional[int] = None) -> list:
+        """Rows for services/subscription_index.py, for one vehicle or all of them."""
+        return self.db.execute(_active_windows_stmt(vehicle_id)).all()
+
     def has_active_now(self, vehicle_id: int) -> bool:
         """
         True if the vehicle currently has an active subscription (now falls in window).
@@ -197,3 +228,13 @@ class SubscriptionRepository:
         self.db.commit()
         self.db.refresh(sub)
         return sub
+
+
+class AsyncSubscriptionRepository:
+    """Async subset of SubscriptionRepository used by the gate hot path."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def list_active_windows(self, vehicle_id: Optional[int] = None) -> list:
+        return (await self.db.execute(_active_windows_stmt(vehicle_id))).all()
@@ -1,6 +1,92 @@
-from sqlalchemy import func
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import case, false, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from ..models.vehicle import Vehicle
+from ..models.subscription import Subscription
+from ..models.vehicle import Vehicle, make_plate_key, make_plate_match_key
+from .pagination import Page, paginate
+
+
+def _has_active_subscription(at: datetime):
+    """Correlated EXISTS: the vehicle has an active subscription (any plan) covering `at`."""
+    return (
+        select(Subscription.id)
+        .where(
+            Subscription.vehicle_id == Vehicle.id,
+            Subscription.status == "active",
+            Subscription.valid_from <= at,
+            Subscription.valid_to > at,
+        )
+        .exists()
+    )
+
+
+def plate_resolution_order(plate_key):
+    """
+    Tie-break among vehicles sharing a plate_match_key: the exact spelling read
+    at the gate wins, then the oldest vehicle (lowest id), i.e. the registered
+    row rather than a visitor auto-created later from a misread.
+    """
+    return case((Vehicle.plate_key == plate_key, 0), else_=1), Vehicle.id
+
+
+def _resolve_plate_stmt(region_code: str, plate_text: str):
+    # one probe of ix_vehicles_plate_match_key; the tie-break only sorts collisions
+    return (
+        select(Vehicle)
+        .where(Vehicle.plate_match_key == make_plate_match_key(region_code, plate_text))
+        .order_by(*plate_resolution_order(make_plate_key(region_code, plate_text)))
+        .limit(1)
+    )
+
+
+def _collisions_stmt(limit: int):
+    shared = (
+        select(Vehicle.plate_match_key)
+        .group_by(Vehicle.plate_match_key)
+        .having(func.count() > 1)
+        .order_by(Vehicle.plate_match_key)
+        .limit(limit)
+    )
+    return (
+        select(Vehicle)
+        .where(Vehicle.plate_match_key.in_(shared.scalar_subquery()))
+        .order_by(Vehicle.plate_match_key, Vehicle.id)
+    )
+
+
+def _group_collisions(vehicles) -> list[list[Vehicle]]:
+    groups: dict[str, list[Vehicle]] = {}
+    for v in vehicles:
+        groups.setdefault(v.plate_match_key, []).append(v)
+    return list(groups.values())
+
+
+def _plate_search(q: str, dialect: str):
+    """
+    (filter, rank) for a substring search over plate_key ('REGION:PLATE',
+    uppercased), so one pattern covers region and plate. On PostgreSQL the
+    LIKE is served by the trigram index ix_vehicles_plate_key_trgm and hits
+    are ranked by similarity(); SQLite scans and ranks shorter keys first,
+    i.e. the ones the query covers most of.
+    """
+    needle = q.strip().upper()
+    escaped = needle.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    match = Vehicle.plate_key.like(f"%{escaped}%", escape="\\")
+    if dialect == "postgresql":
+        return match, func.similarity(Vehicle.plate_key, needle).desc()
+    return match, func.length(Vehicle.plate_key).asc()
+
+
+def _access_status_filter(status: str, subscribed):
+    if status == "suspended":
+        return Vehicle.is_blacklisted.is_(True)
+    if status == "authorized":
+        return Vehicle.is_blacklisted.is_(False) & subscribed
+    if status == "pending":
+        return Vehicle.is_blacklisted.is_(False) & ~subscribed
+    return false()
 
 class VehicleRepository:
     def __init__(self, db: Session):
@@ -23,13 +109,21 @@ class VehicleRepository:
     def get_by_plate(self, region_code: str, plate_text: str) -> Vehicle | None:
         return (
             self.db.query(Vehicle)
-            .filter(
-                func.upper(Vehicle.region_code) == region_code.upper(),
-                func.upper(Vehicle.plate_text) == plate_text.upper(),
-            )
+            .filter(Vehicle.plate_key == make_plate_key(region_code, plate_text))
             .first()
         )
 
+    def resolve_plate(self, region_code: str, plate_text: str) -> Vehicle | None:
+        """
+        Gate lookup tolerant of OCR confusions ("C81234A7" finds "CB1234AT").
+        Collisions are settled by plate_resolution_order.
+        """
+        return self.db.scalars(_resolve_plate_stmt(region_code, plate_text)).first()
+
+    def plate_collisions(self, limit: int = 100) -> list[list[Vehicle]]:
+        """Vehicles grouped by shared plate_match_key, oldest first in each group."""
+        return _group_collisions(self.db.scalars(_collisions_stmt(limit)).all())
+
     def list_by_driver(self, driver_id: int) -> list[Vehicle]:
         return (
             self.db.query(Vehicle)
@@ -37,6 +131,60 @@ class VehicleRepository:
             .order_by(Vehicle.id.desc())
             .all()
         )
+
+    def search_with_access_status(
+        self,
+        *,
+        at: datetime,
+        q: str = "",
+        driver_id: Optional[int] = None,
+        is_blacklisted: Optional[bool] = None,
+        status: Optional[str] = None,
+        after_id: Optional[int] = None,
+        limit: int = 50,
+        count: str = "exact",
+    ) -> Page[tuple[Vehicle, str]]:
+        """
+        One page of (vehicle, access_status) newest first, plus the total matching
+        the same filters. access_status is derived in SQL (suspended | authorized |
+        pending), so filtering on it happens before pagination and counting:
+        at most two statements whatever the page size. With `q`, the page is
+        ranked by relevance instead (see _plate_search) and has no cursor.
+        """
+        subscribed = _has_active_subscription(at)
+        filters = []
+        if driver_id is not None:
+            filters.append(Vehicle.driver_id == driver_id)
+        rank = None
+        if q and q.strip():
+            match, rank = _plate_search(q, self.db.get_bind().dialect.name)
+            filters.append(match)
+            if after_id is not None:
+                rank = None  # a cursor continues the id order
+        if is_blacklisted is not None:
+            filters.append(Vehicle.is_blacklisted == is_blacklisted)
+        if status:
+            filters.append(_access_status_filter(status, subscribed))
+
+        access_status = case(
+            (Vehicle.is_blacklisted.is_(True), "suspended"),
+            (subscribed, "authorized"),
+            else_="pending",
+        ).label("access_status")
+        return paginate(
+            self.db,
+            select(Vehicle, access_status).where(*filters),
+            key=Vehicle.id,
+            after_id=after_id,
+            limit=limit,
+            count=count,
+            rank=rank,
+        )
+
+    def blacklist_flag(self, vehicle_id: int) -> bool | None:
+        """The vehicle's is_blacklisted by primary key; None if the vehicle no longer exists."""
+        return self.db.scalar(select(Vehicle.is_blacklisted).where(Vehicle.id == vehicle_id))
+
     def set_blacklist(self, vehicle_id: int, blacklisted: bool) -> Vehicle | None:
         v = self.db.get(Vehicle, vehicle_id)
         if not v:
@@ -56,4 +204,34 @@ class VehicleRepository:
 
         self.db.delete(v)
         self.db.commit()
-        return True
\ No newline at end of file
+        return True
+
+
+class AsyncVehicleRepository:
+    """Async subset of VehicleRepository used by the gate hot path."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, *, driver_id: int, region_code: str, plate_text: str) -> Vehicle:
+        v = Vehicle(
+            driver_id=driver_id,
+            region_code=region_code.upper().strip(),
+            plate_text=plate_text.upper().strip(),
+        )
+        self.db.add(v)
+        await self.db.commit()
+        await self.db.refresh(v)
+        return v
+
+    async def get_by_plate(self, region_code: str, plate_text: str) -> Vehicle | None:
+        return await self.db.scalar(
+            select(Vehicle).where(Vehicle.plate_key == make_plate_key(region_code, plate_text)).limit(1)
+        )
+
+    async def resolve_plate(self, region_code: str, plate_text: str) -> Vehicle | None:
+        return await self.db.scalar(_resolve_plate_stmt(region_code, plate_text))
+
+    async def blacklist_flag(self, vehicle_id: int) -> bool | None:
+        """See VehicleRepository.blacklist_flag."""
+        return await self.db.scalar(select(Vehicle.is_blacklisted).where(Vehicle.id == vehicle_id))
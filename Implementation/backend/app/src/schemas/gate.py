@@ -0,0 +1,32 @@
+from enum import Enum
+from typing import Optional
+from pydantic import BaseModel, Field
+
+class GateDirection(str, Enum):
+    entry = "entry"
+    exit = "exit"
+    both = "both"
+
+class GateBase(BaseModel):
+    gate_id: str = Field(min_length=1, max_length=64, description="Id the recognizer sends with each scan")
+    name: Optional[str] = Field(default=None, max_length=120)
+    direction: GateDirection = GateDirection.both
+    barrier_base_url: Optional[str] = Field(default=None, max_length=255, description="e.g. http://192.168.1.160:5000")
+    pulse_seconds: int = Field(default=5, ge=1, le=60)
+    timeout_ms: Optional[int] = Field(default=None, ge=50, le=10_000)
+    is_active: bool = True
+
+class GateCreate(GateBase):
+    pass
+
+class GateUpdate(BaseModel):
+    name: Optional[str] = Field(default=None, max_length=120)
+    direction: Optional[GateDirection] = None
+    barrier_base_url: Optional[str] = Field(default=None, max_length=255)
+    pulse_seconds: Optional[int] = Field(default=None, ge=1, le=60)
+    timeout_ms: Optional[int] = Field(default=None, ge=50, le=10_000)
+    is_active: Optional[bool] = None
+
+class GateRead(GateBase):
+    id: int
+    model_config = {"from_attributes": True}
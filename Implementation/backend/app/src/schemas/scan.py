@@ -1,12 +1,25 @@
 # backend/app/src/schemas/scan.py
-from datetime import datetime
-from pydantic import BaseModel, Field
+from datetime import datetime, timezone
+from enum import Enum
+from pydantic import BaseModel, Field, field_validator
+
+# upper bound for one POST /scans/batch; recognizers page larger backlogs
+SCAN_BATCH_MAX_EVENTS = 5000
+
+def _assume_utc(v: datetime | None) -> datetime | None:
+    # recognizers send UTC; a naive timestamp is taken as UTC
+    if v is None or v.tzinfo is not None:
+        return v
+    return v.replace(tzinfo=timezone.utc)
 
 class EntryScanRequest(BaseModel):
     region_code: str = Field(..., min_length=1, max_length=10)
     plate_text: str = Field(..., min_length=2, max_length=16)
     gate_id: str | None = None
     source: str | None = None
+    captured_at: datetime | None = None  # when the camera saw the plate; defaults to now
+
+    _utc = field_validator("captured_at")(_assume_utc)
 
 class EntryScanResponse(BaseModel):
     session_id: int
@@ -21,6 +34,9 @@ class ExitScanRequest(BaseModel):
     plate_text: str = Field(..., min_length=2, max_length=16)
     gate_id: str | None = None
     source: str | None = None
+    captured_at: datetime | None = None  # session end + pricing use this; defaults to now
+
+    _utc = field_validator("captured_at")(_assume_utc)
 
 class ExitScanResponse(BaseModel):
     session_id: int | None = None
@@ -33,3 +49,37 @@ class ExitScanResponse(BaseModel):
     currency: str | None = None
     minutes_billable: int | None = None
     plan_id: int | None = None
+
+
+class ScanDirection(str, Enum):
+    entry = "entry"
+    exit = "exit"
+
+class BatchScanEvent(BaseModel):
+    direction: ScanDirection
+    region_code: str = Field(..., min_length=1, max_length=10)
+    plate_text: str = Field(..., min_length=2, max_length=16)
+    gate_id: str | None = None
+    source: str | None = None
+    captured_at: datetime
+    # the Idempotency-Key the event was (or would have been) posted with on its own;
+    # an event already decided under it is answered with that decision
+    idempotency_key: str | None = Field(default=None, min_length=1, max_length=200)
+
+    _utc = field_validator("captured_at")(_assume_utc)
+
+class BatchScanRequest(BaseModel):
+    events: list[BatchScanEvent] = Field(..., min_length=1, max_length=SCAN_BATCH_MAX_EVENTS)
+
+class BatchScanResult(BaseModel):
+    index: int                  # position in the request
+    direction: ScanDirection
+    status_code: int            # what the single-event endpoint would have answered
+    result: EntryScanResponse | ExitScanResponse | None = None
+    error: str | None = None
+    replayed: bool = False      # answered from the decision recorded under its idempotency_key
+
+class BatchScanResponse(BaseModel):
+    processed: int
+    failed: int
+    results: list[BatchScanResult]  # request order
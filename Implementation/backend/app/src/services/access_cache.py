@@ -0,0 +1,147 @@
+# backend/app/src/services/access_cache.py
+from collections import OrderedDict
+from dataclasses import dataclass
+import threading
+import time
+
+from ..core.settings import settings
+from ..models.vehicle import make_plate_match_key
+
+
+@dataclass(frozen=True)
+class PlateAccess:
+    """
+    The vehicle a plate read resolves to. Only this is cached: the blacklist
+    flag and the open session are read from the DB on every scan, because
+    other API workers change them and this cache can't see their writes.
+    """
+    vehicle_id: int
+
+
+class PlateAccessCache:
+    """
+    Bounded LRU + TTL cache of plate -> vehicle resolutions, keyed by the
+    plate_key read at the gate. OCR confusions mean one vehicle can sit under
+    several keys ("CB1234AT", "C81234A7"); invalidate_vehicle() drops all of them.
+
+    Only writes that change which vehicle a plate resolves to matter here:
+    - registering a vehicle: call invalidate_plate(), which drops every key in
+      the new plate's confusion class, since an exact plate_key now beats the
+      folded match a key was cached under (VehicleRepository.resolve_plate)
+    - deleting a vehicle: call invalidate_vehicle() and invalidate_plate()
+    Blacklisting, sessions, subscriptions and payments don't touch the
+    mapping, so they don't invalidate anything.
+
+    The TTL bounds staleness for writes made by other API workers, which this
+    in-process cache can't see; the gate drops an entry whose vehicle is gone.
+    """
+
+    def __init__(self, *, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple[float, PlateAccess]]" = OrderedDict()
+        self._keys_by_vehicle: dict[int, set[str]] = {}
+        self._keys_by_match: dict[str, set[str]] = {}
+        self._reset_counters()
+
+    def _reset_counters(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _match_key(plate_key: str) -> str:
+        return make_plate_match_key(*plate_key.split(":", 1))
+
+    @staticmethod
+    def _unindex(index: dict, name, key: str) -> None:
+        keys = index.get(name)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del index[name]
+
+    def _drop(self, key: str) -> None:
+        _, access = self._entries.pop(key)
+        self._unindex(self._keys_by_vehicle, access.vehicle_id, key)
+        self._unindex(self._keys_by_match, self._match_key(key), key)
+
+    def get(self, plate_key: str) -> PlateAccess | None:
+        if self.max_entries <= 0:
+            return None
+        with self._lock:
+            item = self._entries.get(plate_key)
+            if item is None:
+                self.misses += 1
+                return None
+            expires_at, access = item
+            if expires_at <= time.monotonic():
+                self._drop(plate_key)
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(plate_key)
+            self.hits += 1
+            return access
+
+    def put(self, plate_key: str, access: PlateAccess) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if plate_key in self._entries:
+                self._drop(plate_key)
+            self._entries[plate_key] = (time.monotonic() + self.ttl_seconds, access)
+            self._keys_by_vehicle.setdefault(access.vehicle_id, set()).add(plate_key)
+            self._keys_by_match.setdefault(self._match_key(plate_key), set()).add(plate_key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def invalidate_plate(self, region_code: str, plate_text: str) -> None:
+        """Drop every cached key that shares the plate's match key (its OCR confusion class)."""
+        match_key = make_plate_match_key(region_code, plate_text)
+        with self._lock:
+            for key in list(self._keys_by_match.get(match_key, ())):
+                self._drop(key)
+                self.invalidations += 1
+
+    def invalidate_vehicle(self, vehicle_id: int | None) -> None:
+        if vehicle_id is None:
+            return
+        with self._lock:
+            for key in list(self._keys_by_vehicle.get(vehicle_id, ())):
+                self._drop(key)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_vehicle.clear()
+            self._keys_by_match.clear()
+            self._reset_counters()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# One cache per API process, shared by every GateService instance
+plate_access_cache = PlateAccessCache(
+    max_entries=settings.GATE_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.GATE_CACHE_TTL_SECONDS,
+)
@@ -2,6 +2,8 @@ from typing import Optional
 from sqlalchemy.orm import Session
 from ..repositories.vehicle_sqlalchemy import VehicleRepository
 from ..repositories.subscription_sqlalchemy import SubscriptionRepository
+from .access_cache import plate_access_cache
+from .subscription_index import subscription_index
 from ..models.audit import AuditEvent
 from ..models.vehicle import Vehicle
 
@@ -25,6 +27,7 @@ class AccessListService:
 
         # Hard-cancel any currently active subscriptions for that vehicle
         self.subs.cancel_all_active_for_vehicle(vehicle_id)
+        subscription_index.refresh_vehicle(self.subs, vehicle_id)
 
         self._audit(
             admin_id=admin_id, vehicle_id=vehicle_id, action="vehicle.blacklist", reason=reason
@@ -47,6 +50,7 @@ class AccessListService:
         if resume_suspended:
             # If you still want an escape hatch, allow explicit resume.
             self.subs.resume_all_for_vehicle(vehicle_id)
+            subscription_index.refresh_vehicle(self.subs, vehicle_id)
 
         self._audit(
             admin_id=admin_id, vehicle_id=vehicle_id, action="vehicle.whitelist", reason=reason
@@ -71,3 +75,6 @@ class AccessListService:
         ok = self.vehicles.delete_if_blacklisted(vehicle_id)
         if not ok:
             raise ValueError("delete_failed")
+        plate_access_cache.invalidate_vehicle(vehicle_id)
+        plate_access_cache.invalidate_plate(v.region_code, v.plate_text)  # its plate class may resolve elsewhere now
+        subscription_index.refresh_vehicle(self.subs, vehicle_id)
@@ -0,0 +1,166 @@
+# backend/app/src/services/barrier.py
+from collections import deque
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..core.settings import settings
+
+
+class BarrierDispatcher:
+    """
+    Sends barrier commands to the Raspberry Pi LED servers off the request path.
+
+    - one bounded queue + worker thread per gate, so commands to a lane stay ordered
+      and a slow Pi only delays its own lane
+    - one pooled keep-alive requests.Session shared by all workers
+    - bounded retries with exponential backoff
+    - latency / failure counters for /api/scans/metrics
+
+    When a gate's queue is full the oldest command is dropped: the newest
+    decision is the one the barrier should reflect.
+    """
+
+    def __init__(
+        self,
+        *,
+        timeout: float,
+        max_retries: int,
+        backoff_seconds: float,
+        queue_size: int,
+        http: requests.Session | None = None,
+    ):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.queue_size = queue_size
+
+        if http is None:
+            http = requests.Session()
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=0)
+            http.mount("http://", adapter)
+            http.mount("https://", adapter)
+        self.http = http
+
+        self._lock = threading.Lock()
+        self._queues: dict[str, deque] = {}
+        self._conds: dict[str, threading.Condition] = {}
+        self._workers: dict[str, threading.Thread] = {}
+        self._stopping = False
+        self._reset_counters()
+
+    def _reset_counters(self) -> None:
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.dropped = 0
+        self._latency_total_ms = 0.0
+        self._latency_max_ms = 0.0
+        self._latencies_ms: deque = deque(maxlen=512)
+
+    # ---------- producer side ----------
+    def submit(
+        self, gate: str, url: str, payload: dict | None = None, *, timeout: float | None = None
+    ) -> None:
+        """Queue a POST to `url` for `gate` and return immediately."""
+        with self._lock:
+            if self._stopping:
+                return
+            q = self._queues.get(gate)
+            if q is None:
+                q = self._queues[gate] = deque()
+                self._conds[gate] = threading.Condition(self._lock)
+                worker = threading.Thread(
+                    target=self._run, args=(gate,), name=f"barrier-{gate}", daemon=True
+                )
+                self._workers[gate] = worker
+                worker.start()
+            if len(q) >= self.queue_size:
+                q.popleft()
+                self.dropped += 1
+            q.append((url, payload, timeout or self.timeout))
+            self._conds[gate].notify()
+
+    # ---------- worker side ----------
+    def _run(self, gate: str) -> None:
+        q, cond = self._queues[gate], self._conds[gate]
+        while True:
+            with cond:
+                while not q and not self._stopping:
+                    cond.wait()
+                if not q:
+                    return  # stopping and drained
+                url, payload, timeout = q.popleft()
+            self._send(url, payload, timeout)
+
+    def _send(self, url: str, payload: dict | None, timeout: float | None = None) -> bool:
+        for attempt in range(self.max_retries + 1):
+            t0 = time.perf_counter()
+            try:
+                r = self.http.post(url, json=payload, timeout=timeout or self.timeout)
+                r.raise_for_status()
+            except Exception as e:
+                if attempt < self.max_retries:
+                    with self._lock:
+                        self.retried += 1
+                    time.sleep(self.backoff_seconds * (2 ** attempt))
+                    continue
+                with self._lock:
+                    self.failed += 1
+                print(f"[BARRIER] {url} failed after {attempt + 1} attempt(s): {e}")
+                return False
+            ms = (time.perf_counter() - t0) * 1000.0
+            with self._lock:
+                self.sent += 1
+                self._latency_total_ms += ms
+                self._latency_max_ms = max(self._latency_max_ms, ms)
+                self._latencies_ms.append(ms)
+            return True
+        return False
+
+    # ---------- lifecycle / metrics ----------
+    def shutdown(self, timeout: float = 2.0) -> None:
+        """
+        Stop accepting commands, let workers drain their queues, close the pool.
+        The dispatcher can be used again afterwards; workers restart lazily.
+        """
+        with self._lock:
+            self._stopping = True
+            for cond in self._conds.values():
+                cond.notify_all()
+            workers = list(self._workers.values())
+        deadline = time.monotonic() + timeout
+        for w in workers:
+            w.join(max(0.0, deadline - time.monotonic()))
+        self.http.close()
+        with self._lock:
+            self._queues.clear()
+            self._conds.clear()
+            self._workers.clear()
+            self._stopping = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            recent = sorted(self._latencies_ms)
+            p95 = recent[min(len(recent) - 1, int(0.95 * len(recent)))] if recent else 0.0
+            return {
+                "sent": self.sent,
+                "failed": self.failed,
+                "retried": self.retried,
+                "dropped": self.dropped,
+                "queued": {gate: len(q) for gate, q in self._queues.items()},
+                "latency_ms_avg": round(self._latency_total_ms / self.sent, 2) if self.sent else 0.0,
+                "latency_ms_p95": round(p95, 2),
+                "latency_ms_max": round(self._latency_max_ms, 2),
+            }
+
+
+# One dispatcher per API process
+barrier_dispatcher = BarrierDispatcher(
+    timeout=settings.BARRIER_TIMEOUT_SECONDS,
+    max_retries=settings.BARRIER_MAX_RETRIES,
+    backoff_seconds=settings.BARRIER_RETRY_BACKOFF_SECONDS,
+    queue_size=settings.BARRIER_QUEUE_SIZE,
+)
@@ -1,5 +1,6 @@
 from ..models.driver import Driver
 from ..repositories.driver_sqlalchemy import DriverRepository
+from ..repositories.pagination import Page
 
 class DriverService:
     def __init__(self, repo: DriverRepository):
@@ -15,3 +16,6 @@ class DriverService:
 
     def list(self) -> list[Driver]:
         return self.repo.list()
+
+    def page(self, *, after_id: int | None, limit: int | None, count: str = "none") -> Page[Driver]:
+        return self.repo.page(after_id=after_id, limit=limit, count=count)
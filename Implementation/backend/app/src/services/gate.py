@@ -1,13 +1,20 @@
 # backend/app/src/services/gate.py
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
-import requests
 
+from .access_cache import PlateAccess, plate_access_cache
+from .barrier import barrier_dispatcher
+from .gate_registry import gate_registry
+from .plan_catalog import plan_catalog
+from .subscription_index import subscription_index
 from .pricing import compute_amount_cents
 from ..core.settings import settings
+from ..models.vehicle import make_plate_key
+from ..repositories.gate_sqlalchemy import GateRepository
 from ..repositories.plan_sqlalchemy import PlanRepository
-from ..repositories.session_sqlalchemy import ParkingSessionRepository
+from ..repositories.session_sqlalchemy import ExitContext, ParkingSessionRepository
 from ..repositories.vehicle_sqlalchemy import VehicleRepository
 from ..repositories.driver_sqlalchemy import DriverRepository  # uses helpers below
 from ..repositories.subscription_sqlalchemy import SubscriptionRepository
@@ -21,44 +28,159 @@ VISITOR_DRIVER_NAME = "Visitor"
 IDEMPOTENCY_WINDOW = timedelta(minutes=5)
 
 
-def _barrier_pulse_open(seconds: int = 5):
+def _scan_time(captured_at: datetime | None) -> datetime:
     """
-    Ask the Raspberry Pi LED server to pulse green (open) for N seconds,
-    then it will go back to red (closed).
-    If BARRIER_PI_BASE_URL is not configured, this is a no-op.
+    The moment the scan happened: the recognizer's captured_at when it sent one
+    (so retries and replays aren't billed for the delay), else now. Rejects
+    timestamps too far in the future (bad clock) or older than SCAN_MAX_AGE_HOURS.
     """
-    base = getattr(settings, "BARRIER_PI_BASE_URL", None)
-    if not base:
+    now = datetime.now(timezone.utc)
+    if captured_at is None:
+        return now
+    if captured_at.tzinfo is None:
+        captured_at = captured_at.replace(tzinfo=timezone.utc)
+    if captured_at - now > timedelta(seconds=settings.SCAN_MAX_CLOCK_SKEW_SECONDS):
+        raise HTTPException(status_code=422, detail="captured_at_in_future")
+    if now - captured_at > timedelta(hours=settings.SCAN_MAX_AGE_HOURS):
+        raise HTTPException(status_code=422, detail="captured_at_too_old")
+    return min(captured_at, now)
+
+
+def _check_gate_direction(gate_id: str | None, direction: str, gates: GateRepository | None = None) -> None:
+    """Reject a scan from a lane registered for the other direction only, before anything is written."""
+    if not gate_registry.allows(gate_id, direction, gates):
+        raise HTTPException(status_code=422, detail="gate_direction_mismatch")
+
+
+def _barrier_pulse_open(
+    seconds: int | None = None,
+    gate_id: str | None = None,
+    gates: GateRepository | None = None,
+):
+    """
+    Ask the lane's Raspberry Pi LED server to pulse green (open) for N seconds,
+    then it will go back to red (closed). N defaults to the gate's pulse_seconds.
+    The Pi is looked up in the gate registry (see GateRegistry.resolve) and
+    the command is queued on the barrier dispatcher; this never blocks the scan.
+    If the gate is unknown or has no barrier URL configured, this is a no-op.
+    """
+    gate = gate_registry.resolve(gate_id, gates)
+    if gate is None or not gate.barrier_base_url:
         return
 
-    base = base.rstrip("/")
-    try:
-        requests.post(
-            f"{base}/led/pulse",
-            json={"seconds": seconds},
-            timeout=0.5,
-        )
-    except Exception as e:
-        print(f"[BARRIER] Failed to pulse open: {e}")
+    barrier_dispatcher.submit(
+        gate.gate_id,
+        f"{gate.barrier_base_url}/led/pulse",
+        {"seconds": seconds or gate.pulse_seconds},
+        timeout=gate.timeout_seconds,
+    )
 
 
-def _barrier_force_close():
+def _barrier_force_close(gate_id: str | None = None, gates: GateRepository | None = None):
     """
-    Force the barrier into CLOSED state (red on).
-    If BARRIER_PI_BASE_URL is not configured, this is a no-op.
+    Force the lane's barrier into CLOSED state (red on).
+    Routed and queued like _barrier_pulse_open.
+    If the gate is unknown or has no barrier URL configured, this is a no-op.
     """
-    base = getattr(settings, "BARRIER_PI_BASE_URL", None)
-    if not base:
+    gate = gate_registry.resolve(gate_id, gates)
+    if gate is None or not gate.barrier_base_url:
         return
 
-    base = base.rstrip("/")
-    try:
-        requests.post(
-            f"{base}/led/close",
-            timeout=0.5,
-        )
-    except Exception as e:
-        print(f"[BARRIER] Failed to force close: {e}")
+    barrier_dispatcher.submit(
+        gate.gate_id,
+        f"{gate.barrier_base_url}/led/close",
+        timeout=gate.timeout_seconds,
+    )
+
+
+# ---------- decisions (pure: GateService and AsyncGateService only differ in I/O) ----------
+def _entry_response(sess, created: bool) -> dict:
+    return {
+        "status": "open",
+        "reason": "created" if created else "existing_open_session",
+        "session_id": sess.id,
+        "barrier_action": "open",
+        "created_at_utc": sess.started_at,
+    }
+
+
+def _awaiting_payment_response(s, plan) -> dict:
+    return {
+        "session_id": s.id,
+        "status": "awaiting_payment",
+        "barrier_action": "hold",
+        "detail": "visitor_exit_payment_required",
+        "amount_cents": s.amount_charged,
+        "currency": plan.currency if plan else None,
+        "minutes_billable": s.duration,
+        "plan_id": s.plan_id,
+    }
+
+
+@dataclass
+class ExitDecision:
+    response: dict
+    open_barrier: bool     # False: hold (force the barrier closed)
+    commit: bool = False   # the open session was ended or priced in place
+
+
+def _decide_exit(
+    ctx: ExitContext, now: datetime, *, gate_id: str | None, subscribed: bool, visitor_plan
+) -> ExitDecision:
+    """
+    Exit logic, on the state the caller already loaded:
+    - No vehicle, or nothing open: hold. A session already priced and awaiting
+      payment gets the same quote again (idempotent for visitors).
+    - Subscribed at capture time -> end the session, open the barrier.
+    - Else visitor: priced up to capture time; hold, await payment (or open when
+      the grace period makes it free and GRACE_AUTOCLOSE_ENABLED).
+    Writes go to the loaded session object; the caller commits when told to.
+    """
+    if not ctx.vehicle:
+        return ExitDecision({"session_id": None, "status": "error", "barrier_action": "hold",
+                             "detail": "vehicle_not_found"}, open_barrier=False)
+
+    s = ctx.session
+    if not s:
+        if ctx.awaiting:
+            return ExitDecision(_awaiting_payment_response(ctx.awaiting, ctx.awaiting_plan), open_barrier=False)
+        return ExitDecision({"session_id": None, "status": "error", "barrier_action": "hold",
+                             "detail": "no_open_session_for_vehicle"}, open_barrier=False)
+
+    if subscribed:
+        s.ended_at = now
+        return ExitDecision({"session_id": s.id, "status": "closed", "barrier_action": "open",
+                             "detail": "subscriber_exit"}, open_barrier=True, commit=True)
+
+    # ---------- Visitor branch ----------
+    # already priced & awaiting payment: re-use the same quote
+    if s.status == "awaiting_payment" and s.amount_charged is not None:
+        return ExitDecision(_awaiting_payment_response(s, ctx.session_plan), open_barrier=False)
+
+    if not visitor_plan or visitor_plan.price_per_minute_cents is None:
+        return ExitDecision({"session_id": s.id, "status": "error", "barrier_action": "hold",
+                             "detail": "visitor_plan_not_configured"}, open_barrier=False)
+
+    amount_cents, minutes = compute_amount_cents(
+        s.started_at,
+        now,
+        visitor_plan.price_per_minute_cents,
+        settings.PRICING_GRACE_MINUTES,
+        settings.PRICING_ROUND_UP,
+    )
+    s.plan_id = visitor_plan.id
+    s.ended_at = now
+    s.duration = minutes
+    s.amount_charged = amount_cents
+    s.exit_gate_id = gate_id  # payment webhooks open this lane
+
+    if settings.GRACE_AUTOCLOSE_ENABLED and amount_cents == 0:
+        s.status = "closed"
+        return ExitDecision({"session_id": s.id, "status": "closed", "barrier_action": "open",
+                             "detail": "grace_exit_free"}, open_barrier=True, commit=True)
+
+    s.status = "awaiting_payment"
+    return ExitDecision(_awaiting_payment_response(s, visitor_plan), open_barrier=False, commit=True)
 
 
 class GateService:
@@ -69,6 +191,8 @@ class GateService:
         self.drivers = DriverRepository(db)
         self.subs = SubscriptionRepository(db)
         self.plans = PlanRepository(db)
+        self.gates = GateRepository(db)
+        self.cache = plate_access_cache
 
     def _ensure_visitor_driver(self):
         d = self.drivers.get_by_email(VISITOR_MODE_ENABLED and VISITOR_DRIVER_EMAIL)
@@ -76,20 +200,23 @@ class GateService:
             return d
         return self.drivers.create(name=VISITOR_DRIVER_NAME, email=VISITOR_DRIVER_EMAIL)
 
-    def handle_entry_scan(
-        self,
-        *,
-        region_code: str,
-        plate_text: str,
-        gate_id: str | None,
-        source: str | None,
-    ):
-        now = datetime.now(timezone.utc)
-        region_code = region_code.strip().upper()
-        plate_text = plate_text.strip().upper()
+    def _load_access(self, *, region_code: str, plate_text: str) -> tuple[PlateAccess, bool]:
+        """
+        Resolve the plate to its vehicle, from the cache when possible, and
+        read its blacklist flag fresh. On a miss: find or auto-register the
+        vehicle. The open session is not looked up here; entry resolves it
+        atomically via get_or_create_open.
+        """
+        key = make_plate_key(region_code, plate_text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            blacklisted = self.vehicles.blacklist_flag(cached.vehicle_id)
+            if blacklisted is not None:
+                return cached, blacklisted
+            self.cache.invalidate_vehicle(cached.vehicle_id)  # deleted by another worker
 
         # 1) Find or auto-register vehicle (if visitor mode is on)
-        vehicle = self.vehicles.get_by_plate(region_code=region_code, plate_text=plate_text)
+        vehicle = self.vehicles.resolve_plate(region_code=region_code, plate_text=plate_text)
         if vehicle is not None:
             self.db.refresh(vehicle)  # ensure fresh values (is_blacklisted)
 
@@ -105,41 +232,43 @@ class GateService:
                 plate_text=plate_text,
             )
 
+        access = PlateAccess(vehicle_id=vehicle.id)
+        self.cache.put(key, access)
+        return access, bool(getattr(vehicle, "is_blacklisted", False))
+
+    def handle_entry_scan(
+        self,
+        *,
+        region_code: str,
+        plate_text: str,
+        gate_id: str | None,
+        source: str | None,
+        captured_at: datetime | None = None,
+    ):
+        now = _scan_time(captured_at)
+        region_code = region_code.strip().upper()
+        plate_text = plate_text.strip().upper()
+        _check_gate_direction(gate_id, "entry", self.gates)
+
+        access, blacklisted = self._load_access(region_code=region_code, plate_text=plate_text)
+
         # 2) Blacklist check (you only have blacklist flag in RM – keep it simple)
-        if getattr(vehicle, "is_blacklisted", False):
+        if blacklisted:
             # No session created, barrier stays closed
-            _barrier_force_close()
+            _barrier_force_close(gate_id=gate_id, gates=self.gates)
             raise HTTPException(status_code=403, detail="blacklisted")
 
-        # 3) Idempotency: if there's any OPEN session, reuse it
-        active = self.sessions.get_active_for_vehicle(vehicle.id)
-        if active:
-            # Barrier should open (same as before: barrier_action="open")
-            _barrier_pulse_open(seconds=5)
-            return {
-                "status": "open",
-                "reason": "existing_open_session",
-                "session_id": active.id,
-                "barrier_action": "open",
-                "created_at_utc": active.started_at,
-            }
-
-        # 4) Create new open session (ended_at NULL == open)
-        new_sess = self.sessions.create(
-            vehicle_id=vehicle.id,
-            started_at=now,  # explicit UTC
+        # 3) Open a session, or get the one already open (ended_at NULL == open).
+        #    One statement; the partial unique index makes it safe across workers,
+        #    so a session closed by another worker is never reused.
+        sess, created = self.sessions.get_or_create_open(
+            access.vehicle_id,
+            started_at=now,  # capture time, UTC
         )
 
         # Ask the Pi to open the barrier (green for N seconds then red)
-        _barrier_pulse_open(seconds=5)
-
-        return {
-            "status": "open",
-            "reason": "created",
-            "session_id": new_sess.id,
-            "barrier_action": "open",
-            "created_at_utc": new_sess.started_at,
-        }
+        _barrier_pulse_open(gate_id=gate_id, gates=self.gates)
+        return _entry_response(sess, created)
 
     def handle_exit_scan(
         self,
@@ -148,144 +277,28 @@ class GateService:
         plate_text: str,
         gate_id: str | None,
         source: str | None,
+        captured_at: datetime | None = None,
     ):
-        """
-        Exit logic:
-        - Find vehicle and its open session.
-        - If already ended, return idempotent 'closed'/'open'.
-        - If active subscription (plan.type == 'subscription') at NOW -> end session, open barrier.
-        - Else -> visitor: hold barrier, await payment (Stripe story next).
-        """
-        now = datetime.now(timezone.utc)
+        """Exit: load the state in one statement, decide (_decide_exit), write, move the barrier."""
+        now = _scan_time(captured_at)
         region_code = region_code.strip().upper()
         plate_text = plate_text.strip().upper()
+        _check_gate_direction(gate_id, "exit", self.gates)
 
-        vehicle = self.vehicles.get_by_plate(region_code=region_code, plate_text=plate_text)
-        if not vehicle:
-            # Unknown vehicle at exit: hold (no session to close)
-            _barrier_force_close()
-            return {
-                "session_id": None,
-                "status": "error",
-                "barrier_action": "hold",
-                "detail": "vehicle_not_found",
-            }
-
-        s = self.sessions.get_active_for_vehicle(vehicle.id)
-        if not s:
-            # Idempotency for visitors: if a recent exit already priced this session,
-            # return the same quote instead of failing.
-            awaiting = self.sessions.get_latest_awaiting_payment_for_vehicle(vehicle.id)
-            if awaiting:
-                _barrier_force_close()
-                return {
-                    "session_id": awaiting.id,
-                    "status": "awaiting_payment",
-                    "barrier_action": "hold",
-                    "detail": "visitor_exit_payment_required",
-                    "amount_cents": awaiting.amount_charged,
-                    "currency": awaiting.plan.currency if getattr(awaiting, "plan", None) else None,
-                    "minutes_billable": awaiting.duration,
-                    "plan_id": awaiting.plan_id,
-                }
-
-            # nothing open or awaiting -> still invalid order
-            _barrier_force_close()
-            return {
-                "session_id": None,
-                "status": "error",
-                "barrier_action": "hold",
-                "detail": "no_open_session_for_vehicle",
-            }
-
-        # Idempotency: if a race already ended it
-        if s.ended_at is not None:
-            # Already ended -> allow it out again, OPEN barrier
-            _barrier_pulse_open(seconds=5)
-            return {
-                "session_id": s.id,
-                "status": "closed",
-                "barrier_action": "open",
-                "detail": "already_closed",
-            }
-
-        # Subscriber check at NOW
-        active_sub = self.subs.get_active_subscription_plan_for_vehicle_at(vehicle.id, now)
-        if active_sub:
-            s = self.sessions.end_session(s, ended_at=now)
-            # Subscriber exit -> OPEN barrier
-            _barrier_pulse_open(seconds=5)
-            return {
-                "session_id": s.id,
-                "status": "closed",
-                "barrier_action": "open",
-                "detail": "subscriber_exit",
-            }
-
-        # ---------- Visitor branch ----------
-        # Idempotency: if already priced & awaiting payment, re-use same quote
-        if getattr(s, "status", None) == "awaiting_payment" and s.amount_charged is not None:
-            _barrier_force_close()
-            return {
-                "session_id": s.id,
-                "status": "awaiting_payment",
-                "barrier_action": "hold",
-                "detail": "visitor_exit_payment_required",
-                "amount_cents": s.amount_charged,
-                "currency": s.plan.currency if s.plan else None,
-                "minutes_billable": s.duration,
-                "plan_id": s.plan_id,
-            }
-
-        vplan = self.plans.get_default_visitor_plan()
-        if not vplan or vplan.price_per_minute_cents is None:
-            _barrier_force_close()
-            return {
-                "session_id": s.id,
-                "status": "error",
-                "barrier_action": "hold",
-                "detail": "visitor_plan_not_configured",
-            }
-
-        amount_cents, minutes = compute_amount_cents(
-            s.started_at,
+        # one statement: vehicle, open/awaiting sessions
+        ctx = self.sessions.get_exit_context(region_code, plate_text)
+        decision = _decide_exit(
+            ctx,
             now,
-            vplan.price_per_minute_cents,
-            settings.PRICING_GRACE_MINUTES,
-            settings.PRICING_ROUND_UP,
+            gate_id=gate_id,
+            # subscriber check at capture time (in-memory, see subscription_index.py)
+            subscribed=ctx.vehicle is not None and subscription_index.active_at(ctx.vehicle.id, now, self.subs),
+            visitor_plan=plan_catalog.visitor_plan(self.plans),
         )
-
-        # write RM fields
-        s.plan_id = vplan.id
-        s.ended_at = now
-        s.duration = minutes
-        s.amount_charged = amount_cents
-
-        if settings.GRACE_AUTOCLOSE_ENABLED and amount_cents == 0:
-            s.status = "closed"
+        if decision.commit:
             self.db.commit()
-            self.db.refresh(s)
-            # FREE visitor exit -> OPEN barrier
-            _barrier_pulse_open(seconds=5)
-            return {
-                "session_id": s.id,
-                "status": "closed",
-                "barrier_action": "open",
-                "detail": "grace_exit_free",
-            }
-
-        s.status = "awaiting_payment"
-        self.db.commit()
-        self.db.refresh(s)
-
-        _barrier_force_close()
-        return {
-            "session_id": s.id,
-            "status": "awaiting_payment",
-            "barrier_action": "hold",
-            "detail": "visitor_exit_payment_required",
-            "amount_cents": s.amount_charged,
-            "currency": vplan.currency,
-            "minutes_billable": minutes,
-            "plan_id": vplan.id,
-        }
+        if decision.open_barrier:
+            _barrier_pulse_open(gate_id=gate_id, gates=self.gates)
+        else:
+            _barrier_force_close(gate_id=gate_id, gates=self.gates)
+        return decision.response
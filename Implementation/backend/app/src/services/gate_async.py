@@ -0,0 +1,224 @@
+# backend/app/src/services/gate_async.py
+from datetime import datetime
+from fastapi import HTTPException
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .access_cache import PlateAccess, plate_access_cache
+from .gate import (
+    VISITOR_DRIVER_EMAIL,
+    VISITOR_DRIVER_NAME,
+    VISITOR_MODE_ENABLED,
+    _barrier_force_close,
+    _barrier_pulse_open,
+    _check_gate_direction,
+    _decide_exit,
+    _entry_response,
+    _scan_time,
+)
+from .gate_registry import gate_registry
+from .plan_catalog import plan_catalog
+from .subscription_index import subscription_index
+from .scan_idempotency import scan_idempotency
+from ..models.vehicle import make_plate_key
+from ..schemas.scan import BatchScanEvent, EntryScanResponse, ExitScanResponse, ScanDirection
+from ..repositories.driver_sqlalchemy import AsyncDriverRepository
+from ..repositories.gate_sqlalchemy import AsyncGateRepository
+from ..repositories.plan_sqlalchemy import AsyncPlanRepository
+from ..repositories.session_sqlalchemy import AsyncParkingSessionRepository
+from ..repositories.subscription_sqlalchemy import AsyncSubscriptionRepository
+from ..repositories.vehicle_sqlalchemy import AsyncVehicleRepository
+
+
+class AsyncGateService:
+    """
+    GateService on an AsyncSession, used by the /scans endpoints so a burst of
+    scans waits on the database instead of on the request threadpool. The
+    decisions and responses are the shared ones in gate.py (_decide_exit,
+    _entry_response); only the loading and writing differ.
+    """
+
+    def __init__(self, db: AsyncSession, *, actuate: bool = True):
+        self.db = db
+        self.actuate = actuate  # False: record decisions only (batch replay), barriers don't move
+        self.sessions = AsyncParkingSessionRepository(db)
+        self.vehicles = AsyncVehicleRepository(db)
+        self.drivers = AsyncDriverRepository(db)
+        self.gates = AsyncGateRepository(db)
+        self.plans = AsyncPlanRepository(db)
+        self.subs = AsyncSubscriptionRepository(db)
+        self.cache = plate_access_cache
+        # what this service put in the process caches; POST /scans/batch drops
+        # exactly these when the batch's transaction is rolled back
+        self.cached_vehicle_ids: set[int] = set()
+        self.idempotency_keys: set[str] = set()
+
+    async def _check_gate(self, gate_id: str | None, direction: str) -> None:
+        # the registry helpers are sync; make sure it is loaded before they resolve
+        if gate_registry.stale():
+            gate_registry.load(await self.gates.list_active())
+        _check_gate_direction(gate_id, direction)
+
+    def _open(self, gate_id: str | None) -> None:
+        if self.actuate:
+            _barrier_pulse_open(gate_id=gate_id)
+
+    def _close(self, gate_id: str | None) -> None:
+        if self.actuate:
+            _barrier_force_close(gate_id=gate_id)
+
+    async def _ensure_visitor_driver(self):
+        d = await self.drivers.get_by_email(VISITOR_DRIVER_EMAIL)
+        if d:
+            return d
+        return await self.drivers.create(name=VISITOR_DRIVER_NAME, email=VISITOR_DRIVER_EMAIL)
+
+    async def _load_access(self, *, region_code: str, plate_text: str) -> tuple[PlateAccess, bool]:
+        key = make_plate_key(region_code, plate_text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            blacklisted = await self.vehicles.blacklist_flag(cached.vehicle_id)
+            if blacklisted is not None:
+                return cached, blacklisted
+            self.cache.invalidate_vehicle(cached.vehicle_id)  # deleted by another worker
+
+        vehicle = await self.vehicles.resolve_plate(region_code=region_code, plate_text=plate_text)
+        if vehicle is not None:
+            await self.db.refresh(vehicle)  # ensure fresh values (is_blacklisted)
+
+        if not vehicle:
+            if not VISITOR_MODE_ENABLED:
+                raise HTTPException(status_code=403, detail="not_allowed")
+            visitor_driver = await self._ensure_visitor_driver()
+            vehicle = await self.vehicles.create(
+                driver_id=visitor_driver.id,
+                region_code=region_code,
+                plate_text=plate_text,
+            )
+
+        access = PlateAccess(vehicle_id=vehicle.id)
+        self.cache.put(key, access)
+        self.cached_vehicle_ids.add(vehicle.id)
+        return access, bool(getattr(vehicle, "is_blacklisted", False))
+
+    async def handle_entry_scan(
+        self,
+        *,
+        region_code: str,
+        plate_text: str,
+        gate_id: str | None,
+        source: str | None,
+        captured_at: datetime | None = None,
+    ):
+        now = _scan_time(captured_at)
+        region_code = region_code.strip().upper()
+        plate_text = plate_text.strip().upper()
+
+        await self._check_gate(gate_id, "entry")
+        access, blacklisted = await self._load_access(region_code=region_code, plate_text=plate_text)
+
+        if blacklisted:
+            self._close(gate_id)
+            raise HTTPException(status_code=403, detail="blacklisted")
+
+        sess, created = await self.sessions.get_or_create_open(access.vehicle_id, started_at=now)
+
+        self._open(gate_id)
+        return _entry_response(sess, created)
+
+    async def handle_exit_scan(
+        self,
+        *,
+        region_code: str,
+        plate_text: str,
+        gate_id: str | None,
+        source: str | None,
+        captured_at: datetime | None = None,
+    ):
+        now = _scan_time(captured_at)
+        region_code = region_code.strip().upper()
+        plate_text = plate_text.strip().upper()
+
+        await self._check_gate(gate_id, "exit")
+        # one statement: vehicle, open/awaiting sessions
+        ctx = await self.sessions.get_exit_context(region_code, plate_text)
+        if ctx.vehicle is not None and not subscription_index.loaded:
+            # startup load failed and the refresher hasn't caught up: this vehicle only
+            subscription_index.put_vehicle(ctx.vehicle.id, await self.subs.list_active_windows(ctx.vehicle.id))
+        if plan_catalog.stale():
+            plan_catalog.load(await self.plans.list())
+        decision = _decide_exit(
+            ctx,
+            now,
+            gate_id=gate_id,
+            subscribed=ctx.vehicle is not None and subscription_index.active_at(ctx.vehicle.id, now),
+            visitor_plan=plan_catalog.visitor_plan(),
+        )
+        if decision.commit:
+            await self.db.commit()
+        if decision.open_barrier:
+            self._open(gate_id)
+        else:
+            self._close(gate_id)
+        return decision.response
+
+    async def handle_batch(self, events: list[BatchScanEvent]) -> list[dict]:
+        """
+        Apply buffered scan events oldest capture first. A failing event only
+        rolls back its own writes (run this on a savepoint-joined session, see
+        POST /scans/batch). An event with an idempotency_key that was already
+        decided (live or in an earlier batch) gets that decision back instead
+        of a second session or charge. Returns one result per event, in request order.
+        """
+        results: list[dict] = [{}] * len(events)
+        for i in sorted(range(len(events)), key=lambda i: events[i].captured_at):
+            ev = events[i]
+            entry = ev.direction == ScanDirection.entry
+            model = EntryScanResponse if entry else ExitScanResponse
+            plate = {"region_code": ev.region_code, "plate_text": ev.plate_text}
+            key = None
+            if ev.idempotency_key:
+                key = scan_idempotency.key_for(
+                    ev.direction.value, gate_id=ev.gate_id, idempotency_key=ev.idempotency_key, **plate
+                )
+                self.idempotency_keys.add(key)
+                cached = await scan_idempotency.lookup(self.db, key)
+                if cached is not None:
+                    results[i] = {"index": i, "direction": ev.direction, "status_code": cached.status_code,
+                                  "replayed": True}
+                    if cached.status_code >= 400:
+                        results[i]["error"] = cached.body.get("detail")
+                    else:
+                        results[i]["result"] = model(**cached.body)
+                    continue
+
+            handler = self.handle_entry_scan if entry else self.handle_exit_scan
+            try:
+                out = await handler(
+                    gate_id=ev.gate_id,
+                    source=ev.source,
+                    captured_at=ev.captured_at,
+                    **plate,
+                )
+            except HTTPException as e:
+                await self.db.rollback()
+                if key is not None and entry and e.status_code == 403:
+                    await scan_idempotency.record(
+                        self.db, key, direction="entry", status_code=403, body={"detail": e.detail}, **plate
+                    )
+                results[i] = {"index": i, "direction": ev.direction, "status_code": e.status_code, "error": e.detail}
+                continue
+            except SQLAlchemyError as e:
+                await self.db.rollback()
+                results[i] = {"index": i, "direction": ev.direction, "status_code": 500,
+                              "error": f"db_error: {e.__class__.__name__}"}
+                continue
+            status_code = 201 if entry else 200
+            result = model(**out)
+            if key is not None:
+                await scan_idempotency.record(
+                    self.db, key, direction=ev.direction.value, status_code=status_code,
+                    body=result.model_dump(mode="json"), **plate
+                )
+            results[i] = {"index": i, "direction": ev.direction, "status_code": status_code, "result": result}
+        return results
@@ -0,0 +1,121 @@
+# backend/app/src/services/gate_registry.py
+from dataclasses import dataclass
+import threading
+import time
+
+from ..core.settings import settings
+from ..models.gate import Gate
+from ..repositories.gate_sqlalchemy import GateRepository
+
+
+@dataclass(frozen=True)
+class GateConfig:
+    """How to actuate one lane's barrier."""
+    gate_id: str
+    barrier_base_url: str | None
+    direction: str = "both"
+    pulse_seconds: int = 5
+    timeout_seconds: float | None = None  # None -> dispatcher default
+
+
+def _to_config(g: Gate) -> GateConfig:
+    return GateConfig(
+        gate_id=g.gate_id,
+        barrier_base_url=(g.barrier_base_url or "").rstrip("/") or None,
+        direction=getattr(g.direction, "value", g.direction) or "both",
+        pulse_seconds=g.pulse_seconds or 5,
+        timeout_seconds=g.timeout_ms / 1000.0 if g.timeout_ms else None,
+    )
+
+
+class GateRegistry:
+    """
+    In-process view of the gates table, keyed by gate_id.
+
+    The table is small, so it is reloaded wholesale once it is older than
+    refresh_seconds, or right after a local write calls invalidate(). While no
+    gate is registered every scan uses the global BARRIER_PI_BASE_URL, so a
+    single-lane setup keeps working unchanged. Once gates are registered, a
+    scan without a gate_id or from an unknown gate moves no barrier: guessing
+    would open some other lane.
+    """
+
+    def __init__(self, *, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._gates: dict[str, GateConfig] = {}
+        self._loaded_at: float | None = None
+        self.reloads = 0
+        self.fallbacks = 0
+        self.refused = 0
+
+    def default(self) -> GateConfig:
+        # read settings on every call so env/test overrides apply immediately
+        base = (getattr(settings, "BARRIER_PI_BASE_URL", None) or "").rstrip("/")
+        return GateConfig(gate_id="default", barrier_base_url=base or None)
+
+    def stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at >= self.refresh_seconds
+
+    def reload(self, repo: GateRepository) -> None:
+        self.load(repo.list_active())
+
+    def load(self, rows: list[Gate]) -> None:
+        """Replace the registry with these rows (async callers fetch them themselves)."""
+        gates = {g.gate_id: _to_config(g) for g in rows}
+        with self._lock:
+            self._gates = gates
+            self._loaded_at = time.monotonic()
+            self.reloads += 1
+
+    def _current(self, repo: GateRepository | None) -> dict[str, GateConfig]:
+        if repo is not None and self.stale():
+            self.reload(repo)
+        return self._gates
+
+    def resolve(self, gate_id: str | None, repo: GateRepository | None = None) -> GateConfig | None:
+        """The lane's config; the global barrier while the registry is empty; None to not actuate."""
+        gates = self._current(repo)
+        if not gates:
+            with self._lock:
+                self.fallbacks += 1
+            return self.default()
+        cfg = gates.get(gate_id) if gate_id else None
+        if cfg is None:
+            with self._lock:
+                self.refused += 1
+            print(f"[GATES] gate {gate_id!r} is not registered; barrier not actuated")
+        return cfg
+
+    def allows(self, gate_id: str | None, direction: str, repo: GateRepository | None = None) -> bool:
+        """False for a scan in `direction` from a registered gate that only serves the other one."""
+        if not gate_id:
+            return True
+        cfg = self._current(repo).get(gate_id)
+        return cfg is None or cfg.direction in ("both", direction)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._loaded_at = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._gates = {}
+            self._loaded_at = None
+            self.reloads = 0
+            self.fallbacks = 0
+            self.refused = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "gates": len(self._gates),
+                "reloads": self.reloads,
+                "fallbacks": self.fallbacks,
+                "refused": self.refused,
+                "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None,
+            }
+
+
+# One registry per API process
+gate_registry = GateRegistry(refresh_seconds=settings.GATE_REGISTRY_REFRESH_SECONDS)
@@ -0,0 +1,37 @@
+from fastapi import HTTPException
+
+from .gate_registry import gate_registry
+from ..models.gate import Gate
+from ..repositories.gate_sqlalchemy import GateRepository
+from ..schemas.gate import GateCreate, GateUpdate
+
+class GateRegistryService:
+    """CRUD for the gates table; every write refreshes this process's gate registry."""
+
+    def __init__(self, repo: GateRepository):
+        self.repo = repo
+
+    def create(self, payload: GateCreate) -> Gate:
+        if self.repo.get_by_gate_id(payload.gate_id):
+            raise HTTPException(status_code=409, detail="Gate already exists")
+        gate = self.repo.create(**payload.model_dump())
+        gate_registry.invalidate()
+        return gate
+
+    def get(self, id_: int) -> Gate:
+        gate = self.repo.get(id_)
+        if not gate:
+            raise HTTPException(status_code=404, detail="Gate not found")
+        return gate
+
+    def list(self) -> list[Gate]:
+        return self.repo.list()
+
+    def update(self, id_: int, patch: GateUpdate) -> Gate:
+        gate = self.repo.update(self.get(id_), **patch.model_dump(exclude_unset=True))
+        gate_registry.invalidate()
+        return gate
+
+    def delete(self, id_: int) -> None:
+        self.repo.delete(self.get(id_))
+        gate_registry.invalidate()
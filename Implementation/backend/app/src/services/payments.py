@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session as SASession
 from typing import Optional
 
 from ..core import settings
+from ..repositories.pagination import Page
 from ..repositories.payment_sqlalchemy import PaymentRepository
 from ..models.payment import Payment
 from ..models.session import Session as SessionModel
@@ -62,6 +63,22 @@ class PaymentService:
         status_str = status.value if status else None
         return self.repo.list(session_id=session_id, subscription_id=subscription_id, status=status_str)
 
+    def page(
+        self,
+        *,
+        session_id: Optional[int],
+        subscription_id: Optional[int],
+        status: Optional[PaymentStatus],
+        after_id: Optional[int],
+        limit: Optional[int],
+        count: str = "none",
+    ) -> Page[Payment]:
+        status_str = status.value if status else None
+        return self.repo.page(
+            session_id=session_id, subscription_id=subscription_id, status=status_str,
+            after_id=after_id, limit=limit, count=count,
+        )
+
     def _activate_subscription_if_needed(self, p: Payment) -> None:
         if p.subscription_id is None:
             return
@@ -0,0 +1,118 @@
+# backend/app/src/services/plan_catalog.py
+from dataclasses import astuple, dataclass
+import hashlib
+import threading
+import time
+
+from ..core.settings import settings
+from ..models.plan import BillingPeriod, Plan, PlanType
+from ..repositories.plan_sqlalchemy import PlanRepository
+
+
+@dataclass(frozen=True)
+class PlanSnapshot:
+    """Read-only copy of a Plan row, safe to share between requests."""
+    id: int
+    type: PlanType
+    currency: str
+    period_price_cents: int | None = None
+    price_per_minute_cents: int | None = None
+    billing_period: BillingPeriod | None = None
+    method: str | None = None
+    stripe_price_id: str | None = None
+
+
+def _to_snapshot(p: Plan) -> PlanSnapshot:
+    return PlanSnapshot(
+        id=p.id,
+        type=p.type,
+        currency=p.currency,
+        period_price_cents=getattr(p, "period_price_cents", None),
+        price_per_minute_cents=getattr(p, "price_per_minute_cents", None),
+        billing_period=getattr(p, "billing_period", None),
+        method=getattr(p, "method", None),
+        stripe_price_id=getattr(p, "stripe_price_id", None),
+    )
+
+
+def _fingerprint(plans: tuple[PlanSnapshot, ...]) -> str:
+    """Hash of the catalog contents: equal in every API process that loaded the same rows."""
+    h = hashlib.sha1()
+    for p in plans:
+        h.update(repr(tuple(getattr(f, "value", f) for f in astuple(p))).encode())
+    return h.hexdigest()[:12]
+
+
+class PlanCatalog:
+    """
+    In-process copy of the plans table, newest first.
+
+    Plans change a few times a year, so the whole table is reloaded once it is
+    older than refresh_seconds, or on the next read after a local write calls
+    invalidate() (PlanService does). `version` is a hash of the contents
+    (_fingerprint), so it changes exactly when a reload changes them and two
+    workers serving the same plans report the same version.
+    """
+
+    def __init__(self, *, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._plans: tuple[PlanSnapshot, ...] = ()
+        self._loaded_at: float | None = None
+        self.version = _fingerprint(())
+        self.reloads = 0
+
+    def stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at >= self.refresh_seconds
+
+    def reload(self, repo: PlanRepository) -> None:
+        self.load(repo.list())
+
+    def load(self, rows: list[Plan]) -> None:
+        """Replace the catalog with these rows (async callers fetch them themselves)."""
+        plans = tuple(sorted((_to_snapshot(p) for p in rows), key=lambda p: p.id, reverse=True))
+        with self._lock:
+            if plans != self._plans:
+                self.version = _fingerprint(plans)
+            self._plans = plans
+            self._loaded_at = time.monotonic()
+            self.reloads += 1
+
+    def _current(self, repo: PlanRepository | None) -> tuple[PlanSnapshot, ...]:
+        if repo is not None and self.stale():
+            self.reload(repo)
+        return self._plans
+
+    def plans(self, repo: PlanRepository | None = None, *, type_: PlanType | None = None) -> list[PlanSnapshot]:
+        return [p for p in self._current(repo) if type_ is None or p.type == type_]
+
+    def get(self, plan_id: int, repo: PlanRepository | None = None) -> PlanSnapshot | None:
+        return next((p for p in self._current(repo) if p.id == plan_id), None)
+
+    def visitor_plan(self, repo: PlanRepository | None = None) -> PlanSnapshot | None:
+        """The newest visitor plan, which prices every visitor exit."""
+        return next((p for p in self._current(repo) if p.type == PlanType.visitor), None)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._loaded_at = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._plans = ()
+            self._loaded_at = None
+            self.version = _fingerprint(())
+            self.reloads = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "plans": len(self._plans),
+                "version": self.version,
+                "reloads": self.reloads,
+                "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None,
+            }
+
+
+# One catalog per API process
+plan_catalog = PlanCatalog(refresh_seconds=settings.PLAN_CATALOG_REFRESH_SECONDS)
@@ -2,6 +2,7 @@ from typing import Optional, Dict, Any
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 
+from .plan_catalog import PlanSnapshot, plan_catalog
 from ..repositories.plan_sqlalchemy import PlanRepository
 from ..models.plan import Plan, PlanType
 from ..schemas.plan import PlanCreate, PlanUpdate
@@ -37,19 +38,28 @@ class PlanService:
     def create(self, payload: PlanCreate) -> Plan:
         data = payload.model_dump()
         data = self._validate_combo(data)
-        return self.repo.create(**data)
+        plan = self.repo.create(**data)
+        plan_catalog.invalidate()
+        return plan
 
-    def get(self, plan_id: int) -> Plan:
+    def _get_row(self, plan_id: int) -> Plan:
         plan = self.repo.get(plan_id)
         if not plan:
             raise HTTPException(status_code=404, detail="Plan not found")
         return plan
 
-    def list(self, *, type_: Optional[PlanType]) -> list[Plan]:
-        return self.repo.list(type_=type_)
+    # reads are served from the plan catalog; writes go to the DB and invalidate it
+    def get(self, plan_id: int) -> PlanSnapshot:
+        plan = plan_catalog.get(plan_id, self.repo)
+        if not plan:
+            raise HTTPException(status_code=404, detail="Plan not found")
+        return plan
+
+    def list(self, *, type_: Optional[PlanType]) -> list[PlanSnapshot]:
+        return plan_catalog.plans(self.repo, type_=type_)
 
     def update(self, plan_id: int, patch: PlanUpdate) -> Plan:
-        plan = self.get(plan_id)
+        plan = self._get_row(plan_id)
 
         # Merge existing values with patch to re-validate a complete view
         merged: Dict[str, Any] = {
@@ -64,11 +74,14 @@ class PlanService:
             merged[k] = v
 
         merged = self._validate_combo(merged)
-        return self.repo.update(plan, **merged)
+        plan = self.repo.update(plan, **merged)
+        plan_catalog.invalidate()
+        return plan
 
     def delete(self, plan_id: int) -> None:
-        plan = self.get(plan_id)
+        plan = self._get_row(plan_id)
         # Optional: add guard to prevent deleting a Plan referenced by active/pending subscriptions
         # if self.db.query(Subscription).filter_by(plan_id=plan_id).first():
         #     raise HTTPException(status_code=409, detail="Plan is in use by subscriptions")
         self.repo.delete(plan)
+        plan_catalog.invalidate()
@@ -1,7 +1,10 @@
 from math import ceil
-from datetime import datetime
+from datetime import datetime, timezone
 
 def billable_minutes(started_at: datetime, now: datetime, grace_min: int, round_up: bool) -> int:
+    # SQLite hands back naive datetimes; everything is stored in UTC
+    if started_at.tzinfo is None and now.tzinfo is not None:
+        started_at = started_at.replace(tzinfo=timezone.utc)
     total = max(0.0, (now - started_at).total_seconds() / 60.0)
     billable = max(0.0, total - grace_min)
     return int(ceil(billable) if round_up else int(billable))
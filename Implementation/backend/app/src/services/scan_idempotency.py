@@ -0,0 +1,213 @@
+# backend/app/src/services/scan_idempotency.py
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import threading
+import time
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .gate import IDEMPOTENCY_WINDOW
+from ..core.settings import settings
+from ..models.vehicle import make_plate_key, make_plate_match_key
+from ..repositories.scan_decision_sqlalchemy import AsyncScanDecisionRepository
+
+
+@dataclass(frozen=True)
+class CachedDecision:
+    status_code: int
+    body: dict
+    plate_key: str  # plate_match_key of the scan
+    direction: str
+
+
+class ScanIdempotency:
+    """
+    Replays the decision for a duplicate scan instead of running it again, so a
+    camera re-posting the same plate doesn't hit the database or re-pulse the barrier.
+
+    A scan is keyed by the client's Idempotency-Key header when it sends one
+    (every decision is replayed, including 403), otherwise by
+    (direction, gate, plate) and only "open" decisions are replayed: a car held
+    at the barrier must get a fresh decision once it has paid.
+
+    - scan_decisions holds every replayable decision, for all API workers
+    - a fresh decision for a plate drops the plate's header-less decisions in
+      the other direction (by plate_match_key, so an OCR misread at the exit
+      counts), so leaving and coming back inside the window isn't replayed;
+      decisions under an Idempotency-Key are kept for the whole window
+    - only those keyed decisions are also kept in a bounded in-memory LRU: they
+      never change, while a header-less one can be dropped by another worker
+      at any time, so it is always read from scan_decisions
+    """
+
+    def __init__(self, *, window: timedelta, max_entries: int):
+        self.window = window
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple[float, CachedDecision]]" = OrderedDict()
+        self._last_purge = 0.0
+        self._reset_counters()
+
+    def _reset_counters(self) -> None:
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.evictions = 0
+        self.errors = 0
+
+    @staticmethod
+    def key_for(
+        direction: str,
+        *,
+        region_code: str,
+        plate_text: str,
+        gate_id: str | None,
+        idempotency_key: str | None = None,
+    ) -> str:
+        if idempotency_key:
+            return f"key:{direction}:{idempotency_key}"[:255]
+        return f"scan:{direction}:{gate_id or '-'}:{make_plate_key(region_code, plate_text)}"[:255]
+
+    @staticmethod
+    def _keyed(key: str) -> bool:
+        return key.startswith("key:")
+
+    # ---------- memory (keyed decisions only) ----------
+    def _get_local(self, key: str) -> CachedDecision | None:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, decision = item
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return decision
+
+    def _put_local(self, key: str, decision: CachedDecision, ttl: float) -> None:
+        if self.max_entries <= 0 or ttl <= 0 or not self._keyed(key):
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.monotonic() + ttl, decision)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    # ---------- memory + scan_decisions ----------
+    async def lookup(self, db: AsyncSession, key: str) -> CachedDecision | None:
+        decision = self._get_local(key) if self._keyed(key) else None
+        if decision is not None:
+            with self._lock:
+                self.hits += 1
+            return decision
+
+        now = datetime.now(timezone.utc)
+        try:
+            row = await AsyncScanDecisionRepository(db).get_fresh(key, now)
+        except SQLAlchemyError as e:
+            await db.rollback()
+            self._error("lookup", e)
+            row = None
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        expires_at = row.expires_at
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        decision = CachedDecision(row.status_code, row.response, row.plate_key, row.direction)
+        self._put_local(key, decision, (expires_at - now).total_seconds())
+        with self._lock:
+            self.db_hits += 1
+        return decision
+
+    async def record(
+        self,
+        db: AsyncSession,
+        key: str,
+        *,
+        region_code: str,
+        plate_text: str,
+        direction: str,
+        status_code: int,
+        body: dict,
+    ) -> None:
+        """Remember a fresh decision. Failing to store it never fails the scan."""
+        plate_key = make_plate_match_key(region_code, plate_text)
+        other = "exit" if direction == "entry" else "entry"
+        replay = self._keyed(key) or body.get("barrier_action") == "open"
+
+        decision = CachedDecision(status_code, body, plate_key, direction)
+        if replay:
+            self._put_local(key, decision, self.window.total_seconds())
+
+        now = datetime.now(timezone.utc)
+        repo = AsyncScanDecisionRepository(db)
+        try:
+            await repo.delete_for_plate(plate_key, other)
+            if replay:
+                await repo.put(
+                    key=key,
+                    plate_key=plate_key,
+                    direction=direction,
+                    status_code=status_code,
+                    response=body,
+                    expires_at=now + self.window,
+                )
+            if time.monotonic() - self._last_purge > 60:
+                self._last_purge = time.monotonic()
+                await repo.purge_expired(now)
+            await db.commit()
+        except SQLAlchemyError as e:
+            await db.rollback()
+            self._error("record", e)
+            return
+        if replay:
+            with self._lock:
+                self.stored += 1
+
+    def _error(self, op: str, e: Exception) -> None:
+        with self._lock:
+            self.errors += 1
+        print(f"[IDEMPOTENCY] {op} failed: {e}")
+
+    def forget(self, keys) -> None:
+        """Drop these keys from memory (e.g. recorded in a transaction that was rolled back)."""
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._last_purge = 0.0
+            self._reset_counters()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.db_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "window_seconds": self.window.total_seconds(),
+                "hits": self.hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "stored": self.stored,
+                "evictions": self.evictions,
+                "errors": self.errors,
+                "hit_rate": round((self.hits + self.db_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+
+# One per API process; scan_decisions shares decisions between processes
+scan_idempotency = ScanIdempotency(
+    window=IDEMPOTENCY_WINDOW,
+    max_entries=settings.IDEMPOTENCY_MAX_ENTRIES,
+)
@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session as SASession
 
 from ..models.vehicle import Vehicle
 from ..models.session import Session as SessionModel
+from ..repositories.pagination import Page
 from ..repositories.session_sqlalchemy import ParkingSessionRepository
 
 class ParkingSessionService:
@@ -24,18 +25,12 @@ class ParkingSessionService:
     def start(self, *, vehicle_id: int, started_at: datetime | None = None) -> SessionModel:
         self._ensure_vehicle(vehicle_id)
 
-        # Enforce single active session per vehicle
-        active = self.repo.get_active_for_vehicle(vehicle_id)
-        if active is not None:
-            raise HTTPException(status_code=409, detail="Vehicle already has an active session")
-
+        # Enforce single active session per vehicle (atomic: uq_sessions_vehicle_open).
         # If client didn't provide started_at, let DB default (server_default=now()).
-        # If provided, use it.
-        if started_at is None:
-            # creating without started_at allows DB to fill server_default
-            return self.repo.create(vehicle_id=vehicle_id)
-        else:
-            return self.repo.create(vehicle_id=vehicle_id, started_at=started_at)
+        s, created = self.repo.get_or_create_open(vehicle_id, started_at=started_at)
+        if not created:
+            raise HTTPException(status_code=409, detail="Vehicle already has an active session")
+        return s
 
     def get(self, session_id: int) -> SessionModel:
         s = self.repo.get(session_id)
@@ -47,6 +42,12 @@ class ParkingSessionService:
         self._ensure_vehicle(vehicle_id)
         return self.repo.list_by_vehicle(vehicle_id)
 
+    def page_for_vehicle(
+        self, vehicle_id: int, *, after_id: int | None, limit: int | None, count: str = "none"
+    ) -> Page[SessionModel]:
+        self._ensure_vehicle(vehicle_id)
+        return self.repo.page_by_vehicle(vehicle_id, after_id=after_id, limit=limit, count=count)
+
     def end(self, session_id: int, *, ended_at: datetime | None) -> SessionModel:
         s = self.get(session_id)
         if s.ended_at is not None:
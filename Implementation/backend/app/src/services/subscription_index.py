@@ -0,0 +1,171 @@
+# backend/app/src/services/subscription_index.py
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import threading
+import time
+
+from ..core.settings import settings
+from ..models.plan import PlanType
+from ..repositories.subscription_sqlalchemy import SubscriptionRepository
+
+
+@dataclass(frozen=True)
+class SubscriptionWindow:
+    """When one active subscription lets its vehicle through."""
+    subscription_id: int
+    vehicle_id: int
+    valid_from: datetime
+    valid_to: datetime
+    plan_type: PlanType
+
+
+def _utc(dt: datetime) -> datetime:
+    # SQLite hands back naive datetimes; every stored timestamp is UTC
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt
+
+
+def _to_window(row) -> SubscriptionWindow:
+    sub_id, vehicle_id, valid_from, valid_to, plan_type = row
+    return SubscriptionWindow(
+        subscription_id=sub_id,
+        vehicle_id=vehicle_id,
+        valid_from=_utc(valid_from),
+        valid_to=_utc(valid_to),
+        plan_type=plan_type,
+    )
+
+
+def _group(windows) -> dict[int, tuple[tuple[datetime, ...], tuple[SubscriptionWindow, ...]]]:
+    """vehicle_id -> (valid_from of each window, windows), both ordered by valid_from."""
+    by_vehicle: dict[int, list[SubscriptionWindow]] = {}
+    for w in windows:
+        by_vehicle.setdefault(w.vehicle_id, []).append(w)
+    out = {}
+    for vehicle_id, ws in by_vehicle.items():
+        ws.sort(key=lambda w: (w.valid_from, w.subscription_id))
+        out[vehicle_id] = (tuple(w.valid_from for w in ws), tuple(ws))
+    return out
+
+
+class SubscriptionIndex:
+    """
+    In-process interval index of active subscription windows, keyed by vehicle.
+
+    Answers "is this vehicle a subscriber at time T" without a query: a bisect
+    over the vehicle's windows sorted by valid_from. Only windows that can still
+    cover a scan are kept (see SubscriptionRepository.list_active_windows).
+
+    The whole index is loaded at startup and reloaded every refresh_seconds by a
+    background task (main.py), which bounds staleness for writes made by other
+    API workers; a scan never waits for a full reload. Until the first load
+    succeeds, active_at() reads just the scanned vehicle's windows. Local writers
+    (SubscriptionService, AccessListService, the Stripe webhook) call
+    refresh_vehicle() after committing. check() compares the index with the
+    database.
+    """
+
+    def __init__(self, *, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._by_vehicle: dict[int, tuple[tuple[datetime, ...], tuple[SubscriptionWindow, ...]]] = {}
+        self._loaded_at: float | None = None
+        self.reloads = 0
+        self.refreshes = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def reload(self, repo: SubscriptionRepository) -> None:
+        self.load(repo.list_active_windows())
+
+    def load(self, rows) -> None:
+        """Replace the index with these rows (async callers fetch them themselves)."""
+        by_vehicle = _group(_to_window(r) for r in rows)
+        with self._lock:
+            self._by_vehicle = by_vehicle
+            self._loaded_at = time.monotonic()
+            self.reloads += 1
+
+    def refresh_vehicle(self, repo: SubscriptionRepository, vehicle_id: int) -> None:
+        """Re-read one vehicle's windows; call after committing a change to its subscriptions."""
+        self.put_vehicle(vehicle_id, repo.list_active_windows(vehicle_id))
+
+    def put_vehicle(self, vehicle_id: int, rows) -> None:
+        entry = _group(_to_window(r) for r in rows).get(vehicle_id)
+        with self._lock:
+            if entry is None:
+                self._by_vehicle.pop(vehicle_id, None)
+            else:
+                self._by_vehicle[vehicle_id] = entry
+            self.refreshes += 1
+
+    def active_at(
+        self,
+        vehicle_id: int,
+        at: datetime,
+        repo: SubscriptionRepository | None = None,
+        *,
+        plan_type: PlanType | None = PlanType.subscription,
+    ) -> SubscriptionWindow | None:
+        """
+        The active window covering `at` (valid_from <= at < valid_to) that ends
+        last, or None. plan_type=None accepts any plan. With a repo and no full
+        load yet, the vehicle's windows are read first (async callers do that
+        themselves with put_vehicle).
+        """
+        if repo is not None and not self.loaded:
+            self.refresh_vehicle(repo, vehicle_id)
+        entry = self._by_vehicle.get(vehicle_id)
+        if entry is None:
+            return None
+        at = _utc(at)
+        starts, windows = entry
+        best = None
+        for w in windows[:bisect_right(starts, at)]:
+            if w.valid_to > at and (plan_type is None or w.plan_type == plan_type):
+                if best is None or w.valid_to > best.valid_to:
+                    best = w
+        return best
+
+    def check(self, rows) -> dict:
+        """
+        Compare the index with fresh rows from list_active_windows(). Subscription
+        ids are reported as missing (in the database only), extra (in the index
+        only) or mismatched (different window or plan type).
+        """
+        expected = {w.subscription_id: w for w in (_to_window(r) for r in rows)}
+        with self._lock:
+            actual = {w.subscription_id: w for _, ws in self._by_vehicle.values() for w in ws}
+        missing = sorted(expected.keys() - actual.keys())
+        extra = sorted(actual.keys() - expected.keys())
+        mismatched = sorted(i for i in expected.keys() & actual.keys() if expected[i] != actual[i])
+        return {
+            "consistent": not (missing or extra or mismatched),
+            "windows": len(expected),
+            "missing": missing,
+            "extra": extra,
+            "mismatched": mismatched,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._by_vehicle = {}
+            self._loaded_at = None
+            self.reloads = 0
+            self.refreshes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "vehicles": len(self._by_vehicle),
+                "windows": sum(len(ws) for _, ws in self._by_vehicle.values()),
+                "reloads": self.reloads,
+                "refreshes": self.refreshes,
+                "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None,
+            }
+
+
+# One index per API process
+subscription_index = SubscriptionIndex(refresh_seconds=settings.SUBSCRIPTION_INDEX_REFRESH_SECONDS)
@@ -5,7 +5,9 @@ from sqlalchemy.orm import Session
 from ..models.vehicle import Vehicle
 from ..models.plan import Plan, PlanType
 from ..models.subscription import Subscription
+from ..repositories.pagination import Page
 from ..repositories.subscription_sqlalchemy import SubscriptionRepository
+from .subscription_index import subscription_index
 
 class SubscriptionService:
     def __init__(self, repo: SubscriptionRepository):
@@ -61,17 +63,25 @@ class SubscriptionService:
     def list_for_vehicle(self, vehicle_id: int) -> list[Subscription]:
         return self.repo.list_by_vehicle(vehicle_id)
 
+    def page_for_vehicle(
+        self, vehicle_id: int, *, after_id: int | None, limit: int | None, count: str = "none"
+    ) -> Page[Subscription]:
+        return self.repo.page_by_vehicle(vehicle_id, after_id=after_id, limit=limit, count=count)
+
     def _ensure_payment_then_activate(self, sub: Subscription) -> Subscription:
         if not self.repo.has_successful_payment(sub.id):
             raise HTTPException(status_code=409, detail="No successful payment for this subscription")
 
 
         now = datetime.now(timezone.utc)
-        if sub.valid_to <= now:
+        valid_to = sub.valid_to if sub.valid_to.tzinfo else sub.valid_to.replace(tzinfo=timezone.utc)  # SQLite: naive UTC
+        if valid_to <= now:
             raise HTTPException(status_code=400, detail="Subscription validity window has already ended")
 
         # Activate
-        return self.repo.update_status(sub, status="active", auto_renew=None)
+        sub = self.repo.update_status(sub, status="active", auto_renew=None)
+        subscription_index.refresh_vehicle(self.repo, sub.vehicle_id)
+        return sub
 
     def set_status(self, sub_id: int, *, status: str, auto_renew: bool | None) -> Subscription:
         sub = self.get(sub_id)
@@ -93,6 +103,7 @@ class SubscriptionService:
         #  When suspending, pausing, or canceling — blacklist the vehicle
         if status in {"paused", "canceled", "suspended"}:
             sub = self.repo.update_status(sub, status=status, auto_renew=auto_renew)
+            subscription_index.refresh_vehicle(self.repo, sub.vehicle_id)
 
             if vehicle and not vehicle.is_blacklisted:
                 vehicle.is_blacklisted = True
@@ -115,4 +126,6 @@ class SubscriptionService:
 
     def delete(self, sub_id: int) -> None:
         sub = self.get(sub_id)
+        vehicle_id = sub.vehicle_id
         self.repo.delete(sub)
+        subscription_index.refresh_vehicle(self.repo, vehicle_id)
@@ -1,5 +1,6 @@
 from ..models.vehicle import Vehicle
 from ..repositories.vehicle_sqlalchemy import VehicleRepository
+from .access_cache import plate_access_cache
 
 class VehicleService:
     def __init__(self, repo: VehicleRepository):
@@ -9,7 +10,9 @@ class VehicleService:
         existing = self.repo.get_by_plate(region_code, plate_text)
         if existing:
             raise ValueError("Vehicle already registered")
-        return self.repo.create(driver_id=driver_id, region_code=region_code, plate_text=plate_text)
+        v = self.repo.create(driver_id=driver_id, region_code=region_code, plate_text=plate_text)
+        plate_access_cache.invalidate_plate(region_code, plate_text)  # an exact plate now beats folded matches
+        return v
 
     def get(self, vehicle_id: int) -> Vehicle | None:
         return self.repo.get_by_id(vehicle_id)
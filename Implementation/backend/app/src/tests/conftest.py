@@ -1,18 +1,63 @@
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 from src.core.security import get_current_admin
 from src.main import app
 import src.db.database as db_module
 from src.models.vehicle import Vehicle
+from src.models.session import Session as ParkingSession
+from src.models.gate import Gate
+from src.models.plan import Plan
+from src.models.scan_decision import ScanDecision
+from src.models.payment import Payment
+from src.models.subscription import Subscription
+
+@pytest.fixture(autouse=True)
+def no_barrier_hardware(monkeypatch):
+    # barrier commands become no-ops; tests must never reach a real Pi
+    from src.core.settings import settings
+    monkeypatch.setattr(settings, "BARRIER_PI_BASE_URL", "")
+
+
+@pytest.fixture(autouse=True)
+def reset_gate_cache():
+    # the plate access cache, gate registry, plan catalog, subscription index and
+    # scan idempotency are process-wide; keep tests independent
+    from src.services.access_cache import plate_access_cache
+    from src.services.gate_registry import gate_registry
+    from src.services.plan_catalog import plan_catalog
+    from src.services.scan_idempotency import scan_idempotency
+    from src.services.subscription_index import subscription_index
+    plate_access_cache.clear()
+    gate_registry.clear()
+    plan_catalog.clear()
+    subscription_index.clear()
+    scan_idempotency.clear()
+    yield
+    plate_access_cache.clear()
+    gate_registry.clear()
+    plan_catalog.clear()
+    subscription_index.clear()
+    scan_idempotency.clear()
+
 
 @pytest.fixture(autouse=True)
 def cleanup_db(db_session):
     yield
-    # delete from child tables first if FK exists; for now vehicles only:
+    # delete from child tables first; open sessions would otherwise collide with
+    # uq_sessions_vehicle_open once SQLite reuses vehicle ids
+    db_session.rollback()
+    db_session.query(Payment).delete()
+    db_session.query(Subscription).delete()
+    db_session.query(ParkingSession).delete()
     db_session.query(Vehicle).delete()
+    db_session.query(Gate).delete()
+    db_session.query(Plan).delete()
+    db_session.query(ScanDecision).delete()
     db_session.commit()
 
 
@@ -32,6 +77,14 @@ def test_engine(tmp_path_factory):
 def TestingSessionLocal(test_engine):
     return sessionmaker(bind=test_engine, autocommit=False, autoflush=False, future=True)
 
+
+@pytest.fixture(scope="session")
+def AsyncTestingSessionLocal(test_engine):
+    # same sqlite file through aiosqlite; NullPool so no connection outlives a TestClient's event loop
+    url = db_module.async_database_url(test_engine.url.render_as_string(hide_password=False))
+    async_engine = create_async_engine(url, poolclass=NullPool)
+    return async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 @pytest.fixture(scope="session", autouse=True)
 def create_test_tables(test_engine):
     # Import models so they register with the SAME Base metadata (src.models.base.Base)
@@ -43,6 +96,8 @@ def create_test_tables(test_engine):
     import src.models.driver
     import src.models.admin
     import src.models.audit
+    import src.models.gate
+    import src.models.scan_decision
 
     from src.models.base import Base  # <-- THIS is the Base your models use
 
@@ -63,7 +118,7 @@ def db_session(TestingSessionLocal):
 
 
 @pytest.fixture()
-def client(db_session, test_engine):
+def client(db_session, test_engine, AsyncTestingSessionLocal):
     # Override admin auth
     app.dependency_overrides[get_current_admin] = lambda: {"id": 1, "email": "test-admin@example.com"}
 
@@ -73,14 +128,24 @@ def client(db_session, test_engine):
 
     app.dependency_overrides[db_module.get_db] = override_get_db
 
+    # /scans/* run on the async session
+    async def override_get_async_db():
+        async with AsyncTestingSessionLocal() as db:
+            yield db
+
+    app.dependency_overrides[db_module.get_async_db] = override_get_async_db
+
     # Patch the global engine used by /api/db-health (it imports engine in src.main)
     import src.main as main_module
 
     old_main_engine = main_module.engine
     old_db_engine = db_module.engine
+    old_main_async_session = main_module.AsyncSessionLocal
 
     main_module.engine = test_engine
     db_module.engine = test_engine
+    # startup loads the subscription index through it
+    main_module.AsyncSessionLocal = AsyncTestingSessionLocal
 
     try:
         with TestClient(app) as c:
@@ -89,4 +154,5 @@ def client(db_session, test_engine):
         # restore and cleanup
         main_module.engine = old_main_engine
         db_module.engine = old_db_engine
+        main_module.AsyncSessionLocal = old_main_async_session
         app.dependency_overrides.clear()
@@ -172,3 +172,432 @@ def test_exit_scan_unknown_vehicle_200_or_400(client, monkeypatch):
     )
 
     assert r.status_code in (200, 400)
+
+
+def test_entry_scan_routes_barrier_to_registered_gate(client, db_session, monkeypatch):
+    import src.services.gate as gate_module
+
+    sent = []
+    monkeypatch.setattr(gate_module.barrier_dispatcher, "submit",
+                        lambda gate, url, payload=None, timeout=None: sent.append((gate, url)))
+
+    r = client.post(
+        f"{API_PREFIX}/gates",
+        json={"gate_id": "lane-3", "direction": "entry", "barrier_base_url": "http://10.0.0.3:5000"},
+    )
+    assert r.status_code == 201, r.text
+    assert client.post(f"{API_PREFIX}/gates", json={"gate_id": "lane-3"}).status_code == 409
+
+    r = client.post(
+        f"{API_PREFIX}/scans/entry",
+        json={"region_code": "CA", "plate_text": "7777AB", "gate_id": "lane-3", "source": "camera"},
+    )
+    assert r.status_code == 201, r.text
+    assert sent == [("lane-3", "http://10.0.0.3:5000/led/pulse")]
+
+    # an exit read on the entry-only lane is rejected; an unregistered lane moves no barrier
+    r = client.post(
+        f"{API_PREFIX}/scans/exit",
+        json={"region_code": "CA", "plate_text": "7777AB", "gate_id": "lane-3", "source": "camera"},
+    )
+    assert r.status_code == 422 and r.json()["detail"] == "gate_direction_mismatch"
+    r = client.post(
+        f"{API_PREFIX}/scans/entry",
+        json={"region_code": "CA", "plate_text": "8888AB", "gate_id": "lane-9", "source": "camera"},
+    )
+    assert r.status_code == 201, r.text
+    assert sent == [("lane-3", "http://10.0.0.3:5000/led/pulse")]
+
+
+def test_visitor_entry_then_exit_prices_session_async_path(client, db_session):
+    from src.models.plan import Plan, PlanType
+    from src.models.session import Session
+
+    db_session.add(Plan(type=PlanType.visitor, currency="EUR", price_per_minute_cents=10))
+    db_session.commit()
+
+    scan = {"region_code": "PB", "plate_text": "4242KX", "source": "camera"}
+    r = client.post(f"{API_PREFIX}/scans/entry", json={**scan, "gate_id": "in-1"})
+    assert r.status_code == 201, r.text
+    session_id = r.json()["session_id"]
+
+    r = client.post(f"{API_PREFIX}/scans/exit", json={**scan, "gate_id": "out-2"})
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert data["status"] == "awaiting_payment"
+    assert data["session_id"] == session_id
+    assert data["currency"] == "EUR"
+
+    s = db_session.get(Session, session_id)
+    assert s.ended_at is not None
+    assert s.exit_gate_id == "out-2"
+
+
+def test_batch_scan_orders_by_capture_time_and_isolates_failures(client, db_session, monkeypatch):
+    import src.services.gate as gate_module
+
+    sent = []
+    monkeypatch.setattr(gate_module.barrier_dispatcher, "submit", lambda *a, **k: sent.append(a))
+    _create_vehicle(db_session, region_code="BG", plate_text="BLACK1", is_blacklisted=True)
+
+    from datetime import timedelta
+    t0 = datetime.now(timezone.utc) - timedelta(hours=1)
+    events = [
+        # sent out of order: the exit was captured after the entry
+        {"direction": "exit", "region_code": "BG", "plate_text": "BATCH1",
+         "gate_id": "2", "captured_at": (t0 + timedelta(minutes=5)).isoformat()},
+        {"direction": "entry", "region_code": "BG", "plate_text": "BLACK1",
+         "gate_id": "1", "captured_at": (t0 + timedelta(minutes=1)).isoformat()},
+        {"direction": "entry", "region_code": "BG", "plate_text": "BATCH1",
+         "gate_id": "1", "captured_at": t0.replace(tzinfo=None).isoformat()},  # naive -> UTC
+    ]
+    r = client.post(f"{API_PREFIX}/scans/batch", json={"events": events})
+    assert r.status_code == 200, r.text
+    body = r.json()
+
+    assert [x["index"] for x in body["results"]] == [0, 1, 2]
+    exit_, blacklisted, entry = body["results"]
+    assert entry["status_code"] == 201 and entry["result"]["reason"] == "created"
+    # exit ran after the entry, so it found the session (no visitor plan configured here)
+    assert exit_["status_code"] == 200
+    assert exit_["result"]["session_id"] == entry["result"]["session_id"]
+    assert blacklisted["status_code"] == 403 and blacklisted["error"] == "blacklisted"
+    assert (body["processed"], body["failed"]) == (2, 1)
+    assert sent == []  # replayed events never move a barrier
+
+
+def test_resent_batch_is_answered_from_recorded_decisions(client, db_session):
+    from datetime import timedelta
+    from src.models.plan import Plan, PlanType
+    from src.models.session import Session
+
+    db_session.add(Plan(type=PlanType.visitor, currency="EUR", price_per_minute_cents=10))
+    db_session.commit()
+    _create_vehicle(db_session, region_code="BG", plate_text="BLACK3", is_blacklisted=True)
+
+    t0 = datetime.now(timezone.utc) - timedelta(hours=1)
+    scan = {"region_code": "BG", "plate_text": "RESEND1", "source": "camera"}
+    # the entry was posted live first; its response got lost, so the spool sends it again
+    r = client.post(f"{API_PREFIX}/scans/entry", json={**scan, "gate_id": "1", "captured_at": t0.isoformat()},
+                    headers={"Idempotency-Key": "ev-1"})
+    assert r.status_code == 201, r.text
+    session_id = r.json()["session_id"]
+
+    events = [
+        {**scan, "direction": "entry", "gate_id": "1", "captured_at": t0.isoformat(), "idempotency_key": "ev-1"},
+        {**scan, "direction": "exit", "gate_id": "2", "captured_at": (t0 + timedelta(minutes=30)).isoformat(),
+         "idempotency_key": "ev-2"},
+        {"region_code": "BG", "plate_text": "BLACK3", "direction": "entry", "gate_id": "1",
+         "captured_at": t0.isoformat(), "idempotency_key": "ev-3"},
+    ]
+    first = client.post(f"{API_PREFIX}/scans/batch", json={"events": events}).json()
+    entry, exit_, blacklisted = first["results"]
+    assert entry["replayed"] and entry["result"]["session_id"] == session_id
+    assert not exit_["replayed"] and exit_["result"]["amount_cents"] == 300
+    assert blacklisted["status_code"] == 403 and not blacklisted["replayed"]
+
+    # the whole batch again (its response got lost too): nothing is decided twice
+    again = client.post(f"{API_PREFIX}/scans/batch", json={"events": events}).json()
+    assert [x["replayed"] for x in again["results"]] == [True, True, True]
+    assert [x["status_code"] for x in again["results"]] == [201, 200, 403]
+    assert again["results"][1]["result"] == exit_["result"]
+    assert again["results"][2]["error"] == "blacklisted"
+    assert db_session.query(Session).count() == 1
+
+
+def test_failed_batch_drops_only_what_it_cached(client, db_session, monkeypatch):
+    import pytest
+    from datetime import timedelta
+    from src.services.access_cache import PlateAccess, plate_access_cache
+    from src.services.gate_async import AsyncGateService
+    from src.services.scan_idempotency import scan_idempotency
+
+    plate_access_cache.put("BG:OTHER1", PlateAccess(vehicle_id=4242))
+    plate_access_cache.get("BG:OTHER1")
+
+    handle_batch = AsyncGateService.handle_batch
+
+    async def commit_fails(self, events):
+        await handle_batch(self, events)
+        raise RuntimeError("connection lost before commit")
+
+    monkeypatch.setattr(AsyncGateService, "handle_batch", commit_fails)
+    t0 = datetime.now(timezone.utc) - timedelta(hours=1)
+    events = [{"direction": "entry", "region_code": "BG", "plate_text": "ROLLBK1", "gate_id": "1",
+               "captured_at": t0.isoformat(), "idempotency_key": "rb-1"}]
+    with pytest.raises(RuntimeError):
+        client.post(f"{API_PREFIX}/scans/batch", json={"events": events})
+
+    # the visitor vehicle and the decision were rolled back: neither may be served from memory
+    assert plate_access_cache.get("BG:ROLLBK1") is None
+    assert scan_idempotency.stats()["size"] == 0
+    # everything else, counters included, survives
+    assert plate_access_cache.get("BG:OTHER1") == PlateAccess(vehicle_id=4242)
+    assert plate_access_cache.stats()["hits"] == 2
+    assert scan_idempotency.stats()["stored"] == 1
+
+
+
+    r = client.post(f"{API_PREFIX}/scans/batch", json={"events": []})
+    assert r.status_code == 422
+
+
+def test_exit_scan_rejects_captured_at_in_future(client):
+    from datetime import timedelta
+
+    r = client.post(
+        f"{API_PREFIX}/scans/exit",
+        json={
+            "region_code": "BG",
+            "plate_text": "FUTURE1",
+            "gate_id": "2",
+            "captured_at": (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat(),
+        },
+    )
+    assert r.status_code == 422
+    assert r.json()["detail"] == "captured_at_in_future"
+
+
+def test_duplicate_entry_scan_is_replayed_without_db_or_barrier(client, db_session, monkeypatch):
+    import src.services.gate as gate_module
+    from src.models.session import Session
+    from src.services.scan_idempotency import scan_idempotency
+
+    sent = []
+    monkeypatch.setattr(gate_module.barrier_dispatcher, "submit", lambda *a, **k: sent.append(a))
+    client.post(f"{API_PREFIX}/gates", json={"gate_id": "lane-1", "barrier_base_url": "http://10.0.0.1:5000"})
+
+    scan = {"region_code": "CA", "plate_text": "DUP123", "gate_id": "lane-1", "source": "camera"}
+    first = client.post(f"{API_PREFIX}/scans/entry", json=scan)
+    assert first.status_code == 201, first.text
+    assert "Idempotent-Replayed" not in first.headers
+
+    again = client.post(f"{API_PREFIX}/scans/entry", json=scan)
+    assert again.status_code == 201
+    assert again.headers["Idempotent-Replayed"] == "true"
+    assert again.json() == first.json()
+    assert len(sent) == 1  # the barrier was pulsed once
+
+    # another API worker (empty memory) finds the decision in scan_decisions
+    scan_idempotency.clear()
+    again = client.post(f"{API_PREFIX}/scans/entry", json=scan)
+    assert again.headers["Idempotent-Replayed"] == "true"
+    assert scan_idempotency.stats()["db_hits"] == 1
+    assert db_session.query(Session).count() == 1
+
+
+def test_entry_decision_dropped_elsewhere_is_not_replayed(client, db_session, monkeypatch):
+    from src.models.scan_decision import ScanDecision
+    from src.models.session import Session
+
+    _patch_barrier_pulse(monkeypatch)
+    scan = {"region_code": "CB", "plate_text": "CB5678AT", "gate_id": "in-1", "source": "camera"}
+    first = client.post(f"{API_PREFIX}/scans/entry", json=scan)
+    assert client.post(f"{API_PREFIX}/scans/entry", json=scan).headers["Idempotent-Replayed"] == "true"
+
+    # another worker's exit dropped the entry decision: this worker must not replay it from memory
+    db_session.query(ScanDecision).delete()
+    db_session.commit()
+    db_session.query(Session).filter_by(id=first.json()["session_id"]).update(
+        {"ended_at": datetime.now(timezone.utc), "status": "closed"}
+    )
+    db_session.commit()
+    again = client.post(f"{API_PREFIX}/scans/entry", json=scan)
+    assert "Idempotent-Replayed" not in again.headers
+    assert again.json()["reason"] == "created"
+
+    # an exit read with OCR confusions (B->8, T->7) still drops the entry decision
+    client.post(f"{API_PREFIX}/scans/exit", json={**scan, "plate_text": "C85678A7", "gate_id": "out-1"})
+    assert db_session.query(ScanDecision).filter_by(direction="entry").count() == 0
+
+
+def test_held_exit_is_not_replayed_but_idempotency_key_is(client, db_session, monkeypatch):
+    from src.models.plan import Plan, PlanType
+
+    _patch_barrier_pulse(monkeypatch)
+    db_session.add(Plan(type=PlanType.visitor, currency="EUR", price_per_minute_cents=10))
+    db_session.commit()
+
+    scan = {"region_code": "PB", "plate_text": "HOLD77", "gate_id": "out-1", "source": "camera"}
+    assert client.post(f"{API_PREFIX}/scans/entry", json=scan).status_code == 201
+
+    # a car held for payment gets a fresh decision on every scan
+    for _ in range(2):
+        r = client.post(f"{API_PREFIX}/scans/exit", json=scan)
+        assert r.json()["barrier_action"] == "hold"
+        assert "Idempotent-Replayed" not in r.headers
+
+    _create_vehicle(db_session, region_code="CA", plate_text="BLACK2", is_blacklisted=True)
+    denied = {"region_code": "CA", "plate_text": "BLACK2", "gate_id": "in-1"}
+    headers = {"Idempotency-Key": "cam-1:0001"}
+    assert client.post(f"{API_PREFIX}/scans/entry", json=denied, headers=headers).status_code == 403
+    r = client.post(f"{API_PREFIX}/scans/entry", json=denied, headers=headers)
+    assert r.status_code == 403
+    assert r.json()["detail"] == "blacklisted"
+    assert r.headers["Idempotent-Replayed"] == "true"
+
+
+def test_exit_decision_reads_state_in_one_select(client, db_session, AsyncTestingSessionLocal):
+    from sqlalchemy import event
+    from src.models.plan import Plan, PlanType
+
+    db_session.add(Plan(type=PlanType.visitor, currency="EUR", price_per_minute_cents=10))
+    db_session.commit()
+    scan = {"region_code": "PB", "plate_text": "ONE1SQL", "gate_id": "out-1", "source": "camera"}
+    assert client.post(f"{API_PREFIX}/scans/entry", json=scan).status_code == 201
+    client.get(f"{API_PREFIX}/plans")  # warm the plan catalog
+
+    statements = []
+    engine = AsyncTestingSessionLocal.kw["bind"].sync_engine
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        r = client.post(f"{API_PREFIX}/scans/exit", json=scan)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert r.status_code == 200, r.text
+    assert r.json()["status"] == "awaiting_payment"
+    assert r.json()["currency"] == "EUR"
+    decision_selects = [
+        s for s in statements
+        if s.lstrip().upper().startswith("SELECT") and "scan_decisions" not in s
+    ]
+    assert len(decision_selects) == 1
+
+
+def test_visitor_exit_uses_plan_price_updated_through_api(client):
+    r = client.post(f"{API_PREFIX}/plans", json={"type": "visitor", "currency": "eur", "price_per_minute_cents": 10})
+    assert r.status_code == 201, r.text
+    plan_id = r.json()["id"]
+    listed = client.get(f"{API_PREFIX}/plans")
+    assert [p["id"] for p in listed.json()] == [plan_id]
+
+    # the update invalidates the catalog: the next exit must price with it
+    assert client.patch(f"{API_PREFIX}/plans/{plan_id}", json={"currency": "usd"}).status_code == 200
+    assert (client.get(f"{API_PREFIX}/plans").headers["X-Plan-Catalog-Version"]
+            != listed.headers["X-Plan-Catalog-Version"])
+
+    scan = {"region_code": "PB", "plate_text": "CAT4LOG", "gate_id": "out-1"}
+    assert client.post(f"{API_PREFIX}/scans/entry", json=scan).status_code == 201
+    r = client.post(f"{API_PREFIX}/scans/exit", json=scan)
+    assert r.json()["currency"] == "USD"
+    assert r.json()["plan_id"] == plan_id
+
+
+def test_subscription_activated_through_api_lets_exit_through(client, db_session):
+    from datetime import timedelta
+    from src.models.payment import Payment
+    from src.models.plan import BillingPeriod, Plan, PlanType
+    from src.models.subscription import Subscription
+
+    v = _create_vehicle(db_session, region_code="PB", plate_text="5UB5CR1")
+    plan = Plan(type=PlanType.subscription, currency="EUR", billing_period=BillingPeriod.month, period_price_cents=3000)
+    db_session.add(plan)
+    db_session.commit()
+    now = datetime.now(timezone.utc)
+    sub = Subscription(vehicle_id=v.id, plan_id=plan.id, status="pending_payment",
+                       valid_from=now - timedelta(days=1), valid_to=now + timedelta(days=29))
+    db_session.add(sub)
+    db_session.commit()
+    db_session.add(Payment(subscription_id=sub.id, status="succeeded", currency="EUR", amount_cents=3000))
+    db_session.commit()
+
+    scan = {"region_code": "PB", "plate_text": "5UB5CR1", "gate_id": "out-1"}
+    assert client.post(f"{API_PREFIX}/scans/entry", json=scan).status_code == 201
+
+    # the index was loaded at startup, before this subscription was active
+    r = client.patch(f"{API_PREFIX}/subscriptions/{sub.id}/status", json={"status": "active"})
+    assert r.status_code == 200, r.text
+    assert client.post(f"{API_PREFIX}/scans/exit", json=scan).json()["detail"] == "subscriber_exit"
+
+    check = client.get(f"{API_PREFIX}/subscriptions/index/check").json()
+    assert check["consistent"] and check["windows"] == 1
+
+    assert client.patch(f"{API_PREFIX}/subscriptions/{sub.id}/status", json={"status": "paused"}).status_code == 200
+    check = client.get(f"{API_PREFIX}/subscriptions/index/check").json()
+    assert check["consistent"] and check["index"]["windows"] == 0
+
+
+def test_ocr_misread_plate_finds_registered_vehicle(client, db_session):
+    from src.models.plan import Plan, PlanType
+    from src.models.session import Session
+    from src.models.vehicle import Vehicle
+
+    db_session.add(Plan(type=PlanType.visitor, currency="EUR", price_per_minute_cents=10))
+    db_session.commit()
+    v = _create_vehicle(db_session, region_code="CB", plate_text="CB1234AT")
+
+    # the recognizer's normalize_ocr turns B->8 and T->7
+    scan = {"region_code": "CB", "plate_text": "C81234A7", "source": "camera"}
+    r = client.post(f"{API_PREFIX}/scans/entry", json={**scan, "gate_id": "in-1"})
+    assert r.status_code == 201, r.text
+    session_id = r.json()["session_id"]
+    assert db_session.get(Session, session_id).vehicle_id == v.id
+    assert db_session.query(Vehicle).count() == 1  # no visitor row for the misread
+
+    r = client.post(f"{API_PREFIX}/scans/exit", json={**scan, "gate_id": "out-1"})
+    assert r.status_code == 200, r.text
+    assert r.json()["session_id"] == session_id
+
+
+def test_registering_the_exact_plate_drops_its_cached_folded_match(client, db_session):
+    from src.models.session import Session
+
+    v = _create_vehicle(db_session, region_code="CB", plate_text="CB1234AT")
+    scan = {"region_code": "CB", "plate_text": "C81234A7", "source": "camera"}
+    r = client.post(f"{API_PREFIX}/scans/entry", json={**scan, "gate_id": "in-1"})
+    assert r.status_code == 201, r.text
+    assert db_session.get(Session, r.json()["session_id"]).vehicle_id == v.id  # cached under C81234A7
+
+    # the exact spelling is registered: it wins the tie-break from the next scan on, not after the TTL
+    r = client.post(f"{API_PREFIX}/vehicles", json={"driver_id": 1, "region_code": "CB", "plate_text": "C81234A7"})
+    assert r.status_code == 200, r.text
+    exact_id = r.json()["id"]
+    r = client.post(f"{API_PREFIX}/scans/entry", json={**scan, "gate_id": "in-2"})
+    assert r.status_code == 201, r.text
+    assert db_session.get(Session, r.json()["session_id"]).vehicle_id == exact_id
+
+
+def test_plate_caches_of_two_workers_never_serve_stale_state(db_session, TestingSessionLocal):
+    # two API workers: each its own DB session and plate cache, one database
+    import pytest
+    from fastapi import HTTPException
+    from src.repositories.session_sqlalchemy import ParkingSessionRepository
+    from src.repositories.vehicle_sqlalchemy import VehicleRepository
+    from src.services.access_cache import PlateAccessCache
+    from src.services.gate import GateService
+
+    v = _create_vehicle(db_session, region_code="CA", plate_text="TWO1")
+    db_a, db_b = TestingSessionLocal(), TestingSessionLocal()
+    try:
+        workers = []
+        for db in (db_a, db_b):
+            svc = GateService(db)
+            svc.cache = PlateAccessCache(max_entries=100, ttl_seconds=300)
+            workers.append(svc)
+        a, b = workers
+        scan = {"region_code": "CA", "plate_text": "TWO1", "gate_id": None, "source": "camera"}
+
+        first = a.handle_entry_scan(**scan)
+        assert b.handle_entry_scan(**scan)["session_id"] == first["session_id"]
+
+        # the session is closed on worker B; worker A must not reuse it
+        sessions_b = ParkingSessionRepository(db_b)
+        sessions_b.end_session(sessions_b.get_active_for_vehicle(v.id), ended_at=datetime.now(timezone.utc))
+        again = a.handle_entry_scan(**scan)
+        assert again["reason"] == "created"
+        assert again["session_id"] != first["session_id"]
+        assert a.cache.stats()["hits"] == 1
+
+        # blacklisted through worker B: worker A's cached plate still gets the 403
+        VehicleRepository(db_b).set_blacklist(v.id, True)
+        with pytest.raises(HTTPException) as e:
+            a.handle_entry_scan(**scan)
+        assert e.value.detail == "blacklisted"
+    finally:
+        db_a.close()
+        db_b.close()
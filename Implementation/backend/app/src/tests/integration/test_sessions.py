@@ -1,5 +1,8 @@
 from datetime import datetime, timezone
 
+import pytest
+from sqlalchemy.exc import IntegrityError
+
 from src.models.vehicle import Vehicle
 from src.models.session import Session as ParkingSession
 
@@ -65,7 +68,8 @@ def test_list_sessions_for_vehicle(client, db_session):
     v1 = _create_vehicle(db_session, region_code="SOF", plate_text="A1002AA")
     v2 = _create_vehicle(db_session, region_code="VAR", plate_text="B2000BB")
 
-    s1 = _create_session(db_session, vehicle_id=v1.id)
+    # only one session per vehicle may be open (uq_sessions_vehicle_open)
+    s1 = _create_session(db_session, vehicle_id=v1.id, ended_at=datetime.now(timezone.utc), status="closed")
     s2 = _create_session(db_session, vehicle_id=v1.id)
     _ = _create_session(db_session, vehicle_id=v2.id)
 
@@ -80,6 +84,28 @@ def test_list_sessions_for_vehicle(client, db_session):
     assert all(item["vehicle_id"] == v1.id for item in data)
 
 
+def test_list_sessions_cursor_pagination(client, db_session):
+    v = _create_vehicle(db_session, region_code="SOF", plate_text="A1003AA")
+    now = datetime.now(timezone.utc)
+    ids = [_create_session(db_session, vehicle_id=v.id, ended_at=now, status="closed").id for _ in range(5)]
+
+    seen, cursor = [], None
+    while True:
+        params = {"vehicle_id": v.id, "limit": 2, "count": "exact"}
+        if cursor:
+            params["cursor"] = cursor
+        r = client.get(f"{API_PREFIX}/sessions", params=params)
+        assert r.status_code == 200, r.text
+        assert r.headers["X-Total-Count"] == "5"
+        seen.append([item["id"] for item in r.json()])
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert seen == [ids[:2:-1], ids[2:0:-1], ids[:1]]
+    assert client.get(f"{API_PREFIX}/sessions", params={"vehicle_id": v.id, "cursor": "nope"}).status_code == 400
+
+
 def test_end_session(client, db_session):
     v = _create_vehicle(db_session, region_code="SOF", plate_text="A1003AA")
 
@@ -109,3 +135,26 @@ def test_delete_session_204(client, db_session):
     # behavior depends on your service; many projects return 404 after delete
     r2 = client.get(f"{API_PREFIX}/sessions/{s.id}")
     assert r2.status_code in (404, 200)
+
+
+def test_second_open_session_for_vehicle_is_rejected(client, db_session):
+    v = _create_vehicle(db_session, region_code="SOF", plate_text="A1009AA")
+    _create_session(db_session, vehicle_id=v.id)
+
+    with pytest.raises(IntegrityError):
+        _create_session(db_session, vehicle_id=v.id)
+    db_session.rollback()
+
+
+def test_get_or_create_open_returns_existing_row(db_session):
+    from src.repositories.session_sqlalchemy import ParkingSessionRepository
+
+    v = _create_vehicle(db_session, region_code="SOF", plate_text="A1010AA")
+    repo = ParkingSessionRepository(db_session)
+
+    first, created_first = repo.get_or_create_open(v.id)
+    second, created_second = repo.get_or_create_open(v.id)
+
+    assert created_first is True
+    assert created_second is False
+    assert second.id == first.id
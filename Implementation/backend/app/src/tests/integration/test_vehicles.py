@@ -1,7 +1,10 @@
+from datetime import datetime, timedelta, timezone
+
 import pytest
 
 from src.models import Vehicle
-from src.repositories.subscription_sqlalchemy import SubscriptionRepository
+from src.models.plan import BillingPeriod, Plan, PlanType
+from src.models.subscription import Subscription
 
 
 API_PREFIX = "/api"  # change to "" if your api_router does not mount under /api
@@ -20,6 +23,18 @@ def _create_vehicle(db_session, *, driver_id: int, region_code: str, plate_text:
     return v
 
 
+def _subscribe(db_session, *vehicles: Vehicle) -> None:
+    # access_status is "authorized" for a non-blacklisted vehicle with an active subscription now
+    plan = Plan(type=PlanType.subscription, currency="EUR", billing_period=BillingPeriod.month, period_price_cents=3000)
+    db_session.add(plan)
+    db_session.flush()
+    now = datetime.now(timezone.utc)
+    for v in vehicles:
+        db_session.add(Subscription(vehicle_id=v.id, plan_id=plan.id, status="active",
+                                    valid_from=now - timedelta(days=1), valid_to=now + timedelta(days=29)))
+    db_session.commit()
+
+
 def test_get_vehicle_not_found(client):
     r = client.get(f"{API_PREFIX}/vehicles/999999")
     assert r.status_code == 404
@@ -40,15 +55,12 @@ def test_get_vehicle_success(client, db_session):
     assert data["plate_text"] == "1234AB"
 
 
-def test_list_vehicles_basic(client, db_session, monkeypatch):
+def test_list_vehicles_basic(client, db_session):
     v1 = _create_vehicle(db_session, driver_id=1, region_code="CA", plate_text="1234AB", is_blacklisted=False)
     v2 = _create_vehicle(db_session, driver_id=2, region_code="CB", plate_text="9999ZZ", is_blacklisted=False)
 
     # Make access_status deterministic: v1 authorized, v2 pending
-    def fake_has_active_now(self, vehicle_id: int) -> bool:
-        return vehicle_id == v1.id
-
-    monkeypatch.setattr(SubscriptionRepository, "has_active_now", fake_has_active_now)
+    _subscribe(db_session, v1)
 
     r = client.get(f"{API_PREFIX}/vehicles")
     assert r.status_code == 200
@@ -64,16 +76,13 @@ def test_list_vehicles_basic(client, db_session, monkeypatch):
     assert by_id[v2.id]["access_status"] == "pending"
 
 
-def test_list_vehicles_status_filter(client, db_session, monkeypatch):
+def test_list_vehicles_status_filter(client, db_session):
     v_auth = _create_vehicle(db_session, driver_id=1, region_code="CA", plate_text="1111AA", is_blacklisted=False)
     v_pending = _create_vehicle(db_session, driver_id=1, region_code="CA", plate_text="2222BB", is_blacklisted=False)
     v_suspended = _create_vehicle(db_session, driver_id=1, region_code="CA", plate_text="3333CC", is_blacklisted=True)
 
     # authorized only for v_auth, pending for v_pending; v_suspended should always be suspended
-    def fake_has_active_now(self, vehicle_id: int) -> bool:
-        return vehicle_id == v_auth.id
-
-    monkeypatch.setattr(SubscriptionRepository, "has_active_now", fake_has_active_now)
+    _subscribe(db_session, v_auth, v_suspended)
 
     r = client.get(f"{API_PREFIX}/vehicles", params={"status": "authorized"})
     assert r.status_code == 200
@@ -94,9 +103,7 @@ def test_list_vehicles_status_filter(client, db_session, monkeypatch):
     assert any(i["id"] == v_suspended.id for i in items)
 
 
-def test_list_vehicles_search_and_driver_filter(client, db_session, monkeypatch):
-    # deterministic status
-    monkeypatch.setattr(SubscriptionRepository, "has_active_now", lambda self, vehicle_id: False)
+def test_list_vehicles_search_and_driver_filter(client, db_session):
 
     v1 = _create_vehicle(db_session, driver_id=10, region_code="SOF", plate_text="A1234BC", is_blacklisted=False)
     _ = _create_vehicle(db_session, driver_id=11, region_code="VAR", plate_text="X9999YY", is_blacklisted=False)
@@ -112,3 +119,114 @@ def test_list_vehicles_search_and_driver_filter(client, db_session, monkeypatch)
     assert r.status_code == 200
     items = r.json()["items"]
     assert all(i["driver_id"] == 10 for i in items)
+
+
+def test_list_vehicles_search_ranks_closest_plates_first(client, db_session):
+    longer = _create_vehicle(db_session, driver_id=12, region_code="SOF", plate_text="XX7788ZZ")
+    exact = _create_vehicle(db_session, driver_id=12, region_code="SO", plate_text="7788")
+    _ = _create_vehicle(db_session, driver_id=12, region_code="SO", plate_text="1234")
+
+    r = client.get(f"{API_PREFIX}/vehicles", params={"q": " 7788 "})
+    body = r.json()
+    assert [i["id"] for i in body["items"]] == [exact.id, longer.id]
+    assert body["total"] == 2
+    assert "X-Next-Cursor" not in r.headers
+
+    # LIKE wildcards in the query are matched literally
+    body = client.get(f"{API_PREFIX}/vehicles", params={"q": "7_8"}).json()
+    assert body["items"] == []
+    body = client.get(f"{API_PREFIX}/vehicles", params={"q": "%"}).json()
+    assert body["items"] == []
+
+
+def test_list_vehicles_status_filter_paginates_and_counts_in_sql(client, db_session, test_engine):
+    from sqlalchemy import event
+
+    vs = [_create_vehicle(db_session, driver_id=21, region_code="PG", plate_text=f"{i}000PG") for i in range(5)]
+    _subscribe(db_session, vs[0], vs[2], vs[4])
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(test_engine, "before_cursor_execute", record)
+    try:
+        params = {"driver_id": 21, "status": "authorized", "limit": 2, "count": "exact"}
+        first = client.get(f"{API_PREFIX}/vehicles", params=params)
+        second = client.get(f"{API_PREFIX}/vehicles", params={**params, "cursor": first.headers["X-Next-Cursor"]})
+        pages = [first.json(), second.json()]
+    finally:
+        event.remove(test_engine, "before_cursor_execute", record)
+
+    assert [pg["total"] for pg in pages] == [3, 3]
+    assert second.headers["X-Total-Count"] == "3" and "X-Next-Cursor" not in second.headers
+    assert [[i["id"] for i in pg["items"]] for pg in pages] == [[vs[4].id, vs[2].id], [vs[0].id]]
+    assert all(i["access_status"] == "authorized" for pg in pages for i in pg["items"])
+    # one page query + one count per request, whatever the page size
+    assert len([s for s in statements if s.lstrip().upper().startswith("SELECT")]) == 4
+
+
+def test_list_vehicles_follows_next_cursor_header(client, db_session):
+    vs = [_create_vehicle(db_session, driver_id=22, region_code="PC", plate_text=f"{i}000PC") for i in range(5)]
+    _subscribe(db_session, vs[1])
+
+    pages, cursor = [], None
+    while True:
+        params = {"driver_id": 22, "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        r = client.get(f"{API_PREFIX}/vehicles", params=params)
+        assert r.json()["total"] is None and "X-Total-Count" not in r.headers
+        pages.append([(i["id"], i["access_status"]) for i in r.json()["items"]])
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    ids = [v.id for v in reversed(vs)]
+    assert [[i for i, _ in pg] for pg in pages] == [ids[:2], ids[2:4], ids[4:]]
+    assert dict(sum(pages, []))[vs[1].id] == "authorized"
+
+
+def test_get_by_plate_uses_normalized_plate_key(db_session):
+    from src.repositories.vehicle_sqlalchemy import VehicleRepository
+
+    v = _create_vehicle(db_session, driver_id=1, region_code="PB", plate_text="7777KK")
+    assert v.plate_key == "PB:7777KK"
+
+    found = VehicleRepository(db_session).get_by_plate(region_code=" pb", plate_text="7777kk ")
+    assert found is not None
+    assert found.id == v.id
+
+
+def test_resolve_plate_matches_ocr_confusions_and_breaks_ties(db_session):
+    from src.repositories.vehicle_sqlalchemy import VehicleRepository
+
+    registered = _create_vehicle(db_session, driver_id=1, region_code="CB", plate_text="CB1234AT")
+    assert registered.plate_match_key == "CB:C81234A7"
+    repo = VehicleRepository(db_session)
+
+    assert repo.resolve_plate("CB", "C81234A7").id == registered.id
+    assert repo.resolve_plate("cb", "CB 1234-AT").id == registered.id
+    assert repo.get_by_plate("CB", "C81234A7") is None  # exact lookups are unchanged
+
+    # a second vehicle in the same confusion class: exact spelling first, else the oldest
+    other = _create_vehicle(db_session, driver_id=2, region_code="CB", plate_text="C81234A7")
+    assert repo.resolve_plate("CB", "C81234A7").id == other.id
+    assert repo.resolve_plate("CB", "CB1234AT").id == registered.id
+    assert repo.resolve_plate("CB", "C8I234AT").id == registered.id
+
+
+def test_plate_collisions_report(client, db_session):
+    first = _create_vehicle(db_session, driver_id=1, region_code="PB", plate_text="SO1234BT")
+    second = _create_vehicle(db_session, driver_id=2, region_code="PB", plate_text="501234B7")
+    _ = _create_vehicle(db_session, driver_id=3, region_code="PB", plate_text="9999KK")
+
+    r = client.get(f"{API_PREFIX}/vehicles/plate-collisions")
+    assert r.status_code == 200
+    body = r.json()
+    assert body["collisions"] == 1
+    group = body["groups"][0]
+    assert group["plate_match_key"] == "PB:50123487"
+    assert group["resolves_to"] == first.id
+    assert [v["id"] for v in group["vehicles"]] == [first.id, second.id]
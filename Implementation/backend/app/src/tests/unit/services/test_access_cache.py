@@ -0,0 +1,91 @@
+# src/tests/unit/services/test_access_cache.py
+from src.services.access_cache import PlateAccess, PlateAccessCache
+
+
+def test_get_put_and_hit_rate():
+    cache = PlateAccessCache(max_entries=10, ttl_seconds=60)
+
+    assert cache.get("CA:1234AB") is None
+    cache.put("CA:1234AB", PlateAccess(vehicle_id=1))
+    hit = cache.get("CA:1234AB")
+
+    assert hit is not None and hit.vehicle_id == 1
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = PlateAccessCache(max_entries=2, ttl_seconds=60)
+    cache.put("A:1", PlateAccess(vehicle_id=1))
+    cache.put("B:2", PlateAccess(vehicle_id=2))
+    cache.get("A:1")  # A becomes most recent
+    cache.put("C:3", PlateAccess(vehicle_id=3))
+
+    assert cache.get("B:2") is None
+    assert cache.get("A:1") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiry(monkeypatch):
+    import src.services.access_cache as mod
+
+    clock = [1000.0]
+    monkeypatch.setattr(mod.time, "monotonic", lambda: clock[0])
+
+    cache = PlateAccessCache(max_entries=10, ttl_seconds=5)
+    cache.put("A:1", PlateAccess(vehicle_id=1))
+    clock[0] += 6
+
+    assert cache.get("A:1") is None
+    assert cache.stats()["expired"] == 1
+
+
+def test_invalidate_vehicle_and_plate():
+    cache = PlateAccessCache(max_entries=10, ttl_seconds=60)
+    cache.put("CA:1234AB", PlateAccess(vehicle_id=7))
+    cache.put("CB:9999ZZ", PlateAccess(vehicle_id=8))
+
+    cache.invalidate_vehicle(7)
+    cache.invalidate_plate("cb", "9999zz")
+
+    assert cache.get("CA:1234AB") is None
+    assert cache.get("CB:9999ZZ") is None
+    assert cache.stats()["invalidations"] == 2
+
+
+def test_invalidate_vehicle_drops_every_spelling():
+    # OCR confusions: the same vehicle cached under the registered and the misread plate
+    cache = PlateAccessCache(max_entries=10, ttl_seconds=60)
+    cache.put("CB:CB1234AT", PlateAccess(vehicle_id=7))
+    cache.put("CB:C81234A7", PlateAccess(vehicle_id=7))
+
+    cache.invalidate_vehicle(7)
+
+    assert cache.get("CB:CB1234AT") is None
+    assert cache.get("CB:C81234A7") is None
+    assert cache.stats()["invalidations"] == 2
+
+
+def test_invalidate_plate_drops_its_whole_confusion_class():
+    # a registration of "C81234A7" must drop every key that folds to it, whichever vehicle it names
+    cache = PlateAccessCache(max_entries=10, ttl_seconds=60)
+    cache.put("CB:C81234A7", PlateAccess(vehicle_id=7))
+    cache.put("CB:CB1234A7", PlateAccess(vehicle_id=7))
+    cache.put("CB:CB1234AX", PlateAccess(vehicle_id=8))
+    cache.put("CA:C81234A7", PlateAccess(vehicle_id=9))
+
+    cache.invalidate_plate("cb", "c81234a7")
+
+    assert cache.get("CB:C81234A7") is None
+    assert cache.get("CB:CB1234A7") is None
+    assert cache.get("CB:CB1234AX") is not None  # another plate
+    assert cache.get("CA:C81234A7") is not None  # another region
+    assert cache.stats()["invalidations"] == 2
+
+
+def test_zero_entries_disables_cache():
+    cache = PlateAccessCache(max_entries=0, ttl_seconds=60)
+    cache.put("A:1", PlateAccess(vehicle_id=1))
+    assert cache.get("A:1") is None
@@ -0,0 +1,84 @@
+# src/tests/unit/services/test_barrier_dispatcher.py
+import threading
+
+from src.services.barrier import BarrierDispatcher
+
+
+class FakeResponse:
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class FakeHTTP:
+    def __init__(self, fail_times=0, block: threading.Event | None = None):
+        self.fail_times = fail_times
+        self.block = block
+        self.calls = []
+
+    def post(self, url, json=None, timeout=None):
+        if self.block is not None:
+            self.block.wait(2)
+        self.calls.append((url, json))
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            raise ConnectionError("pi unreachable")
+        return FakeResponse()
+
+    def close(self):
+        pass
+
+
+def _dispatcher(http, **kw):
+    opts = dict(timeout=0.5, max_retries=2, backoff_seconds=0.0, queue_size=8)
+    opts.update(kw)
+    return BarrierDispatcher(http=http, **opts)
+
+
+def test_submit_returns_immediately_and_sends_in_order():
+    gate = threading.Event()
+    http = FakeHTTP(block=gate)
+    d = _dispatcher(http)
+
+    d.submit("A", "http://pi/led/pulse", {"seconds": 5})
+    d.submit("A", "http://pi/led/close")
+    assert http.calls == []  # nothing sent on the caller's thread
+
+    gate.set()
+    d.shutdown()
+
+    assert [c[0] for c in http.calls] == ["http://pi/led/pulse", "http://pi/led/close"]
+    assert d.stats()["sent"] == 2
+
+
+def test_retries_are_bounded_and_counted():
+    http = FakeHTTP(fail_times=10)
+    d = _dispatcher(http, max_retries=2)
+
+    d.submit("A", "http://pi/led/pulse", {"seconds": 5})
+    d.shutdown()
+
+    stats = d.stats()
+    assert len(http.calls) == 3
+    assert stats["retried"] == 2
+    assert stats["failed"] == 1
+    assert stats["sent"] == 0
+
+
+def test_full_queue_drops_oldest_command():
+    gate = threading.Event()
+    http = FakeHTTP(block=gate)
+    d = _dispatcher(http, queue_size=1)
+
+    d.submit("A", "http://pi/1")
+    d.submit("A", "http://pi/2")
+    d.submit("A", "http://pi/3")
+    gate.set()
+    d.shutdown()
+
+    sent = [c[0] for c in http.calls]
+    assert sent[-1] == "http://pi/3"
+    assert d.stats()["dropped"] >= 1
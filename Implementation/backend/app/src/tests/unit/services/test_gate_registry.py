@@ -0,0 +1,95 @@
+# src/tests/unit/services/test_gate_registry.py
+from types import SimpleNamespace
+
+import src.services.gate as gate_module
+from src.core.settings import settings
+from src.services.gate_registry import GateRegistry
+
+
+class FakeGateRepo:
+    def __init__(self, gates):
+        self.gates = gates
+        self.calls = 0
+
+    def list_active(self):
+        self.calls += 1
+        return list(self.gates)
+
+
+def _gate(gate_id, url, **kw):
+    return SimpleNamespace(
+        gate_id=gate_id,
+        barrier_base_url=url,
+        direction=kw.get("direction", "both"),
+        pulse_seconds=kw.get("pulse_seconds", 5),
+        timeout_ms=kw.get("timeout_ms"),
+    )
+
+
+def test_resolve_known_gate_and_fallback(monkeypatch):
+    monkeypatch.setattr(settings, "BARRIER_PI_BASE_URL", "http://pi-default:5000/")
+    reg = GateRegistry(refresh_seconds=60)
+    repo = FakeGateRepo([_gate("A", "http://pi-a:5000/", direction="entry", pulse_seconds=3, timeout_ms=250)])
+
+    a = reg.resolve("A", repo)
+    assert a.barrier_base_url == "http://pi-a:5000"
+    assert a.direction == "entry"
+    assert a.pulse_seconds == 3
+    assert a.timeout_seconds == 0.25
+
+    # with lanes registered, unknown and missing gate ids move no barrier
+    assert reg.resolve("nope", repo) is None
+    assert reg.resolve(None, repo) is None
+    assert repo.calls == 1  # loaded once, then served from memory
+    assert reg.stats()["refused"] == 2
+    assert reg.stats()["fallbacks"] == 0
+
+
+def test_empty_registry_falls_back_to_global_barrier(monkeypatch):
+    monkeypatch.setattr(settings, "BARRIER_PI_BASE_URL", "http://pi-default:5000/")
+    reg = GateRegistry(refresh_seconds=60)
+    repo = FakeGateRepo([])
+
+    assert reg.resolve("any", repo).barrier_base_url == "http://pi-default:5000"
+    assert reg.resolve(None, repo).gate_id == "default"
+    assert reg.stats()["fallbacks"] == 2
+
+
+def test_allows_checks_the_gate_direction():
+    reg = GateRegistry(refresh_seconds=60)
+    repo = FakeGateRepo([_gate("in", None, direction="entry"), _gate("out", None, direction="exit"),
+                         _gate("both", None)])
+
+    assert reg.allows("in", "entry", repo) and not reg.allows("in", "exit", repo)
+    assert reg.allows("out", "exit", repo) and not reg.allows("out", "entry", repo)
+    assert reg.allows("both", "entry", repo) and reg.allows("both", "exit", repo)
+    # unregistered or missing gates aren't rejected here; resolve() keeps their barrier still
+    assert reg.allows("nope", "exit", repo) and reg.allows(None, "entry", repo)
+
+
+def test_invalidate_forces_reload():
+    reg = GateRegistry(refresh_seconds=3600)
+    repo = FakeGateRepo([])
+    assert reg.resolve("B", repo).gate_id == "default"
+
+    repo.gates.append(_gate("B", "http://pi-b:5000"))
+    assert reg.resolve("B", repo).gate_id == "default"  # still cached
+    reg.invalidate()
+    assert reg.resolve("B", repo).barrier_base_url == "http://pi-b:5000"
+    assert repo.calls == 2
+
+
+def test_barrier_helpers_route_to_the_lane(monkeypatch):
+    sent = []
+    monkeypatch.setattr(gate_module.barrier_dispatcher, "submit",
+                        lambda gate, url, payload=None, timeout=None: sent.append((gate, url, payload, timeout)))
+    repo = FakeGateRepo([_gate("A", "http://pi-a:5000", pulse_seconds=7, timeout_ms=300)])
+
+    gate_module._barrier_pulse_open(gate_id="A", gates=repo)
+    gate_module._barrier_force_close(gate_id="A", gates=repo)
+    gate_module._barrier_pulse_open(gate_id="unknown", gates=repo)  # no default Pi in tests -> no-op
+
+    assert sent == [
+        ("A", "http://pi-a:5000/led/pulse", {"seconds": 7}, 0.3),
+        ("A", "http://pi-a:5000/led/close", None, 0.3),
+    ]
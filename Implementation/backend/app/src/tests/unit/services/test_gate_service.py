@@ -1,9 +1,10 @@
 # src/tests/unit/test_gate_service.py
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 import pytest
 from fastapi import HTTPException
 
 import src.services.gate as gate_module
+from src.models.plan import PlanType
 
 
 # ----------------------------
@@ -41,9 +42,12 @@ class FakeVehicleRepo:
         self.vehicle = vehicle
         self.created = []
 
-    def get_by_plate(self, region_code, plate_text):
+    def resolve_plate(self, region_code, plate_text):
         return self.vehicle
 
+    def blacklist_flag(self, vehicle_id):
+        return self.vehicle.is_blacklisted if self.vehicle and self.vehicle.id == vehicle_id else None
+
     def create(self, **kwargs):
         v = FakeVehicle(id=99, is_blacklisted=False)
         self.created.append(kwargs)
@@ -72,7 +76,10 @@ class FakeSessionRepo:
         self.latest_awaiting = None
 
     def get_active_for_vehicle(self, vehicle_id):
-        return self.active
+        # like the real query: open == ended_at IS NULL
+        if self.active is not None and self.active.ended_at is None:
+            return self.active
+        return None
 
     def create(self, vehicle_id, started_at=None):
         s = FakeSession(id=1, started_at=started_at)
@@ -80,6 +87,11 @@ class FakeSessionRepo:
         self.active = s
         return s
 
+    def get_or_create_open(self, vehicle_id, started_at=None):
+        if self.get_active_for_vehicle(vehicle_id) is not None:
+            return self.active, False
+        return self.create(vehicle_id, started_at=started_at), True
+
     def get_latest_awaiting_payment_for_vehicle(self, vehicle_id):
         return self.latest_awaiting
 
@@ -91,16 +103,22 @@ class FakeSessionRepo:
 
 
 class FakeSubsRepo:
-    def __init__(self, active_sub=False):
+    def __init__(self, active_sub=False, vehicle_id=None):
         self.active_sub = active_sub
+        self.vehicle_id = vehicle_id
 
-    def get_active_subscription_plan_for_vehicle_at(self, vehicle_id, now):
-        return object() if self.active_sub else None
+    def list_active_windows(self, vehicle_id=None):
+        # (id, vehicle_id, valid_from, valid_to, plan type), as the real repository returns
+        if not self.active_sub:
+            return []
+        now = datetime.now(timezone.utc)
+        return [(1, self.vehicle_id, now - timedelta(days=1), now + timedelta(days=1), PlanType.subscription)]
 
 
 class FakeVisitorPlan:
     def __init__(self, id=1, price_per_minute_cents=10, currency="EUR"):
         self.id = id
+        self.type = "visitor"
         self.price_per_minute_cents = price_per_minute_cents
         self.currency = currency
 
@@ -112,11 +130,40 @@ class FakePlanRepo:
     def get_default_visitor_plan(self):
         return self.visitor_plan
 
+    def list(self, type_=None):
+        return [self.visitor_plan] if self.visitor_plan else []
+
+
+def _wire_exit_context(svc):
+    """GateService exits read one ExitContext; assemble it from the fakes above."""
+    from src.repositories.session_sqlalchemy import ExitContext
+
+    def get_exit_context(region_code, plate_text):
+        vehicle = svc.vehicles.resolve_plate(region_code, plate_text)
+        if vehicle is None:
+            return ExitContext()
+        session = svc.sessions.get_active_for_vehicle(vehicle.id)
+        return ExitContext(
+            vehicle=vehicle,
+            session=session,
+            session_plan=getattr(session, "plan", None),
+            awaiting=svc.sessions.get_latest_awaiting_payment_for_vehicle(vehicle.id),
+        )
+
+    svc.sessions.get_exit_context = get_exit_context
+
 
 # ----------------------------
 # Tests
 # ----------------------------
 
+@pytest.fixture(autouse=True)
+def no_registered_gates(reset_gate_cache):
+    # the fakes have no gates table; an empty, fresh registry is a single-lane setup
+    from src.services.gate_registry import gate_registry
+    gate_registry.load([])
+
+
 def _patch_barrier(monkeypatch):
     monkeypatch.setattr(gate_module, "_barrier_pulse_open", lambda *a, **k: None)
     monkeypatch.setattr(gate_module, "_barrier_force_close", lambda *a, **k: None)
@@ -218,6 +265,7 @@ def test_exit_unknown_vehicle_holds(monkeypatch):
     svc.drivers = FakeDriverRepo()
     svc.subs = FakeSubsRepo()
     svc.plans = FakePlanRepo()
+    _wire_exit_context(svc)
 
     out = svc.handle_exit_scan(region_code="BG", plate_text="UNKNOWN", gate_id="2", source="camera")
 
@@ -227,25 +275,26 @@ def test_exit_unknown_vehicle_holds(monkeypatch):
     assert out["session_id"] is None
 
 
-def test_exit_already_closed_session_is_idempotent(monkeypatch):
+def test_second_exit_after_subscriber_exit_finds_nothing_open(monkeypatch):
     _patch_barrier(monkeypatch)
 
     v = FakeVehicle(id=3)
-    closed = FakeSession(id=22, ended_at=datetime.now(timezone.utc))
+    active = FakeSession(id=22, ended_at=None)
 
     svc = gate_module.GateService(FakeDB())
     svc.vehicles = FakeVehicleRepo(vehicle=v)
-    svc.sessions = FakeSessionRepo(active=closed)
+    svc.sessions = FakeSessionRepo(active=active)
     svc.drivers = FakeDriverRepo()
-    svc.subs = FakeSubsRepo(active_sub=False)
+    svc.subs = FakeSubsRepo(active_sub=True, vehicle_id=v.id)
     svc.plans = FakePlanRepo()
+    _wire_exit_context(svc)
 
-    out = svc.handle_exit_scan(region_code="BG", plate_text="ABC", gate_id="2", source="camera")
+    first = svc.handle_exit_scan(region_code="BG", plate_text="ABC", gate_id="2", source="camera")
+    again = svc.handle_exit_scan(region_code="BG", plate_text="ABC", gate_id="2", source="camera")
 
-    assert out["status"] == "closed"
-    assert out["detail"] == "already_closed"
-    assert out["barrier_action"] == "open"
-    assert out["session_id"] == 22
+    assert first["detail"] == "subscriber_exit"
+    assert again["detail"] == "no_open_session_for_vehicle"
+    assert again["barrier_action"] == "hold"
 
 
 def test_exit_subscriber_closes_session_and_opens(monkeypatch):
@@ -258,8 +307,9 @@ def test_exit_subscriber_closes_session_and_opens(monkeypatch):
     svc.vehicles = FakeVehicleRepo(vehicle=v)
     svc.sessions = FakeSessionRepo(active=active_session)
     svc.drivers = FakeDriverRepo()
-    svc.subs = FakeSubsRepo(active_sub=True)
+    svc.subs = FakeSubsRepo(active_sub=True, vehicle_id=v.id)
     svc.plans = FakePlanRepo()
+    _wire_exit_context(svc)
 
     out = svc.handle_exit_scan(region_code="BG", plate_text="ABC", gate_id="2", source="camera")
 
@@ -267,7 +317,7 @@ def test_exit_subscriber_closes_session_and_opens(monkeypatch):
     assert out["detail"] == "subscriber_exit"
     assert out["barrier_action"] == "open"
     assert out["session_id"] == 11
-    assert svc.sessions.ended  # end_session called
+    assert active_session.ended_at is not None  # ended at the capture time
 
 
 def test_exit_visitor_requires_payment(monkeypatch):
@@ -286,6 +336,7 @@ def test_exit_visitor_requires_payment(monkeypatch):
     svc.drivers = FakeDriverRepo()
     svc.subs = FakeSubsRepo(active_sub=False)
     svc.plans = FakePlanRepo(visitor_plan=FakeVisitorPlan(id=9))
+    _wire_exit_context(svc)
 
     out = svc.handle_exit_scan(region_code="BG", plate_text="ABC", gate_id="2", source="camera")
 
@@ -295,3 +346,116 @@ def test_exit_visitor_requires_payment(monkeypatch):
     assert out["amount_cents"] == 120
     assert out["minutes_billable"] == 12
     assert out["plan_id"] == 9
+
+
+def test_entry_second_scan_served_from_cache(monkeypatch):
+    _patch_barrier(monkeypatch)
+
+    svc = gate_module.GateService(FakeDB())
+    svc.vehicles = FakeVehicleRepo(vehicle=FakeVehicle(id=5, is_blacklisted=False))
+    svc.sessions = FakeSessionRepo(active=None)
+    svc.drivers = FakeDriverRepo()
+    svc.subs = FakeSubsRepo()
+    svc.plans = FakePlanRepo()
+
+    first = svc.handle_entry_scan(region_code="CA", plate_text="1234AB", gate_id="1", source="camera")
+
+    # a second scan must not resolve the plate again; the open session is still upserted
+    svc.vehicles.resolve_plate = lambda *a, **k: pytest.fail("vehicle lookup on cache hit")
+    second = svc.handle_entry_scan(region_code="ca", plate_text="1234ab", gate_id="1", source="camera")
+
+    assert first["reason"] == "created"
+    assert second["reason"] == "existing_open_session"
+    assert second["session_id"] == first["session_id"]
+    assert svc.cache.stats()["hits"] == 1
+
+
+def test_entry_after_exit_opens_a_new_session(monkeypatch):
+    _patch_barrier(monkeypatch)
+
+    v = FakeVehicle(id=3, is_blacklisted=False)
+    svc = gate_module.GateService(FakeDB())
+    svc.vehicles = FakeVehicleRepo(vehicle=v)
+    svc.sessions = FakeSessionRepo(active=None)
+    svc.drivers = FakeDriverRepo()
+    svc.subs = FakeSubsRepo(active_sub=True, vehicle_id=v.id)
+    svc.plans = FakePlanRepo()
+    _wire_exit_context(svc)
+
+    svc.handle_entry_scan(region_code="BG", plate_text="ABC", gate_id="1", source="camera")
+    svc.handle_exit_scan(region_code="BG", plate_text="ABC", gate_id="2", source="camera")
+
+    out = svc.handle_entry_scan(region_code="BG", plate_text="ABC", gate_id="1", source="camera")
+    assert out["reason"] == "created"
+
+
+def test_entry_cache_hit_still_reads_blacklist_flag(monkeypatch):
+    _patch_barrier(monkeypatch)
+
+    v = FakeVehicle(id=5, is_blacklisted=False)
+    svc = gate_module.GateService(FakeDB())
+    svc.vehicles = FakeVehicleRepo(vehicle=v)
+    svc.sessions = FakeSessionRepo(active=None)
+    svc.drivers = FakeDriverRepo()
+
+    svc.handle_entry_scan(region_code="CA", plate_text="1234AB", gate_id="1", source="camera")
+    v.is_blacklisted = True  # set elsewhere, without invalidating this cache
+
+    with pytest.raises(HTTPException) as e:
+        svc.handle_entry_scan(region_code="CA", plate_text="1234AB", gate_id="1", source="camera")
+    assert e.value.detail == "blacklisted"
+    assert svc.cache.stats()["hits"] == 1
+
+
+def test_entry_uses_captured_at_for_session_start(monkeypatch):
+    _patch_barrier(monkeypatch)
+
+    svc = gate_module.GateService(FakeDB())
+    svc.vehicles = FakeVehicleRepo(vehicle=FakeVehicle(id=7))
+    svc.sessions = FakeSessionRepo(active=None)
+    svc.drivers = FakeDriverRepo()
+
+    captured = datetime.now(timezone.utc) - timedelta(minutes=3)
+    svc.handle_entry_scan(region_code="BG", plate_text="CAP1", gate_id="1", source="camera", captured_at=captured)
+
+    assert svc.sessions.created == [(7, captured)]
+
+
+def test_visitor_exit_priced_up_to_captured_at(monkeypatch):
+    _patch_barrier(monkeypatch)
+
+    now = datetime.now(timezone.utc)
+    active = FakeSession(id=12, started_at=now - timedelta(minutes=30), status="open")
+    svc = gate_module.GateService(FakeDB())
+    svc.vehicles = FakeVehicleRepo(vehicle=FakeVehicle(id=7))
+    svc.sessions = FakeSessionRepo(active=active)
+    svc.subs = FakeSubsRepo(active_sub=False)
+    svc.plans = FakePlanRepo(visitor_plan=FakeVisitorPlan(price_per_minute_cents=10))
+    _wire_exit_context(svc)
+
+    # the exit was seen 20 minutes ago; the retry arriving now must not bill those 20 minutes
+    out = svc.handle_exit_scan(
+        region_code="BG", plate_text="CAP1", gate_id="2", source="camera",
+        captured_at=now - timedelta(minutes=20),
+    )
+
+    assert out["minutes_billable"] == 10
+    assert out["amount_cents"] == 100
+    assert active.ended_at == now - timedelta(minutes=20)
+
+
+@pytest.mark.parametrize("offset, detail", [
+    (timedelta(minutes=10), "captured_at_in_future"),
+    (-timedelta(days=30), "captured_at_too_old"),
+])
+def test_captured_at_out_of_bounds_is_rejected(monkeypatch, offset, detail):
+    _patch_barrier(monkeypatch)
+
+    svc = gate_module.GateService(FakeDB())
+    with pytest.raises(HTTPException) as e:
+        svc.handle_entry_scan(
+            region_code="BG", plate_text="CAP1", gate_id="1", source="camera",
+            captured_at=datetime.now(timezone.utc) + offset,
+        )
+    assert e.value.status_code == 422
+    assert e.value.detail == detail
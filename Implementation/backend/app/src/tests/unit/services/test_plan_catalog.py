@@ -0,0 +1,63 @@
+# src/tests/unit/services/test_plan_catalog.py
+from types import SimpleNamespace
+
+from src.models.plan import PlanType
+from src.services.plan_catalog import PlanCatalog
+
+
+class FakePlanRepo:
+    def __init__(self, plans):
+        self.plans = plans
+        self.calls = 0
+
+    def list(self, type_=None):
+        self.calls += 1
+        return list(self.plans)
+
+
+def _plan(id, type_, **kw):
+    return SimpleNamespace(id=id, type=type_, currency=kw.get("currency", "EUR"),
+                           price_per_minute_cents=kw.get("price_per_minute_cents"))
+
+
+def test_reads_are_served_from_memory_newest_first():
+    catalog = PlanCatalog(refresh_seconds=3600)
+    repo = FakePlanRepo([
+        _plan(1, PlanType.visitor, price_per_minute_cents=5),
+        _plan(2, PlanType.subscription),
+        _plan(3, PlanType.visitor, price_per_minute_cents=7),
+    ])
+
+    assert catalog.visitor_plan(repo).id == 3
+    assert [p.id for p in catalog.plans(repo)] == [3, 2, 1]
+    assert [p.id for p in catalog.plans(repo, type_=PlanType.subscription)] == [2]
+    assert catalog.get(1, repo).price_per_minute_cents == 5
+    assert catalog.get(99, repo) is None
+    assert repo.calls == 1
+
+
+def test_invalidate_reloads_and_version_follows_the_contents():
+    catalog = PlanCatalog(refresh_seconds=3600)
+    repo = FakePlanRepo([_plan(1, PlanType.visitor, price_per_minute_cents=5)])
+    catalog.plans(repo)
+    v1 = catalog.version
+
+    # an unchanged reload keeps the version
+    catalog.load(repo.list())
+    assert catalog.version == v1
+
+    repo.plans = [_plan(1, PlanType.visitor, price_per_minute_cents=9)]
+    catalog.invalidate()
+    assert catalog.version == v1  # nothing reloaded yet
+    assert catalog.visitor_plan(repo).price_per_minute_cents == 9
+    v2 = catalog.version
+    assert v2 != v1
+    assert catalog.stats()["reloads"] == 3
+
+    # another worker loading the same rows reports the same version
+    other = PlanCatalog(refresh_seconds=3600)
+    other.load(repo.list())
+    assert other.version == v2
+    repo.plans = [_plan(1, PlanType.visitor, price_per_minute_cents=5)]
+    other.load(repo.list())
+    assert other.version == v1
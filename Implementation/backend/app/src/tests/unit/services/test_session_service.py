@@ -38,6 +38,15 @@ class FakeRepo:
         self.active_for_vehicle[s.vehicle_id] = s
         return s
 
+    def get_or_create_open(self, vehicle_id, started_at=None):
+        active = self.active_for_vehicle.get(vehicle_id)
+        if active is not None:
+            return active, False
+        kwargs = {"vehicle_id": vehicle_id}
+        if started_at is not None:
+            kwargs["started_at"] = started_at
+        return self.create(**kwargs), True
+
     def get(self, session_id):
         return self.sessions_by_id.get(session_id)
 
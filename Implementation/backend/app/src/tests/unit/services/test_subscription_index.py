@@ -0,0 +1,73 @@
+# src/tests/unit/services/test_subscription_index.py
+from datetime import datetime, timedelta, timezone
+
+from src.models.plan import PlanType
+from src.services.subscription_index import SubscriptionIndex
+
+NOW = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+
+
+class FakeSubsRepo:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = 0
+        self.asked = []
+
+    def list_active_windows(self, vehicle_id=None):
+        self.calls += 1
+        self.asked.append(vehicle_id)
+        return [r for r in self.rows if vehicle_id is None or r[1] == vehicle_id]
+
+
+def _row(sub_id, vehicle_id, start_days, end_days, plan_type=PlanType.subscription):
+    return (sub_id, vehicle_id, NOW + timedelta(days=start_days), NOW + timedelta(days=end_days), plan_type)
+
+
+def test_active_at_answers_from_memory():
+    index = SubscriptionIndex(refresh_seconds=3600)
+    repo = FakeSubsRepo([
+        _row(1, 7, -40, -10),
+        _row(2, 7, -10, 20),
+        _row(3, 7, 20, 50),
+        _row(4, 8, -1, 1, PlanType.visitor),
+    ])
+    index.reload(repo)
+
+    assert index.active_at(7, NOW, repo).subscription_id == 2
+    assert index.active_at(7, NOW + timedelta(days=20), repo).subscription_id == 3  # valid_to is exclusive
+    assert index.active_at(7, NOW - timedelta(days=60), repo) is None
+    assert index.active_at(8, NOW, repo) is None  # only subscription plans by default
+    assert index.active_at(8, NOW, repo, plan_type=None).subscription_id == 4
+    # naive timestamps (SQLite) are read as UTC
+    assert index.active_at(7, NOW.replace(tzinfo=None), repo).subscription_id == 2
+    assert repo.calls == 1
+
+
+def test_unloaded_index_reads_only_the_scanned_vehicle():
+    index = SubscriptionIndex(refresh_seconds=3600)
+    repo = FakeSubsRepo([_row(1, 7, -1, 30), _row(2, 8, -1, 30)])
+
+    assert index.active_at(7, NOW, repo).subscription_id == 1
+    assert repo.asked == [7]  # never a full reload on the scan path
+    assert index.loaded is False
+    assert index.stats()["vehicles"] == 1
+
+
+def test_refresh_vehicle_and_consistency_check():
+    index = SubscriptionIndex(refresh_seconds=3600)
+    repo = FakeSubsRepo([_row(1, 7, -1, 30), _row(2, 8, -1, 30)])
+    index.reload(repo)
+    assert index.check(repo.list_active_windows())["consistent"]
+
+    # written elsewhere: vehicle 7 canceled, vehicle 8 extended, vehicle 9 activated
+    repo.rows = [_row(2, 8, -1, 60), _row(3, 9, -1, 30)]
+    report = index.check(repo.list_active_windows())
+    assert report["consistent"] is False
+    assert (report["missing"], report["extra"], report["mismatched"]) == ([3], [1], [2])
+
+    for vehicle_id in (7, 8, 9):
+        index.refresh_vehicle(repo, vehicle_id)
+    assert index.active_at(7, NOW) is None
+    assert index.active_at(9, NOW).subscription_id == 3
+    assert index.check(repo.list_active_windows())["consistent"]
+    assert index.stats()["vehicles"] == 2
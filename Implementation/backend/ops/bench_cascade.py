@@ -0,0 +1,221 @@
+"""
+Benchmark: full-frame YOLO vs ROI-only vs the ROI cascade (plate_cascade.py).
+
+Per policy: YOLO cost per frame, plate recall by plate width, and boxes
+reported outside the lane.
+
+Sources:
+
+- default: rendered 1920x1080 gate frames, a plate of --min-w..--max-w px in
+  the lane (ROI) on most frames and one in the neighbouring lane on some.
+  YOLO is a stand-in that sees exactly what the network would: the image is
+  letterboxed down to imgsz, and a plate counts as found when its width
+  there is at least --min-px (--coarse-min-px at the coarse pass's lower
+  confidence). Cost is estimated from the letterboxed input area, at
+  --ms-640 for a 640x640 input. Both thresholds are assumptions; the point
+  is where the pixels go, not the exact numbers.
+- --video PATH --yolo: YOLO_WEIGHTS on real footage, measured CPU per frame;
+  recall is then agreement with the full-frame boxes.
+
+    python bench_cascade.py
+    python bench_cascade.py --video /assets/entry_demo.mp4 --yolo --roi 0.2,0.4,0.8,1
+"""
+import argparse
+import math
+import time
+
+import cv2
+import numpy as np
+
+import recognizer_engine as cfg
+from plate_cascade import CascadeDetector, parse_roi, roi_pixels
+from plate_track import iou
+
+W, H = 1920, 1080
+BUCKETS = [(0, 90), (90, 120), (120, 180), (180, 10_000)]
+
+
+def letterboxed(h: int, w: int, imgsz: int) -> tuple[int, int]:
+    """(h, w) of the network input for an h x w image (long side to imgsz, short side padded to 32)."""
+    s = imgsz / max(h, w)
+    return (imgsz, 32 * math.ceil(w * s / 32)) if h >= w else (32 * math.ceil(h * s / 32), imgsz)
+
+
+class StandIn:
+    """Threshold-and-contour 'YOLO' that only finds plates it would have enough pixels for."""
+
+    def __init__(self, imgsz: int, min_px: float, ms_640: float):
+        self.imgsz, self.min_px, self.ms_640 = imgsz, min_px, ms_640
+        self.calls = 0
+        self.est_ms = 0.0
+        self.cpu = 0.0
+
+    def __call__(self, images):
+        t0 = time.thread_time()
+        out = []
+        for image in images:
+            h, w = image.shape[:2]
+            lh, lw = letterboxed(h, w, self.imgsz)
+            self.est_ms += self.ms_640 * lh * lw / (640 * 640)
+            s = min(1.0, self.imgsz / max(h, w))  # upscaling adds no detail
+            seen = image if s == 1.0 else cv2.resize(image, None, fx=s, fy=s, interpolation=cv2.INTER_AREA)
+            mask = cv2.cvtColor(seen, cv2.COLOR_BGR2GRAY) > 150
+            contours, _ = cv2.findContours(mask.astype(np.uint8), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            boxes = []
+            for c in contours:
+                x, y, bw, bh = cv2.boundingRect(c)
+                if bw >= self.min_px and 2.0 <= bw / bh <= 6.0:
+                    boxes.append([x / s, y / s, (x + bw) / s, (y + bh) / s])
+            out.append(np.array(boxes, dtype=float).round().astype(int).reshape(-1, 4))
+        self.calls += len(images)
+        self.cpu += time.thread_time() - t0
+        return out
+
+
+def rendered_frames(args, roi_px):
+    """(image, plate box in the lane or None, plate box outside it or None) per frame."""
+    rng = np.random.default_rng(args.seed)
+    x1, y1, x2, y2 = roi_px
+    base = np.full((H, W, 3), 90, dtype=np.uint8)
+    base[int(H * 0.45):, :] = 60  # road
+    for _ in range(args.frames):
+        image = base.copy()
+        boxes = []
+        for inside, p in ((True, 0.8), (False, 0.3)):
+            if rng.random() >= p:
+                boxes.append(None)
+                continue
+            w = int(rng.uniform(args.min_w, args.max_w))
+            h = max(8, w // 4)
+            if inside:
+                bx = int(rng.uniform(x1 + 10, x2 - w - 10))
+                by = int(rng.uniform(y1 + 40, y2 - h - 10))
+            else:  # neighbouring lane, left of the ROI
+                bx = int(rng.uniform(10, max(11, x1 - w - 40)))
+                by = int(rng.uniform(y1 + 40, H - h - 10))
+            cv2.rectangle(image, (bx - w // 2, by - h * 3), (bx + w * 3 // 2, by + h * 2), (35, 35, 35), -1)  # car
+            cv2.rectangle(image, (bx, by), (bx + w, by + h), (235, 235, 235), -1)
+            cv2.putText(image, "CB1234AT", (bx + w // 30, by + h * 3 // 4), cv2.FONT_HERSHEY_SIMPLEX,
+                        w / 190.0 * 0.95, (20, 20, 20), max(1, w // 100))
+            boxes.append((bx, by, bx + w, by + h))
+        yield image, boxes[0], boxes[1]
+
+
+def policies(args, roi, make):
+    """name -> (CascadeDetector, roi it gets, its models)."""
+    full = make(cfg.YOLO_CONF, None, args.min_px)
+    roi_only = make(cfg.YOLO_CONF, None, args.min_px)
+    fine = make(cfg.YOLO_CONF, cfg.CASCADE_FINE_SIZE, args.min_px)
+    coarse = make(cfg.CASCADE_COARSE_CONF, cfg.CASCADE_COARSE_SIZE, args.coarse_min_px)
+    return {
+        "full-frame": (CascadeDetector(full), None, [full]),
+        "roi": (CascadeDetector(roi_only), roi, [roi_only]),
+        "roi-cascade": (CascadeDetector(fine, coarse, coarse_size=cfg.CASCADE_COARSE_SIZE, pad=cfg.CASCADE_PAD),
+                        roi, [coarse, fine]),
+    }
+
+
+def run_rendered(args, roi):
+    roi_px = roi_pixels(roi, W, H)
+    runs = policies(args, roi, lambda conf, imgsz, min_px: StandIn(imgsz or 640, min_px, args.ms_640))
+    found = {name: {b: [0, 0] for b in BUCKETS} for name in runs}
+    outside = {name: 0 for name in runs}
+    overhead = {name: 0.0 for name in runs}
+    n = 0
+    for n, (image, plate, other) in enumerate(rendered_frames(args, roi_px), 1):
+        for name, (detector, det_roi, models) in runs.items():
+            model_cpu = sum(m.cpu for m in models)
+            t0 = time.thread_time()
+            boxes = detector([image], [det_roi])[0]
+            overhead[name] += time.thread_time() - t0 - (sum(m.cpu for m in models) - model_cpu)
+            if plate is not None:
+                bucket = next(b for b in BUCKETS if b[0] <= plate[2] - plate[0] < b[1])
+                found[name][bucket][1] += 1
+                found[name][bucket][0] += any(iou(plate, tuple(b)) >= 0.5 for b in boxes)
+            if other is not None:
+                outside[name] += any(iou(other, tuple(b)) >= 0.5 for b in boxes)
+
+    print(f"\n[RUN] rendered {W}x{H}, {n} frames, roi={roi_px}, plates {args.min_w}-{args.max_w}px wide; "
+          f"stand-in YOLO: {args.ms_640:.0f}ms per 640x640, min {args.min_px}px ({args.coarse_min_px}px coarse)")
+    for name, (detector, _, models) in runs.items():
+        recall = "  ".join(
+            f"{lo}-{hi if hi < 10_000 else ''}px {f / t:4.0%} ({f}/{t})" if t else f"{lo}-{hi if hi < 10_000 else ''}px -"
+            for (lo, hi), (f, t) in found[name].items())
+        total = sum(f for f, _ in found[name].values()) / max(1, sum(t for _, t in found[name].values()))
+        cascade = f"  coarse hits={detector.coarse_hits} confirmed={detector.fine_hits}" if detector.coarse else ""
+        print(f"  {name:11s}: yolo ~{sum(m.est_ms for m in models) / n:5.1f}ms/frame "
+              f"(+{overhead[name] / n * 1000:.2f}ms crop/resize)  recall {total:4.0%}: {recall}  "
+              f"out-of-lane boxes={outside[name]}{cascade}")
+
+
+def video_frames(path: str):
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Cannot open video: {path}")
+    try:
+        while True:
+            ok, image = cap.read()
+            if not ok:
+                return
+            yield image
+    finally:
+        cap.release()
+
+
+def run_video(args, roi, path):
+    shared = cfg.yolo_detector()
+    runs = policies(args, roi, lambda conf, imgsz, _: cfg.yolo_detector(conf=conf, imgsz=imgsz, model=shared.model))
+    cpu = {name: 0.0 for name in runs}
+    hits = {name: 0 for name in runs}
+    agree = {name: 0 for name in runs}
+    n = 0
+    for n, image in enumerate(video_frames(path), 1):
+        if args.frames and n > args.frames:
+            n -= 1
+            break
+        largest = {}
+        for name, (detector, det_roi, _) in runs.items():
+            t0 = time.thread_time()
+            boxes = detector([image], [det_roi])[0]
+            cpu[name] += time.thread_time() - t0
+            if len(boxes):
+                hits[name] += 1
+                largest[name] = max(map(tuple, boxes), key=lambda b: (b[2] - b[0]) * (b[3] - b[1]))
+        base = largest.get("full-frame")
+        for name, box in largest.items():
+            agree[name] += base is not None and iou(base, box) >= 0.5
+
+    print(f"\n[RUN] {path}: {n} frames, roi={args.roi or 'whole frame'}, YOLO measured")
+    for name in runs:
+        print(f"  {name:11s}: cpu={cpu[name] / max(1, n) * 1000:6.1f}ms/frame  frames with a plate={hits[name]}  "
+              f"same box as full-frame={agree[name]}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--video", action="append", default=[], help="video file(s); needs --yolo")
+    parser.add_argument("--yolo", action="store_true", help="run YOLO_WEIGHTS instead of the stand-in")
+    parser.add_argument("--roi", default=cfg.ROI or "0.25,0.4,0.75,1.0", help="x1,y1,x2,y2, px or fractions")
+    parser.add_argument("--frames", type=int, default=400, help="rendered frames (or a cap on video frames)")
+    parser.add_argument("--min-w", type=int, default=60)
+    parser.add_argument("--max-w", type=int, default=260)
+    parser.add_argument("--min-px", type=float, default=32, help="stand-in: smallest plate width YOLO finds")
+    parser.add_argument("--coarse-min-px", type=float, default=20, help="... at CASCADE_COARSE_CONF")
+    parser.add_argument("--ms-640", type=float, default=80.0, help="stand-in: YOLO CPU for a 640x640 input")
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+    if args.video and not args.yolo:
+        parser.error("--video needs --yolo")
+
+    roi = parse_roi(args.roi)
+    print(f"[BENCH] coarse={cfg.CASCADE_COARSE_SIZE}px@{cfg.CASCADE_COARSE_CONF} fine={cfg.CASCADE_FINE_SIZE}px"
+          f"@{cfg.YOLO_CONF} pad={cfg.CASCADE_PAD}")
+    if args.video:
+        for path in args.video:
+            run_video(args, roi, path)
+    else:
+        run_rendered(args, roi)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Benchmark: plate detector backends, e.g. PyTorch (ultralytics .pt) vs ONNX
+Runtime FP32 vs ONNX Runtime INT8 (yolo_onnx.py).
+
+Each backend runs in a fresh worker process, so its memory is its own:
+resident size after loading, at the end and at its peak (/proc VmRSS,
+VmHWM). Per call (one frame): wall latency p50/p95 and process CPU
+(ONNX Runtime and torch both use a thread pool). Boxes are compared with the
+first backend's: a frame agrees when both find nothing or their best boxes
+overlap by IoU >= 0.5.
+
+Frames come from --video or the rendered gate scene of bench_motion_gate.py;
+they are decoded once and handed to the workers as an .npy file.
+
+    python yolo_onnx.py --weights /assets/best.pt --int8 --calib /assets/entry_demo.mp4
+    python bench_detector.py /assets/best.pt /assets/best.onnx /assets/best.int8.onnx
+"""
+import argparse
+import itertools
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+import recognizer_engine
+from plate_track import iou
+from recognizer_engine import process_usage
+
+
+def frames(args) -> list:
+    if args.frames_file:
+        return list(np.load(args.frames_file))
+    if args.video:
+        cap = cv2.VideoCapture(args.video)
+        if not cap.isOpened():
+            raise RuntimeError(f"Cannot open video: {args.video}")
+        images = []
+        while len(images) < args.frames:
+            ok, image = cap.read()
+            if not ok:
+                break
+            images.append(image)
+        cap.release()
+        return images
+    from bench_motion_gate import synthetic_frames
+
+    # every 10th frame from the first car onwards, so most frames show one
+    return [img for img, _ in itertools.islice(synthetic_frames(args.seed), 1150, None, 10)][:args.frames]
+
+
+def peak_rss_mb() -> float:
+    """VmHWM: unlike getrusage's ru_maxrss it starts over at exec, so it is the worker's own peak."""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024.0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def worker(args) -> None:
+    images = frames(args)
+    rss_start, _ = process_usage()
+    t0 = time.perf_counter()
+    detect = recognizer_engine.yolo_detector(args.worker, args.conf, imgsz=args.imgsz)
+    load_s = time.perf_counter() - t0
+    rss_loaded, _ = process_usage()
+    for image in images[:args.warmup]:
+        detect([image])
+    latency, cpu, best = [], [], []
+    for image in images:
+        _, c0 = process_usage()
+        t0 = time.perf_counter()
+        boxes = detect([image])[0]
+        latency.append(time.perf_counter() - t0)
+        cpu.append(process_usage()[1] - c0)
+        best.append([int(v) for v in boxes[0]] if len(boxes) else None)
+    rss_end, _ = process_usage()
+    print("RESULT " + json.dumps({
+        "load_s": load_s,
+        "rss_base_mb": rss_start,
+        "rss_loaded_mb": rss_loaded,
+        "rss_end_mb": rss_end,
+        "rss_peak_mb": peak_rss_mb(),
+        "latency_ms": [v * 1000 for v in latency],
+        "cpu_ms": [v * 1000 for v in cpu],
+        "best": best,
+    }), flush=True)
+
+
+def run_backend(args, weights: str, frames_file: str) -> dict:
+    cmd = [sys.executable, __file__, "--worker", weights, "--frames-file", frames_file, "--warmup", str(args.warmup),
+           "--conf", str(args.conf)]
+    if args.imgsz:
+        cmd += ["--imgsz", str(args.imgsz)]
+    env = dict(os.environ, YOLO_THREADS=str(args.threads))
+    p = subprocess.run(cmd, stdout=subprocess.PIPE, text=True, env=env)
+    line = next((ln for ln in p.stdout.splitlines() if ln.startswith("RESULT ")), None)
+    if p.returncode != 0 or line is None:
+        raise RuntimeError(f"worker for {weights} failed with exit code {p.returncode}")
+    return json.loads(line[len("RESULT "):])
+
+
+def _agree(a, b) -> bool:
+    if a is None or b is None:
+        return a is None and b is None
+    return iou(a, b) >= 0.5
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("weights", nargs="*", help=".pt and/or .onnx files; the first is the reference")
+    parser.add_argument("--video", help="default: rendered gate scene")
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--conf", type=float, default=recognizer_engine.YOLO_CONF)
+    parser.add_argument("--imgsz", type=int, default=None, help="network input size (default: the model's)")
+    parser.add_argument("--threads", type=int, default=recognizer_engine.YOLO_THREADS,
+                        help="YOLO_THREADS for ONNX Runtime, 0 = all cores")
+    parser.add_argument("--seed", type=int, default=3)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--frames-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        worker(args)
+        return
+    if not args.weights:
+        parser.error("give at least one weights file")
+
+    print(f"[BENCH] {args.frames} frames from {args.video or 'the rendered scene'}, conf={args.conf}, "
+          f"imgsz={args.imgsz or 'default'}, threads={args.threads or 'all'}, {os.cpu_count()} cpu(s)")
+    # decoded (or rendered) once, so the workers' memory is the backend's, not the video decoder's
+    with tempfile.NamedTemporaryFile(suffix=".npy") as f:
+        np.save(f, np.stack(frames(args)))
+        f.flush()
+        results = [(weights, run_backend(args, weights, f.name)) for weights in args.weights]
+    reference = None
+    for weights, r in results:
+        reference = reference or r["best"]
+        lat = sorted(r["latency_ms"])
+        agree = sum(_agree(a, b) for a, b in zip(reference, r["best"]))
+        found = sum(b is not None for b in r["best"])
+        print(f"  {os.path.basename(weights):22s}: latency p50={statistics.median(lat):6.1f}ms "
+              f"p95={lat[int(0.95 * (len(lat) - 1))]:6.1f}ms  cpu={statistics.fmean(r['cpu_ms']):6.1f}ms/frame  "
+              f"rss loaded={r['rss_loaded_mb']:5.0f}MB (+{r['rss_loaded_mb'] - r['rss_base_mb']:4.0f}) "
+              f"end={r['rss_end_mb']:5.0f}MB peak={r['rss_peak_mb']:5.0f}MB  load={r['load_s']:4.1f}s  "
+              f"frames with a plate={found}  agree={agree}/{len(r['best'])}")
+
+
+if __name__ == "__main__":
+    main()
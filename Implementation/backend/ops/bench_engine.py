@@ -0,0 +1,173 @@
+"""
+Benchmark: the serial recognizer loop vs the pipelined RecognizerEngine on a
+simulated 30 fps camera.
+
+The camera produces frames on the wall clock into a small driver buffer that
+drops its oldest frame when full, like a V4L2/RTSP capture. Detection and OCR
+are stand-ins that hold the stage for a fixed time without holding the GIL,
+as YOLO and EasyOCR do in native code; dispatch (vote, cooldown, spool) is
+the real one. No models, camera or API are needed.
+
+- serial:    read -> detect -> OCR -> dispatch in one loop (the old scripts)
+- pipelined: RecognizerEngine, one thread per stage, drop-oldest frame queue
+
+Reported per run: frames processed per second, frames lost (driver buffer +
+engine queue) and end-to-end lag from the moment the camera produced a frame
+to its dispatch.
+
+    python bench_engine.py --seconds 10 --detect-ms 25 --ocr-ms 40
+"""
+import argparse
+import statistics
+import threading
+import time
+
+import numpy as np
+
+import recognizer_engine
+from recognizer_engine import Frame, RecognizerEngine
+
+PLATES = ["CB1234AT", "PB7780KX", "CA0512BB"]
+
+
+class FakeCamera:
+    """cv2.VideoCapture stand-in: `fps` frames per second into a drop-oldest buffer of `buffer` frames."""
+
+    def __init__(self, fps: float, seconds: float, buffer: int = 4):
+        self.period = 1.0 / fps
+        self.total = int(fps * seconds)
+        self.buffer = buffer
+        self.started = None
+        self.next_idx = 0        # next frame to hand out
+        self.produced_at = {}    # frame number -> when the camera produced it
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        if self.started is None:
+            self.started = time.time()
+        produced = min(self.total, int((time.time() - self.started) / self.period) + 1)
+        if self.next_idx >= self.total:
+            return False, None
+        # frames that fell out of the driver buffer are gone
+        self.next_idx = max(self.next_idx, produced - self.buffer)
+        if self.next_idx >= produced:  # wait for the next frame
+            time.sleep(self.started + self.next_idx * self.period - time.time() + 1e-4)
+        n = self.next_idx
+        self.next_idx += 1
+        self.produced_at[n] = self.started + n * self.period
+        image = np.zeros((72, 128, 3), dtype=np.uint8)
+        image[0, 0, 0:2] = n % 256, n // 256
+        return True, image
+
+    def set(self, *args):
+        pass
+
+    def release(self):
+        pass
+
+
+class NullSpool:
+    path = ":memory:"
+
+    def __init__(self):
+        self.sent = []
+
+    def submit(self, direction, payload):
+        self.sent.append(payload["plate_text"])
+
+    def pending(self):
+        return 0
+
+    def stop(self):
+        pass
+
+
+def fake_models(detect_ms: float, ocr_ms: float):
+    def detect_batch(images):
+        time.sleep(detect_ms / 1000.0 * len(images))
+        return [np.array([[10, 10, 130, 40]]) for _ in images]
+
+    def read_text(gray):
+        time.sleep(ocr_ms / 1000.0)
+        return PLATES[int(time.time() / 4) % len(PLATES)]  # a new car every 4s
+
+    return detect_batch, read_text
+
+
+class TimedEngine(RecognizerEngine):
+    """Records camera -> dispatch lag using the frame number stamped into each image."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.true_lag = []
+        self.processed = 0
+
+    def dispatch(self, reading):
+        image = reading.detection.frame.image
+        n = int(image[0, 0, 0]) + 256 * int(image[0, 0, 1])
+        self.true_lag.append(time.time() - self.lanes[0].cap.produced_at[n])
+        self.processed += 1
+        super().dispatch(reading)
+
+
+def _engine(args, live: bool) -> TimedEngine:
+    detect_batch, read_text = fake_models(args.detect_ms, args.ocr_ms)
+    return TimedEngine(
+        "fake", live=live, regex="ANY",
+        capture=FakeCamera(args.fps, args.seconds), detect_batch=detect_batch,
+        read_text=read_text, spool=NullSpool(), exit_after_first=False,
+    )
+
+
+def run_serial(args) -> TimedEngine:
+    engine = _engine(args, live=True)
+    lane = engine.lanes[0]
+    idx = 0
+    while True:
+        ok, image = lane.cap.read()
+        if not ok:
+            break
+        idx += 1
+        engine.dispatch(engine.read_plate(engine.find_plate(Frame(idx, time.time(), image, lane))))
+    return engine
+
+
+def run_pipelined(args) -> TimedEngine:
+    engine = _engine(args, live=True)
+    engine.run()
+    return engine
+
+
+def _report(name: str, engine: TimedEngine, elapsed: float, args) -> None:
+    lag = sorted(engine.true_lag)
+    p95 = lag[min(len(lag) - 1, int(0.95 * len(lag)))]
+    total = engine.lanes[0].cap.total
+    print(f"  {name:9s}: {engine.processed / elapsed:5.1f} fps  lost={total - engine.processed:4d}/{total}  "
+          f"lag p50={statistics.median(lag) * 1000:6.0f}ms p95={p95 * 1000:6.0f}ms  "
+          f"scans={len(engine.spool.sent)}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--detect-ms", type=float, default=25.0)
+    parser.add_argument("--ocr-ms", type=float, default=40.0)
+    args = parser.parse_args()
+
+    recognizer_engine.FRAME_SKIP = 1
+    recognizer_engine.MOTION_GATE = False  # static synthetic frames would leave the lane idle
+    recognizer_engine.OCR_REFRESH_SEC = 0  # every crop costs an OCR call (no plate_track skipping)
+    recognizer_engine.STATS_EVERY_SEC = args.seconds + 60  # one [ENGINE] line at the end
+    print(f"[BENCH] camera={args.fps:.0f}fps for {args.seconds:.0f}s detect={args.detect_ms:.0f}ms "
+          f"ocr={args.ocr_ms:.0f}ms threads={threading.active_count()}")
+    for name, run in (("serial", run_serial), ("pipelined", run_pipelined)):
+        t0 = time.time()
+        engine = run(args)
+        _report(name, engine, time.time() - t0, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Benchmark: fixed FRAME_SKIP vs the motion-gated scheduler (motion_gate.py).
+
+Every frame of the source goes through each policy's FrameScheduler, as in
+the capture stage. Reported per policy:
+
+- YOLO calls (sampled frames) and the CPU they cost: measured with --yolo,
+  otherwise estimated at --detect-ms per call
+- the gate's own CPU (thread time spent in admit())
+- time to first detection per vehicle: from the first frame where a plate is
+  detectable to the first sampled frame that shows it
+
+Sources:
+
+- --video PATH (repeatable), e.g. /assets/entry_demo.mp4. "Detectable" comes
+  from running YOLO on every frame, so time to first detection needs --yolo;
+  without it only calls and CPU are reported.
+- default: a rendered gate scene at 30 fps (empty lane with sensor noise,
+  lighting drift and a flickering lamp, cars driving up, waiting and
+  leaving), where "detectable" is known exactly.
+
+    python bench_motion_gate.py
+    python bench_motion_gate.py --video /assets/entry_demo.mp4 --yolo
+"""
+import argparse
+import statistics
+import time
+
+import cv2
+import numpy as np
+
+import recognizer_engine as cfg
+from motion_gate import FrameScheduler, MotionGate
+
+FPS = 30.0
+W, H = 640, 360
+# (seconds of empty lane before the car, seconds waiting at the barrier)
+CARS = [(40, 6), (25, 12), (8, 4), (60, 5)]
+TAIL_SEC = 30
+ENTER_SEC, LEAVE_SEC = 2.5, 2.0
+
+
+def _plate_ok(box) -> bool:
+    x1, y1, x2, y2 = box
+    w, h = x2 - x1, y2 - y1
+    return w >= cfg.MIN_W and h >= cfg.MIN_H and cfg.MIN_AR <= w / max(1, h) <= cfg.MAX_AR
+
+
+def synthetic_frames(seed: int):
+    """(image, detectable?) per frame of the rendered scene."""
+    rng = np.random.default_rng(seed)
+    noise = [rng.normal(0, 3, (H, W, 3)).astype(np.int16) for _ in range(16)]
+    base = np.full((H, W, 3), 110, dtype=np.int16)
+    base[250:, :] = 70  # road
+    plate = np.full((40, 160, 3), 230, dtype=np.uint8)
+    cv2.putText(plate, "CB1234AT", (6, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (20, 20, 20), 2)
+    idx = 0
+
+    def frame(car_x=None):
+        nonlocal idx
+        t = idx / FPS
+        image = base + int(8 * np.sin(2 * np.pi * t / 90))  # lighting drift
+        image[40:48, 600:608] += 60 if idx % 15 < 7 else 0  # flickering lamp, ~0.03% of the frame
+        box = None
+        if car_x is not None:
+            x = int(car_x)
+            image[170:300, max(0, x):max(0, x + 300)] = 35
+            box = (x + 70, 245, x + 230, 285)
+            if 0 <= box[0] and box[2] <= W:
+                image[box[1]:box[3], box[0]:box[2]] = plate
+        image = np.clip(image + noise[idx % len(noise)], 0, 255).astype(np.uint8)
+        idx += 1
+        detectable = box is not None and box[0] >= 0 and box[2] <= W and _plate_ok(box)
+        return image, detectable
+
+    for idle, wait in CARS:
+        for _ in range(int(idle * FPS)):
+            yield frame()
+        n = int(ENTER_SEC * FPS)
+        for i in range(n):            # drives in from the left
+            yield frame(-300 + 470 * i / (n - 1))
+        for _ in range(int(wait * FPS)):
+            yield frame(170)
+        n = int(LEAVE_SEC * FPS)
+        for i in range(n):            # drives off to the right
+            yield frame(170 + 500 * i / (n - 1))
+    for _ in range(int(TAIL_SEC * FPS)):
+        yield frame()
+
+
+def video_frames(path: str, detect_batch):
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Cannot open video: {path}")
+    try:
+        while True:
+            ok, image = cap.read()
+            if not ok:
+                return
+            detectable = None
+            if detect_batch is not None:
+                detectable = any(_plate_ok(tuple(b)) for b in detect_batch([image])[0])
+            yield image, detectable
+    finally:
+        cap.release()
+
+
+def _scheduler(gated: bool, fixed_skip: int) -> FrameScheduler:
+    return FrameScheduler(
+        MotionGate(diff=cfg.MOTION_DIFF) if gated else None,
+        fixed_skip=fixed_skip, min_area=cfg.MOTION_MIN_AREA, skip_min=cfg.FRAME_SKIP_MIN,
+        skip_max=cfg.FRAME_SKIP_MAX, hold_sec=cfg.MOTION_HOLD_SEC, idle_sec=cfg.IDLE_DETECT_SEC,
+    )
+
+
+def run(frames, fps: float, schedulers: dict, detect_batch):
+    """Feed every frame to every scheduler; per policy: calls, gate/detect CPU, time to first detection, misses."""
+    out = {name: {"calls": 0, "gate_cpu": 0.0, "detect_cpu": 0.0, "ttfd": [], "missed": 0} for name in schedulers}
+    onset = {name: None for name in schedulers}  # when the current vehicle became detectable, until seen
+    prev_detectable = False
+    n = 0
+    for n, (image, detectable) in enumerate(frames, 1):
+        t = n / fps
+        for name, sched in schedulers.items():
+            r = out[name]
+            t0 = time.thread_time()
+            sampled = sched.admit(image, t)
+            r["gate_cpu"] += time.thread_time() - t0
+            if detectable and not prev_detectable:
+                onset[name] = t
+            elif prev_detectable and not detectable and onset[name] is not None:
+                r["missed"] += 1  # gone before a sampled frame showed it
+                onset[name] = None
+            if sampled:
+                r["calls"] += 1
+                if detect_batch is not None:
+                    t0 = time.thread_time()
+                    detect_batch([image])
+                    r["detect_cpu"] += time.thread_time() - t0
+                if detectable and onset[name] is not None:
+                    r["ttfd"].append(t - onset[name])
+                    onset[name] = None
+        prev_detectable = bool(detectable)
+    return out, n / fps
+
+
+def report(out, seconds: float, args, measured: bool) -> None:
+    minutes = seconds / 60.0
+    for name, r in out.items():
+        detect_cpu = r["detect_cpu"] if measured else r["calls"] * args.detect_ms / 1000.0
+        cpu = detect_cpu + r["gate_cpu"]
+        ttfd = r["ttfd"]
+        ttfd_txt = (f"time to first detection mean={statistics.fmean(ttfd) * 1000:5.0f}ms "
+                    f"max={max(ttfd) * 1000:5.0f}ms over {len(ttfd)} vehicle(s)") if ttfd else "time to first detection -"
+        print(f"  {name:13s}: yolo calls={r['calls']:6d} ({r['calls'] / minutes:6.0f}/min)  "
+              f"cpu={cpu / minutes:6.1f}s/min (detect {detect_cpu / minutes:5.1f}, gate {r['gate_cpu'] / minutes:4.2f})  "
+              f"{ttfd_txt}, missed={r['missed']}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--video", action="append", default=[], help="video file(s); default: rendered scene")
+    parser.add_argument("--yolo", action="store_true", help="run YOLO_WEIGHTS: measured detect CPU, real ground truth")
+    parser.add_argument("--fixed-skip", type=int, nargs="+", default=[2, 1], help="FRAME_SKIP baselines")
+    parser.add_argument("--detect-ms", type=float, default=80.0, help="YOLO CPU per call, for the estimate")
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    detect_batch = cfg.yolo_detector() if args.yolo else None
+    print(f"[BENCH] gate: diff={cfg.MOTION_DIFF} min_area={cfg.MOTION_MIN_AREA} skip={cfg.FRAME_SKIP_MIN}..{cfg.FRAME_SKIP_MAX} "
+          f"hold={cfg.MOTION_HOLD_SEC}s idle_detect={cfg.IDLE_DETECT_SEC}s; "
+          + ("YOLO measured" if args.yolo else f"YOLO estimated at {args.detect_ms:.0f}ms/call"))
+    sources = [(path, lambda p=path: video_frames(p, detect_batch), None) for path in args.video]
+    if not sources:
+        sources = [("rendered scene", lambda: synthetic_frames(args.seed), FPS)]
+    for label, frames, fps in sources:
+        if fps is None:
+            cap = cv2.VideoCapture(label)
+            fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+            cap.release()
+        schedulers = {f"FRAME_SKIP={k}": _scheduler(False, k) for k in args.fixed_skip}
+        schedulers["motion-gated"] = _scheduler(True, 1)
+        out, seconds = run(frames(), fps, schedulers, detect_batch)
+        print(f"\n[RUN] {label}: {seconds:.0f}s at {fps:.0f}fps")
+        report(out, seconds, args, measured=detect_batch is not None)
+        print(f"  {'':13s}  sampling: {schedulers['motion-gated'].stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Benchmark: N cameras as N recognizer processes vs one multi-lane process
+(lp_recognizer_multi.py) with batched YOLO.
+
+Every configuration runs in fresh worker processes, so the resident memory
+and CPU time reported are the processes' own (/proc VmRSS, getrusage). Each
+lane is a simulated live camera (see bench_engine.FakeCamera).
+
+By default the models are synthetic, with an assumed cost model:
+
+- a process that loads the models holds --model-mb of resident weights
+- a YOLO call costs --detect-call-ms (pre/post-processing, framework
+  dispatch) plus --detect-image-ms per image in the batch
+- OCR costs --ocr-ms per plate crop
+
+The stand-ins burn real CPU without holding the GIL (hashlib), as YOLO and
+the OCR engine do in native code. With --real the workers load the actual
+YOLO weights and OCR_ENGINE instead, which is the measurement to make on the
+gate hardware.
+
+    python bench_multi_lane.py --lanes 1 2 4 --seconds 15
+"""
+import argparse
+import hashlib
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+import recognizer_engine
+from bench_engine import FakeCamera, NullSpool, PLATES
+from ocr_engines import ocr_engine
+from recognizer_engine import Lane, RecognizerEngine, process_usage
+
+_BLOCK = bytes(1 << 20)
+
+
+def burn(ms: float) -> None:
+    """Spend `ms` of this thread's CPU time; hashlib releases the GIL on large buffers."""
+    end = time.thread_time() + ms / 1000.0
+    while time.thread_time() < end:
+        hashlib.sha256(_BLOCK).digest()
+
+
+def synthetic_models(args):
+    weights = np.ones(int(args.model_mb * 2**20) // 8)  # touched, so it is resident
+
+    def detect_batch(images):
+        burn(args.detect_call_ms + args.detect_image_ms * len(images))
+        return [np.array([[10, 10, 130, 40]]) for _ in images]
+
+    def read_text(gray):
+        burn(args.ocr_ms)
+        return PLATES[int(time.time() / 4) % len(PLATES)]
+
+    detect_batch.weights = weights  # held for the worker's lifetime
+    return detect_batch, read_text
+
+
+class LagEngine(RecognizerEngine):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.all_lag = []
+
+    def dispatch(self, reading):
+        self.all_lag.append(time.time() - reading.detection.frame.captured_at)
+        super().dispatch(reading)
+
+
+def worker(args) -> None:
+    recognizer_engine.FRAME_SKIP = 1
+    recognizer_engine.MOTION_GATE = False  # static synthetic frames would leave the lane idle
+    recognizer_engine.OCR_REFRESH_SEC = 0  # every crop costs an OCR call (no plate_track skipping)
+    recognizer_engine.STATS_EVERY_SEC = args.seconds + 60
+    if args.real:
+        detect_batch, read_text = recognizer_engine.yolo_detector(), ocr_engine(recognizer_engine.OCR_ENGINE)
+    else:
+        detect_batch, read_text = synthetic_models(args)
+    lanes = [
+        Lane(f"cam{i}", live=True, gate_id=f"GATE-{i}", regex="ANY",
+             capture=FakeCamera(args.fps, args.seconds))
+        for i in range(args.worker_lanes)
+    ]
+    engine = LagEngine(lanes=lanes, detect_batch=detect_batch, read_text=read_text,
+                       spool=NullSpool(), exit_after_first=False)
+    t0 = time.time()
+    engine.run()
+    elapsed = time.time() - t0
+    rss_mb, cpu_s = process_usage()
+    print("RESULT " + json.dumps({
+        "rss_mb": rss_mb,
+        "cpu_s": cpu_s,
+        "fps": [lane.processed / elapsed for lane in lanes],
+        "lag_ms": statistics.median(engine.all_lag) * 1000 if engine.all_lag else None,
+    }), flush=True)
+
+
+def _spawn(args, lanes: int) -> subprocess.Popen:
+    cmd = [sys.executable, __file__, "--worker-lanes", str(lanes)]
+    for name in ("seconds", "fps", "model_mb", "detect_call_ms", "detect_image_ms", "ocr_ms"):
+        cmd += [f"--{name.replace('_', '-')}", str(getattr(args, name))]
+    if args.real:
+        cmd.append("--real")
+    return subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+
+
+def _collect(procs) -> list[dict]:
+    results = []
+    for p in procs:
+        out, _ = p.communicate()
+        line = next((ln for ln in out.splitlines() if ln.startswith("RESULT ")), None)
+        if p.returncode != 0 or line is None:
+            raise RuntimeError(f"worker failed with exit code {p.returncode}")
+        results.append(json.loads(line[len("RESULT "):]))
+    return results
+
+
+def _report(name: str, n: int, results: list[dict]) -> None:
+    rss = sum(r["rss_mb"] for r in results)
+    cpu = sum(r["cpu_s"] for r in results)
+    fps = [f for r in results for f in r["fps"]]
+    lag = [r["lag_ms"] for r in results if r["lag_ms"] is not None]
+    print(f"  {name:8s}: rss={rss:7.0f}MB ({rss / n:6.0f}MB/lane)  cpu={cpu:6.1f}s ({cpu / n:5.1f}s/lane)  "
+          f"fps/lane={statistics.fmean(fps):5.1f} (min {min(fps):4.1f})  "
+          f"lag p50={statistics.fmean(lag) if lag else 0:5.0f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lanes", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--seconds", type=float, default=15.0)
+    parser.add_argument("--fps", type=float, default=10.0, help="frames per second per camera, after FRAME_SKIP")
+    parser.add_argument("--model-mb", type=float, default=300.0)
+    parser.add_argument("--detect-call-ms", type=float, default=15.0)
+    parser.add_argument("--detect-image-ms", type=float, default=20.0)
+    parser.add_argument("--ocr-ms", type=float, default=30.0)
+    parser.add_argument("--real", action="store_true", help="load YOLO_WEIGHTS and OCR_ENGINE instead of stand-ins")
+    parser.add_argument("--worker-lanes", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker_lanes:
+        worker(args)
+        return
+
+    print(f"[BENCH] {args.fps:.0f}fps per camera for {args.seconds:.0f}s, "
+          + ("real models" if args.real else
+             f"synthetic models: {args.model_mb:.0f}MB, detect {args.detect_call_ms:.0f}ms/call"
+             f" + {args.detect_image_ms:.0f}ms/image, ocr {args.ocr_ms:.0f}ms/crop"))
+    for n in args.lanes:
+        print(f"\n[RUN] lanes={n}")
+        _report("separate", n, _collect([_spawn(args, 1) for _ in range(n)]))
+        _report("shared", n, _collect([_spawn(args, n)]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Benchmark harness: OCR engines (ocr_engines.py) over a labeled set of plate
+crops, to pick the fastest engine that meets the accuracy bar.
+
+Each engine runs in a fresh worker process. Reported per engine: load time
+and the memory it adds, per-crop latency p50/p90/p99 and CPU, characters
+per second (label characters over OCR time), plate accuracy (the whole
+plate right after normalize_ocr, which is how the pipeline compares them)
+and character accuracy (1 - normalized edit distance).
+
+Crop set: --crops DIR of images plus labels.csv (file,plate); without a
+labels.csv the label is the file name up to the first "_" (CB1234AT_017.png).
+Every crop goes through the pipeline's prepare_crop() first, like a detected
+plate. Without --crops the set is rendered (--render N plates with blur,
+noise, tilt, uneven light and low resolution); --save DIR writes it out as a
+crop set.
+
+    python bench_ocr.py --crops /assets/plate_crops --min-accuracy 0.95 \\
+        --engine easyocr --engine easyocr:detect=0,allowlist=plate --engine rapidocr:allowlist=plate
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+from rapidfuzz.distance import Levenshtein
+
+from ocr_engines import engine_class, ocr_engine
+from recognizer_engine import normalize_ocr, prepare_crop, process_usage
+
+PLATE_LETTERS = "ABCEHKMOPTXY"  # the Latin letters BG plates use
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+# -------------------- CROP SETS --------------------
+def load_crops(path: str) -> tuple[list[np.ndarray], list[str]]:
+    labels_csv = os.path.join(path, "labels.csv")
+    if os.path.exists(labels_csv):
+        with open(labels_csv, newline="") as f:
+            rows = [(r["file"], r["plate"]) for r in csv.DictReader(f)]
+    else:
+        rows = [(n, os.path.splitext(n)[0].split("_")[0])
+                for n in sorted(os.listdir(path)) if n.lower().endswith(IMAGE_EXTS)]
+    crops, labels = [], []
+    for name, plate in rows:
+        image = cv2.imread(os.path.join(path, name))
+        if image is None:
+            raise RuntimeError(f"Cannot read crop: {os.path.join(path, name)}")
+        crops.append(image)
+        labels.append(plate)
+    if not crops:
+        raise RuntimeError(f"No crops in {path}")
+    return crops, labels
+
+
+def render_plate(text: str, rng: random.Random) -> np.ndarray:
+    """A BGR crop of a plate the way the detector hands it over: tilted, blurred, noisy, a bit of margin."""
+    w = rng.randint(130, 260)
+    h = int(w / 4.3)
+    plate = np.full((h, w, 3), rng.randint(195, 245), dtype=np.uint8)
+    cv2.rectangle(plate, (1, 1), (w - 2, h - 2), (30, 30, 30), max(1, w // 120))
+    thickness = max(1, w // 90)
+    (tw, th), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 1.0, thickness)
+    scale = 0.86 * w / tw
+    cv2.putText(plate, text, (int(0.07 * w), int(h / 2 + th * scale / 2)), cv2.FONT_HERSHEY_SIMPLEX,
+                scale, (25, 25, 25), thickness)
+
+    margin = rng.randint(2, 8)
+    crop = np.full((h + 2 * margin, w + 2 * margin, 3), rng.randint(40, 90), dtype=np.uint8)
+    crop[margin:margin + h, margin:margin + w] = plate
+    tilt = cv2.getRotationMatrix2D((crop.shape[1] / 2, crop.shape[0] / 2), rng.uniform(-4, 4), 1.0)
+    crop = cv2.warpAffine(crop, tilt, (crop.shape[1], crop.shape[0]), borderMode=cv2.BORDER_REPLICATE)
+
+    light = np.linspace(rng.uniform(0.6, 1.0), rng.uniform(0.8, 1.15), crop.shape[1])[None, :, None]
+    crop = crop * light
+    shrink = rng.uniform(0.45, 1.0)  # distance: fewer pixels, scaled back up by nobody
+    crop = cv2.resize(crop, None, fx=shrink, fy=shrink, interpolation=cv2.INTER_AREA)
+    crop = cv2.GaussianBlur(crop, (0, 0), rng.uniform(0.3, 1.2))
+    crop = crop + np.random.default_rng(rng.randrange(1 << 30)).normal(0, rng.uniform(2, 9), crop.shape)
+    return np.clip(crop, 0, 255).astype(np.uint8)
+
+
+def render_crops(count: int, seed: int) -> tuple[list[np.ndarray], list[str]]:
+    rng = random.Random(seed)
+    labels = ["".join(rng.choices(PLATE_LETTERS, k=rng.choice((1, 2))))
+              + "".join(rng.choices("0123456789", k=4)) + "".join(rng.choices(PLATE_LETTERS, k=2))
+              for _ in range(count)]
+    return [render_plate(text, rng) for text in labels], labels
+
+
+def save_crops(path: str, crops, labels) -> None:
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, "labels.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["file", "plate"])
+        for i, (crop, plate) in enumerate(zip(crops, labels)):
+            name = f"{plate}_{i:04d}.png"
+            cv2.imwrite(os.path.join(path, name), crop)
+            writer.writerow([name, plate])
+    print(f"[BENCH] wrote {len(crops)} crops and labels.csv to {path}")
+
+
+# -------------------- WORKER --------------------
+def worker(args) -> None:
+    data = np.load(args.crops_file)
+    grays = [prepare_crop(data[f"crop{i}"]) for i in range(int(data["count"]))]
+    rss_start, _ = process_usage()
+    t0 = time.perf_counter()
+    read_text = ocr_engine(args.worker)
+    load_s = time.perf_counter() - t0
+    for gray in grays[:args.warmup]:
+        read_text(gray)
+    rss_loaded, _ = process_usage()
+    latency, cpu, texts = [], [], []
+    for gray in grays:
+        _, c0 = process_usage()
+        t0 = time.perf_counter()
+        texts.append(read_text(gray))
+        latency.append(time.perf_counter() - t0)
+        cpu.append(process_usage()[1] - c0)
+    print("RESULT " + json.dumps({
+        "load_s": load_s,
+        "rss_added_mb": rss_loaded - rss_start,
+        "latency_ms": [v * 1000 for v in latency],
+        "cpu_ms": [v * 1000 for v in cpu],
+        "texts": texts,
+    }), flush=True)
+
+
+def run_engine(args, spec: str, crops_file: str) -> dict | None:
+    cmd = [sys.executable, __file__, "--worker", spec, "--crops-file", crops_file, "--warmup", str(args.warmup)]
+    p = subprocess.run(cmd, stdout=subprocess.PIPE, text=True)
+    line = next((ln for ln in p.stdout.splitlines() if ln.startswith("RESULT ")), None)
+    if p.returncode != 0 or line is None:
+        print(f"  [SKIP] {spec}: worker failed with exit code {p.returncode} (library or models missing?)")
+        return None
+    return json.loads(line[len("RESULT "):])
+
+
+def _pct(values: list[float], q: float) -> float:
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def score(result: dict, labels: list[str]) -> dict:
+    truth = [normalize_ocr(t) for t in labels]
+    read = [normalize_ocr(t) for t in result["texts"]]
+    lat = sorted(result["latency_ms"])
+    return {
+        "plate_acc": sum(a == b for a, b in zip(read, truth)) / len(truth),
+        "char_acc": statistics.fmean(Levenshtein.normalized_similarity(a, b) for a, b in zip(read, truth)),
+        "p50": _pct(lat, 0.50), "p90": _pct(lat, 0.90), "p99": _pct(lat, 0.99),
+        "mean": statistics.fmean(lat),
+        "cpu": statistics.fmean(result["cpu_ms"]),
+        "chars_per_s": sum(len(t) for t in labels) / (sum(lat) / 1000.0),
+        "misreads": [(b, a) for a, b in zip(read, truth) if a != b],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--engine", action="append", default=[],
+                        help="engine spec, repeatable, e.g. easyocr:detect=0,allowlist=plate (default: OCR_ENGINE)")
+    parser.add_argument("--crops", help="directory of labeled crops (labels.csv or PLATE_*.png)")
+    parser.add_argument("--render", type=int, default=200, help="rendered crops when there is no --crops")
+    parser.add_argument("--save", help="write the rendered crops to this directory and exit")
+    parser.add_argument("--min-accuracy", type=float, default=0.95, help="plate accuracy bar for the pick")
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--show-misreads", type=int, default=5)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--crops-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        worker(args)
+        return
+
+    crops, labels = load_crops(args.crops) if args.crops else render_crops(args.render, args.seed)
+    if args.save:
+        save_crops(args.save, crops, labels)
+        return
+    from recognizer_engine import OCR_ENGINE
+
+    engines = args.engine or [OCR_ENGINE]
+    for spec in engines:
+        try:
+            engine_class(spec)
+        except ValueError as e:
+            parser.error(str(e))
+    print(f"[BENCH] {len(crops)} crops from {args.crops or 'the renderer'}, {sum(map(len, labels))} characters, "
+          f"{os.cpu_count()} cpu(s)")
+    results = {}
+    with tempfile.NamedTemporaryFile(suffix=".npz") as f:
+        np.savez(f, count=len(crops), **{f"crop{i}": c for i, c in enumerate(crops)})
+        f.flush()
+        for spec in engines:
+            result = run_engine(args, spec, f.name)
+            if result is None:
+                continue
+            s = results[spec] = score(result, labels)
+            print(f"  {spec:38s}: plate acc {s['plate_acc']:6.1%}  char acc {s['char_acc']:6.1%}  "
+                  f"latency p50={s['p50']:6.1f}ms p90={s['p90']:6.1f}ms p99={s['p99']:6.1f}ms  "
+                  f"cpu={s['cpu']:6.1f}ms/crop  {s['chars_per_s']:6.0f} chars/s  "
+                  f"load {result['load_s']:4.1f}s +{result['rss_added_mb']:.0f}MB")
+            if args.show_misreads and s["misreads"]:
+                shown = ", ".join(f"{t}->{r or '-'}" for t, r in s["misreads"][:args.show_misreads])
+                print(f"  {'':38s}  misreads: {shown}")
+
+    passing = [spec for spec, s in results.items() if s["plate_acc"] >= args.min_accuracy]
+    if passing:
+        best = min(passing, key=lambda spec: results[spec]["mean"])
+        print(f"[PICK] {best}: fastest with plate accuracy >= {args.min_accuracy:.0%} "
+              f"({results[best]['mean']:.1f}ms/crop, {results[best]['plate_acc']:.1%})")
+    else:
+        print(f"[PICK] no engine reached plate accuracy {args.min_accuracy:.0%}")
+
+
+if __name__ == "__main__":
+    main()
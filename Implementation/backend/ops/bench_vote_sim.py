@@ -0,0 +1,126 @@
+"""
+Microbenchmark: majority vote over the recognizer's OCR window, the old
+difflib implementation vs plate_vote.PlateSimilarity.
+
+A stream of noisy readings of a few plates (OCR confusions, dropped and
+doubled characters) slides through a window of VOTE_WINDOW readings; every
+frame appends one reading and votes, as the recognizer loop does.
+
+- difflib: the previous majority_vote_sim, n*n SequenceMatcher calls per frame
+- numpy:   PlateSimilarity with the NumPy kernel, memo kept across frames
+- numpy-cold / rapidfuzz-cold: a fresh PlateSimilarity every frame (kernel only)
+- rapidfuzz: the C++ kernel, memo kept (only if rapidfuzz is installed)
+
+    python bench_vote_sim.py --windows 8 32 128 --frames 400
+"""
+import argparse
+import collections
+import difflib
+import random
+import statistics
+import time
+
+import plate_vote
+from plate_vote import PlateSimilarity
+
+CONFUSIONS = {"0": "O", "8": "B", "5": "S", "1": "I", "2": "Z", "7": "T"}
+
+
+def legacy_majority_vote_sim(values, thr):
+    def similar(a, b):
+        if not a or not b:
+            return False
+        return difflib.SequenceMatcher(None, a, b).ratio() >= thr
+
+    if not values:
+        return None
+    best_val, best_score = None, -1
+    for v in values:
+        score = sum(1 for u in values if similar(v, u))
+        if score > best_score:
+            best_score, best_val = score, v
+    return best_val
+
+
+def _reading(plate: str, rng: random.Random) -> str:
+    s = list(plate)
+    for _ in range(rng.choice((0, 0, 0, 1, 1, 2))):
+        i = rng.randrange(len(s))
+        op = rng.random()
+        if op < 0.6:
+            s[i] = CONFUSIONS.get(s[i], s[i])
+        elif op < 0.8 and len(s) > 4:
+            del s[i]
+        else:
+            s.insert(i, s[i])
+    return "".join(s)
+
+
+def _stream(frames: int, rng: random.Random) -> list[str]:
+    plates = ["CB1234AT", "PB7780KX", "CA0512BB", "X5521ZZ"]
+    out, plate = [], plates[0]
+    for i in range(frames):
+        if i % 60 == 0:
+            plate = rng.choice(plates)  # next car
+        out.append(_reading(plate, rng))
+    return out
+
+
+def _run(vote, stream, window):
+    recent = collections.deque(maxlen=window)
+    samples, votes = [], []
+    for text in stream:
+        recent.append(text)
+        t0 = time.perf_counter()
+        votes.append(vote(list(recent)))
+        samples.append((time.perf_counter() - t0) * 1e6)
+    samples.sort()
+    return samples, votes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--windows", type=int, nargs="+", default=[8, 32, 128])
+    parser.add_argument("--frames", type=int, default=400)
+    parser.add_argument("--threshold", type=float, default=0.88)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    stream = _stream(args.frames, random.Random(args.seed))
+    rapidfuzz = plate_vote._process, plate_vote._fuzz
+    print(f"[BENCH] frames={args.frames} threshold={args.threshold} "
+          f"rapidfuzz={'yes' if rapidfuzz[0] is not None else 'no'}")
+
+    for window in args.windows:
+        print(f"\n[RUN] VOTE_WINDOW={window}")
+        plate_vote._process = plate_vote._fuzz = None
+        numpy_warm = PlateSimilarity(args.threshold)
+        kernels = [
+            ("difflib", lambda v: legacy_majority_vote_sim(v, args.threshold)),
+            ("numpy-cold", lambda v: PlateSimilarity(args.threshold).majority_vote(v)),
+            ("numpy", numpy_warm.majority_vote),
+        ]
+        if rapidfuzz[0] is not None:
+            rf_warm = PlateSimilarity(args.threshold)
+            kernels += [
+                ("rapidfuzz-cold", lambda v: PlateSimilarity(args.threshold).majority_vote(v)),
+                ("rapidfuzz", rf_warm.majority_vote),
+            ]
+
+        baseline = None
+        for name, vote in kernels:
+            plate_vote._process, plate_vote._fuzz = rapidfuzz if name.startswith("rapidfuzz") else (None, None)
+            samples, votes = _run(vote, stream, window)
+            if baseline is None:
+                baseline = votes
+            agree = sum(a == b for a, b in zip(votes, baseline)) / len(votes)
+            p99 = samples[min(len(samples) - 1, int(0.99 * len(samples)))]
+            print(f"  {name:14s}: p50={statistics.median(samples):10.1f}us  p99={p99:10.1f}us  "
+                  f"same vote as difflib={agree:6.1%}")
+            if name == "numpy":
+                print(f"  {'':14s}  memo: {numpy_warm.stats()}")
+        plate_vote._process, plate_vote._fuzz = rapidfuzz
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+One recognizer process for several cameras: YOLO and the OCR engine are
+loaded once and YOLO runs one batched forward pass over a frame from every
+camera, while each lane keeps its own gate_id, mode and voting state.
+
+    python lp_recognizer_multi.py --config /assets/lanes.json
+
+lanes.json:
+
+    {"lanes": [
+        {"source": "rtsp://10.0.0.21/stream", "gate_id": "GATE-A", "mode": "entry", "roi": [0.2, 0.45, 0.8, 1.0]},
+        {"source": "0", "gate_id": "GATE-A", "mode": "exit"},
+        {"source": "/assets/exit_demo.mp4", "gate_id": "GATE-B", "mode": "exit", "regex": "ANY"}
+    ]}
+
+Per lane: source (required); gate_id, mode, regex and roi default to GATE_ID,
+MODE, --regex and ROI; live defaults to true for camera indexes and URLs. An
+roi is [x1, y1, x2, y2] in pixels or fractions of the frame (plate_cascade.py).
+"""
+import argparse
+import json
+
+from recognizer_engine import GATE_ID, MODE, PLATE_REGEX, ROI, Lane, RecognizerEngine
+
+LANE_KEYS = {"source", "gate_id", "mode", "regex", "live", "roi"}
+
+
+def load_lanes(path: str, default_regex: str) -> list[Lane]:
+    with open(path) as f:
+        config = json.load(f)
+    specs = config.get("lanes") if isinstance(config, dict) else None
+    if not specs:
+        raise ValueError(f"{path}: expected {{\"lanes\": [...]}} with at least one lane")
+
+    lanes = []
+    for i, spec in enumerate(specs):
+        unknown = set(spec) - LANE_KEYS
+        if "source" not in spec or unknown:
+            raise ValueError(f"{path}: lane {i} needs a source and only {sorted(LANE_KEYS)} (got {sorted(spec)})")
+        source = str(spec["source"])
+        # If you pass "0", "1", etc. treat as webcam index
+        live = spec.get("live", source.isdigit() or "://" in source)
+        lanes.append(Lane(
+            int(source) if source.isdigit() else source,
+            live=live,
+            gate_id=spec.get("gate_id", GATE_ID),
+            mode=spec.get("mode", MODE),
+            regex=spec.get("regex", default_regex),
+            roi=spec.get("roi", ROI),
+        ))
+        print(f"[INIT] lane {lanes[-1].name}: {source} ({'live' if live else 'file'})")
+    return lanes
+
+
+# -------------------- MAIN --------------------
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", required=True, help="JSON file with the lanes, e.g. /assets/lanes.json")
+    parser.add_argument("--display", action="store_true", help="Show one annotated preview per lane (needs GUI/X11)")
+    parser.add_argument("--regex", default=PLATE_REGEX, help="Default plate regex or ANY for lanes without one")
+    args = parser.parse_args()
+
+    try:
+        lanes = load_lanes(args.config, args.regex)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    RecognizerEngine(lanes=lanes, display=args.display).run()
+
+
+if __name__ == "__main__":
+    main()
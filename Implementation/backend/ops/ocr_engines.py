@@ -0,0 +1,139 @@
+"""
+OCR engines for the plate crop, behind one interface: an engine is called
+with the gray, denoised crop and returns the raw text; normalize_ocr and the
+vote take it from there. OCR_ENGINE picks the engine and its options:
+
+    easyocr                                     # default: text detection, paragraphs joined
+    easyocr:detect=0,allowlist=plate            # recognizer only, over the whole crop
+    easyocr:detect=0,allowlist=plate,decoder=beamsearch
+    rapidocr:allowlist=plate                    # PP-OCR models on ONNX Runtime, no torch
+    tesseract:psm=7,allowlist=plate             # the tesseract-ocr binary, one text line
+
+- allowlist: the characters the plate may contain; "plate" is A-Z and 0-9.
+  EasyOCR and Tesseract restrict their decoders to it; RapidOCR's output is
+  filtered instead
+- detect=0 skips the text detector: the crop is already a plate, so the whole
+  crop is recognized as one line (EasyOCR then doesn't load CRAFT at all)
+- decoder: greedy (default) or beamsearch, EasyOCR only
+
+Each engine imports its library on construction, so only the selected one
+needs to be installed. bench_ocr.py compares engines on a labeled crop set.
+"""
+import inspect
+import string
+
+import cv2
+import numpy as np
+
+PLATE_CHARS = string.ascii_uppercase + string.digits
+
+
+def _flag(value) -> bool:
+    return str(value).strip().lower() not in ("0", "false", "no", "off", "")
+
+
+class OcrEngine:
+    """engine(gray) -> raw text of one plate crop."""
+
+    name = "ocr"
+
+    def __init__(self, *, allowlist: str | None = None):
+        self.allowlist = PLATE_CHARS if allowlist == "plate" else allowlist or None
+
+    def __call__(self, gray: np.ndarray) -> str:
+        raise NotImplementedError
+
+    def _filter(self, text: str) -> str:
+        """Drop characters outside the allowlist, for engines that can't restrict their decoder."""
+        if not self.allowlist:
+            return text
+        return "".join(c for c in text.upper() if c in self.allowlist)
+
+
+class EasyOcrEngine(OcrEngine):
+    name = "easyocr"
+
+    def __init__(self, *, allowlist: str | None = None, detect: bool = True, decoder: str = "greedy",
+                 paragraph: bool = True, langs: str = "en"):
+        super().__init__(allowlist=allowlist)
+        import easyocr
+
+        self.detect = _flag(detect)
+        self.options = {"detail": 0, "decoder": decoder, "allowlist": self.allowlist}
+        self.paragraph = _flag(paragraph)
+        self.reader = easyocr.Reader(langs.split("+"), gpu=False, detector=self.detect)
+        print(f"[INIT] EasyOCR ready (detect={int(self.detect)}, decoder={decoder})")
+
+    def __call__(self, gray):
+        if self.detect:
+            return "".join(self.reader.readtext(gray, paragraph=self.paragraph, **self.options))
+        return "".join(self.reader.recognize(gray, **self.options))  # no boxes given: the whole crop
+
+
+class RapidOcrEngine(OcrEngine):
+    name = "rapidocr"
+
+    def __init__(self, *, allowlist: str | None = None, detect: bool = False):
+        super().__init__(allowlist=allowlist)
+        from rapidocr_onnxruntime import RapidOCR
+
+        self.detect = _flag(detect)
+        self.reader = RapidOCR()
+        print(f"[INIT] RapidOCR ready (detect={int(self.detect)})")
+
+    def __call__(self, gray):
+        result, _ = self.reader(cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR), use_det=self.detect, use_cls=False,
+                                use_rec=True)
+        # [[text, score]] without detection, [[box, text, score], ...] with it
+        return self._filter("".join(item[-2] for item in result or []))
+
+
+class TesseractEngine(OcrEngine):
+    name = "tesseract"
+
+    def __init__(self, *, allowlist: str | None = None, psm: int = 7, oem: int = 1):
+        super().__init__(allowlist=allowlist)
+        import pytesseract
+
+        self.pytesseract = pytesseract
+        self.config = f"--psm {int(psm)} --oem {int(oem)}"
+        if self.allowlist:
+            self.config += f" -c tessedit_char_whitelist={self.allowlist}"
+        print(f"[INIT] Tesseract {pytesseract.get_tesseract_version()} ready ({self.config})")
+
+    def __call__(self, gray):
+        return self.pytesseract.image_to_string(gray, config=self.config).strip()
+
+
+ENGINES = {cls.name: cls for cls in (EasyOcrEngine, RapidOcrEngine, TesseractEngine)}
+
+
+def parse_spec(spec: str) -> tuple[str, dict]:
+    """"name:key=value,key=value" -> (name, options); values stay strings, the engines convert them."""
+    name, _, rest = spec.strip().partition(":")
+    options = {}
+    for item in filter(None, rest.split(",")):
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"OCR engine option {item!r} in {spec!r} is not key=value")
+        options[key.strip()] = value.strip()
+    return name.strip().lower(), options
+
+
+def engine_class(spec: str) -> tuple[type[OcrEngine], dict]:
+    """The engine class and options `spec` asks for, checked without loading anything."""
+    name, options = parse_spec(spec)
+    if name not in ENGINES:
+        raise ValueError(f"Unknown OCR engine {name!r}, expected one of {sorted(ENGINES)}")
+    try:
+        inspect.signature(ENGINES[name]).bind(**options)
+    except TypeError as e:  # an option the engine doesn't take
+        raise ValueError(f"OCR engine {spec!r}: {e}") from None
+    return ENGINES[name], options
+
+
+def ocr_engine(spec: str) -> OcrEngine:
+    cls, options = engine_class(spec)
+    engine = cls(**options)
+    engine.name = spec
+    return engine
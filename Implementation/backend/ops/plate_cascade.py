@@ -0,0 +1,108 @@
+"""
+ROI-restricted, two-stage plate detection for CPU-only gate boxes. Plates
+only ever show up in the lane, so YOLO doesn't need to look at the sky, the
+booth or the next lane.
+
+- each camera can have a region of interest: only that part of the frame is
+  passed to YOLO, and boxes are mapped back to frame coordinates
+- stage 1 (coarse): the ROI shrunk so its long side is `coarse_size`, run
+  at a low confidence threshold: cheap, and tuned for recall
+- stage 2 (fine): a padded window around the largest coarse box, cut from the
+  full-resolution frame and re-detected at the normal threshold. The window
+  is small, so a small plate keeps its pixels; the boxes it returns are what
+  the OCR crop is cut from, still from the full-resolution frame
+- a frame the coarse pass finds nothing in costs one small inference
+
+Without a coarse detector the ROI is detected in a single pass.
+
+An ROI is x1,y1,x2,y2, either in pixels or, when every value is <= 1, as
+fractions of the frame (resolution independent).
+"""
+import cv2
+import numpy as np
+
+_NO_BOXES = np.zeros((0, 4), dtype=int)
+
+
+def parse_roi(value) -> tuple[float, float, float, float] | None:
+    """"x1,y1,x2,y2" or a 4-item sequence -> tuple; None or "" -> the whole frame."""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    values = [float(v) for v in (value.split(",") if isinstance(value, str) else value)]
+    if len(values) != 4 or values[0] >= values[2] or values[1] >= values[3] or min(values) < 0:
+        raise ValueError(f"ROI must be x1,y1,x2,y2 with x1 < x2 and y1 < y2, got {value!r}")
+    return tuple(values)
+
+
+def roi_pixels(roi, width: int, height: int) -> tuple[int, int, int, int]:
+    if roi is None:
+        return 0, 0, width, height
+    x1, y1, x2, y2 = roi
+    if max(roi) <= 1.0:
+        x1, x2, y1, y2 = x1 * width, x2 * width, y1 * height, y2 * height
+    x1, y1 = max(0, int(x1)), max(0, int(y1))
+    x2, y2 = min(width, int(round(x2))), min(height, int(round(y2)))
+    if x2 <= x1 or y2 <= y1:
+        raise ValueError(f"ROI {roi} is outside the {width}x{height} frame")
+    return x1, y1, x2, y2
+
+
+def _offset(boxes, region) -> np.ndarray:
+    if len(boxes) == 0:
+        return _NO_BOXES
+    return np.asarray(boxes, dtype=int) + np.array([region[0], region[1], region[0], region[1]])
+
+
+class CascadeDetector:
+    """detector(images, rois) -> one (k, 4) int array of frame-coordinate xyxy boxes per image."""
+
+    def __init__(self, fine, coarse=None, *, coarse_size: int = 320, pad: float = 0.5):
+        self.fine = fine
+        self.coarse = coarse
+        self.coarse_size = coarse_size
+        self.pad = pad
+
+        self.frames = 0
+        self.coarse_hits = 0   # frames the coarse pass found a candidate in
+        self.fine_hits = 0     # ... that the fine pass confirmed
+
+    def _window(self, box, width: int, height: int) -> tuple[int, int, int, int]:
+        x1, y1, x2, y2 = box
+        px = max(16, int((x2 - x1) * self.pad))
+        py = max(16, int((y2 - y1) * self.pad))
+        return max(0, x1 - px), max(0, y1 - py), min(width, x2 + px), min(height, y2 + py)
+
+    def __call__(self, images: list[np.ndarray], rois: list) -> list[np.ndarray]:
+        self.frames += len(images)
+        regions = [roi_pixels(roi, img.shape[1], img.shape[0]) for img, roi in zip(images, rois)]
+        crops = [img[y1:y2, x1:x2] for img, (x1, y1, x2, y2) in zip(images, regions)]
+        if self.coarse is None:
+            return [_offset(b, r) for b, r in zip(self.fine(crops), regions)]
+
+        # stage 1: the ROI at low resolution
+        small, scales = [], []
+        for crop in crops:
+            s = min(1.0, self.coarse_size / max(crop.shape[:2]))
+            small.append(crop if s == 1.0 else cv2.resize(crop, None, fx=s, fy=s, interpolation=cv2.INTER_AREA))
+            scales.append(s)
+        windows = []
+        for i, (boxes, s, region) in enumerate(zip(self.coarse(small), scales, regions)):
+            if len(boxes) == 0:
+                continue
+            areas = [(b[2] - b[0]) * (b[3] - b[1]) for b in boxes]
+            best = np.asarray(boxes[int(np.argmax(areas))], dtype=float) / s
+            best = _offset([best.round().astype(int)], region)[0]
+            windows.append((i, self._window(best, images[i].shape[1], images[i].shape[0])))
+        self.coarse_hits += len(windows)
+
+        # stage 2: full resolution, only around the candidate
+        out = [_NO_BOXES] * len(images)
+        if windows:
+            fine = self.fine([images[i][y1:y2, x1:x2] for i, (x1, y1, x2, y2) in windows])
+            for (i, window), boxes in zip(windows, fine):
+                out[i] = _offset(boxes, window)
+                self.fine_hits += len(boxes) > 0
+        return out
+
+    def stats(self) -> dict:
+        return {"frames": self.frames, "coarse_hits": self.coarse_hits, "fine_hits": self.fine_hits}
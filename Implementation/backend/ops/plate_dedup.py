@@ -0,0 +1,127 @@
+"""
+Per-plate cooldown for the recognizer loop: "was a plate similar to this one
+sent in the last COOLDOWN_SEC?" without scanning every plate ever sent.
+
+- entries expire after `ttl` seconds (and the oldest go first past
+  max_entries), so the structure only ever holds the plates still cooling down
+- similar keys are found through a bigram index: only live keys sharing
+  enough bigrams with the query are scored, after a cheap length bound
+
+"Similar" is plate_vote.pair_ratio >= threshold, the indel ratio the majority
+vote uses, so one SIM_RATIO means the same thing in both places. It is never
+below difflib's ratio, which this used before: at the same threshold the
+cooldown now also catches the pairs difflib's greedy matching under-scored,
+e.g. an inserted character ahead of a repeat (000C077T / 0A001C077T: 0.78
+with difflib, 0.89 here). A single misread character on an 8-character plate
+scores 0.875 either way.
+
+The bigram count is a lossless filter. A longest common subsequence splits
+into runs separated by at least one unmatched character, so with M matched
+and U unmatched characters there are at least M - U - 1 shared bigram
+positions, and ratio >= t bounds U by 2M(1-t)/t. Any key the linear scan
+would have matched therefore shares at least min_shared() distinct bigrams
+with the query. When that bound drops below one (threshold <= 2/3, very short
+plates) every live key is compared.
+"""
+import math
+import time
+from collections import OrderedDict
+
+from plate_vote import pair_ratio
+
+
+def _bigrams(s: str) -> set:
+    return {s[i:i + 2] for i in range(len(s) - 1)}
+
+
+def min_shared(text: str, threshold: float) -> int:
+    """Distinct bigrams any key with ratio(key, text) >= threshold shares with text."""
+    n = len(text)
+    shortest_key = math.ceil(threshold * n / (2 - threshold) - 1e-9)
+    matched_positions = (3 * threshold - 2) * (n + shortest_key) / 2 - 1
+    repeated = max(0, n - 1) - len(_bigrams(text))  # a repeated bigram counts once
+    return math.ceil(matched_positions - repeated - 1e-9)
+
+
+class CooldownIndex:
+    def __init__(self, ttl: float, threshold: float, *, max_entries: int = 4096):
+        self.ttl = ttl
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._sent_at: "OrderedDict[str, float]" = OrderedDict()  # oldest send first
+        self._postings: dict[str, set] = {}
+
+        self.lookups = 0
+        self.compared = 0
+        self.evicted = 0
+        self.lookup_seconds = 0.0
+        self.max_lookup_seconds = 0.0
+
+    # ---------- bookkeeping ----------
+    def _remove(self, key: str) -> None:
+        del self._sent_at[key]
+        for g in _bigrams(key):
+            keys = self._postings.get(g)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[g]
+
+    def _expire(self, now: float) -> None:
+        while self._sent_at:
+            key, sent_at = next(iter(self._sent_at.items()))
+            if now - sent_at < self.ttl and len(self._sent_at) <= self.max_entries:
+                break
+            self._remove(key)
+            self.evicted += 1
+
+    def _candidates(self, text: str):
+        need = min_shared(text, self.threshold)
+        if need < 1:
+            return list(self._sent_at)
+        shared: dict[str, int] = {}
+        for g in _bigrams(text):
+            for key in self._postings.get(g, ()):
+                shared[key] = shared.get(key, 0) + 1
+        return [key for key, n in shared.items() if n >= need]
+
+    # ---------- public ----------
+    def match(self, text: str, now: float) -> str | None:
+        """A live (still cooling down) key similar to `text`, or None."""
+        t0 = time.perf_counter()
+        self._expire(now)
+        found = None
+        for key in self._candidates(text):
+            self.compared += 1
+            # 2*min(len)/(len+len) bounds the ratio from above
+            if (2 * min(len(key), len(text)) >= self.threshold * (len(key) + len(text))
+                    and pair_ratio(key, text) >= self.threshold):
+                found = key
+                break
+        elapsed = time.perf_counter() - t0
+        self.lookups += 1
+        self.lookup_seconds += elapsed
+        self.max_lookup_seconds = max(self.max_lookup_seconds, elapsed)
+        return found
+
+    def add(self, text: str, now: float) -> None:
+        """Start (or restart) the cooldown for `text`."""
+        if text in self._sent_at:
+            self._remove(text)
+        self._sent_at[text] = now
+        for g in _bigrams(text):
+            self._postings.setdefault(g, set()).add(text)
+        self._expire(now)
+
+    def __len__(self) -> int:
+        return len(self._sent_at)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._sent_at),
+            "lookups": self.lookups,
+            "compared": self.compared,
+            "evicted": self.evicted,
+            "avg_lookup_us": round(self.lookup_seconds / self.lookups * 1e6, 1) if self.lookups else 0.0,
+            "max_lookup_us": round(self.max_lookup_seconds * 1e6, 1),
+        }
@@ -0,0 +1,121 @@
+"""
+OCR skipping for plates that haven't changed. A car waiting at the barrier
+shows the same crop for seconds; once that crop has been read consistently,
+EasyOCR (the most expensive stage) doesn't need to read it again.
+
+- an IoU tracker follows the plate box from frame to frame; a box that
+  overlaps no live track starts a new one, and tracks not seen for `max_age`
+  seconds are dropped
+- every crop gets a 63-bit perceptual hash: the DCT of a 64x16 thumbnail,
+  low 16x4 frequencies (DC dropped) against their median. Wide thumbnails
+  suit plates, and the hash shrugs off sensor noise, a pixel or two of box
+  jitter and lighting drift
+- a track reuses its last OCR text while it is confirmed (its last `confirm`
+  reads agreed on a valid candidate), its crop is within `hash_max` bits of
+  the crop that was read, and that read is younger than `refresh_sec`
+- anything else goes to OCR: a new or unconfirmed track, a changed crop, a
+  stale read
+
+The hash says "looks like the crop we read", not "same plate": plates one
+character apart can hash a few bits apart. Reuse therefore also needs the
+same track and a recent read, so a misread is never carried for long.
+"""
+import itertools
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+HASH_THUMB = (64, 16)  # (w, h) the crop is shrunk to
+HASH_LOW = (16, 4)     # (w, h) of the low-frequency block kept
+
+
+def phash(gray: np.ndarray) -> int:
+    thumb = cv2.resize(gray, HASH_THUMB, interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(thumb)[:HASH_LOW[1], :HASH_LOW[0]].flatten()[1:]  # DC is just brightness
+    return int.from_bytes(np.packbits(low > np.median(low)).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def iou(a, b) -> float:
+    ix = max(0, min(a[2], b[2]) - max(a[0], b[0]))
+    iy = max(0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = ix * iy
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+@dataclass
+class Track:
+    id: int
+    box: tuple
+    seen_at: float
+    read_hash: int = 0            # hash of the crop OCR last read
+    raw: str | None = None        # what it read
+    candidate: str | None = None
+    agree: int = 0                # consecutive reads giving that same candidate
+    read_at: float = 0.0
+    crop_hash: int = 0            # hash of the crop being read now
+
+
+class PlateTracker:
+    """One lane's plate tracks; used by the OCR stage only."""
+
+    def __init__(self, *, iou_min: float, hash_max: int, confirm: int, refresh_sec: float, max_age: float):
+        self.iou_min = iou_min
+        self.hash_max = hash_max
+        self.confirm = max(1, confirm)
+        self.refresh_sec = refresh_sec
+        self.max_age = max_age
+        self._tracks: list[Track] = []
+        self._ids = itertools.count(1)
+
+        self.started = 0
+        self.reads = 0
+        self.reused = 0
+
+    def lookup(self, box, gray: np.ndarray, now: float) -> tuple[Track, str | None]:
+        """The track `box` belongs to, and its last OCR text if this crop can skip OCR."""
+        self._tracks = [t for t in self._tracks if now - t.seen_at <= self.max_age]
+        track, best = None, self.iou_min
+        for t in self._tracks:
+            overlap = iou(box, t.box)
+            if overlap >= best:
+                track, best = t, overlap
+        if track is None:
+            track = Track(next(self._ids), box, now)
+            self._tracks.append(track)
+            self.started += 1
+        track.box, track.seen_at = box, now
+
+        h = phash(gray)
+        if (track.raw is not None and track.agree >= self.confirm
+                and now - track.read_at < self.refresh_sec
+                and hamming(h, track.read_hash) <= self.hash_max):
+            self.reused += 1
+            return track, track.raw
+        track.crop_hash = h
+        return track, None
+
+    def observe(self, track: Track, raw: str, candidate: str | None, now: float) -> None:
+        """Record an OCR read of the crop lookup() just declined to reuse."""
+        self.reads += 1
+        if candidate and candidate == track.candidate:
+            track.agree += 1
+        else:
+            track.agree = 1 if candidate else 0
+        track.raw, track.candidate = raw, candidate
+        track.read_hash, track.read_at = track.crop_hash, now
+
+    def stats(self) -> dict:
+        crops = self.reads + self.reused
+        return {
+            "tracks": len(self._tracks),
+            "started": self.started,
+            "reads": self.reads,
+            "reused": self.reused,
+            "reuse_rate": round(self.reused / crops, 4) if crops else 0.0,
+        }
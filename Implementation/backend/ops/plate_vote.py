@@ -0,0 +1,182 @@
+"""
+Plate similarity for the recognizer loop: the majority vote over the OCR
+window and the pairwise "same plate?" test.
+
+Similarity is the indel ratio 2*LCS(a, b) / (len(a) + len(b)), the measure
+difflib's ratio() approximates (difflib's greedy matching finds a common
+subsequence, not always the longest, so its ratio is never higher). Scores
+come from a kernel that handles many pairs in one call:
+
+- rapidfuzz (C++) when installed: process.cdist scores the whole window
+- otherwise NumPy: plates are packed into fixed-width uint8 rows and the LCS
+  table is filled one cell at a time for every pair at once, i.e. W*W
+  vectorized steps instead of n*n Python-level matchers
+
+The per-plate cooldown (plate_dedup.CooldownIndex) scores with pair_ratio too,
+so both agree on what "similar" means under one SIM_RATIO.
+
+Pair scores are memoized across frames (the window slides by one plate per
+frame, so almost every pair was scored on an earlier frame), and a window is
+voted over its distinct strings only.
+"""
+import numpy as np
+
+try:  # optional C++ kernel
+    from rapidfuzz import fuzz as _fuzz, process as _process
+except ImportError:  # pragma: no cover - depends on the image
+    _fuzz = _process = None
+
+MEMO_MAX = 65536
+
+
+def _pack(strings: list[str], width: int, pad: int) -> np.ndarray:
+    rows = np.full((len(strings), width), pad, dtype=np.uint8)
+    for i, s in enumerate(strings):
+        b = s.encode("ascii", "replace")[:width]
+        rows[i, :len(b)] = np.frombuffer(b, dtype=np.uint8)
+    return rows
+
+
+def ratios(a: list[str], b: list[str]) -> np.ndarray:
+    """Indel ratio of each pair (a[i], b[i]), as float64 in [0, 1]."""
+    n = len(a)
+    if n == 0:
+        return np.zeros(0)
+    lens = np.array([len(s) for s in a], dtype=np.int32) + np.array([len(s) for s in b], dtype=np.int32)
+    width = max(1, max(map(len, a)), max(map(len, b)))
+    # different pad bytes: padding never matches padding
+    xa, xb = _pack(a, width, 0), _pack(b, width, 255)
+
+    # prev[:, j] = LCS(a[:i], b[:j]) for every pair, one row of the table at a time
+    prev = np.zeros((n, width + 1), dtype=np.int32)
+    for i in range(width):
+        cur = np.zeros_like(prev)
+        eq = xa[:, i:i + 1] == xb  # (n, width)
+        for j in range(width):
+            cur[:, j + 1] = np.where(eq[:, j], prev[:, j] + 1, np.maximum(prev[:, j + 1], cur[:, j]))
+        prev = cur
+    lcs = prev[:, width]
+    out = np.ones(n)
+    nz = lens > 0
+    out[nz] = 2.0 * lcs[nz] / lens[nz]
+    return out
+
+
+def pair_ratio(a: str, b: str) -> float:
+    """Indel ratio of one pair (also the cooldown's measure, see plate_dedup.py)."""
+    # a single pair is cheaper in plain Python than through the vectorized table
+    if _fuzz is not None:
+        return _fuzz.ratio(a, b) / 100.0
+    if not a and not b:
+        return 1.0
+    prev = [0] * (len(b) + 1)
+    for ca in a:
+        cur = [0]
+        for j, cb in enumerate(b):
+            cur.append(prev[j] + 1 if ca == cb else max(prev[j + 1], cur[j]))
+        prev = cur
+    return 2.0 * prev[-1] / (len(a) + len(b))
+
+
+def _ratio_matrix(values: list[str]) -> np.ndarray:
+    if _process is not None:
+        return _process.cdist(values, values, scorer=_fuzz.ratio, dtype=np.float64) / 100.0
+    n = len(values)
+    ii, jj = np.triu_indices(n, k=1)
+    m = np.eye(n)
+    m[ii, jj] = m[jj, ii] = ratios([values[i] for i in ii], [values[j] for j in jj])
+    return m
+
+
+class PlateSimilarity:
+    """Memoized pair scores; one instance per recognizer loop."""
+
+    def __init__(self, threshold: float, *, memo_max: int = MEMO_MAX):
+        self.threshold = threshold
+        self.memo_max = memo_max
+        self._memo: dict[tuple[str, str], float] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, a: str, b: str) -> tuple[str, str]:
+        return (a, b) if a <= b else (b, a)
+
+    def _store(self, pairs, scores) -> None:
+        if len(self._memo) + len(pairs) > self.memo_max:
+            self._memo.clear()  # plates come and go; a stale memo just gets rebuilt
+        for p, r in zip(pairs, scores):
+            self._memo[p] = float(r)
+
+    def ratio(self, a: str, b: str) -> float:
+        if a == b:
+            return 1.0
+        key = self._key(a, b)
+        r = self._memo.get(key)
+        if r is None:
+            self.misses += 1
+            r = pair_ratio(*key)
+            self._store([key], [r])
+        else:
+            self.hits += 1
+        return r
+
+    def similar(self, a: str, b: str) -> bool:
+        if not a or not b:
+            return False
+        return self.ratio(a, b) >= self.threshold
+
+    def matrix(self, values: list[str]) -> np.ndarray:
+        """Pairwise ratios of `values`; only pairs not seen on earlier frames are scored."""
+        n = len(values)
+        m = np.eye(n)
+        todo: dict[tuple[str, str], list[tuple[int, int]]] = {}
+        for i in range(n):
+            for j in range(i + 1, n):
+                key = self._key(values[i], values[j])
+                r = self._memo.get(key)
+                if r is None:
+                    todo.setdefault(key, []).append((i, j))
+                else:
+                    m[i, j] = m[j, i] = r
+        self.misses += len(todo)
+        self.hits += n * (n - 1) // 2 - len(todo)
+        if not todo:
+            return m
+        if len(todo) > n:  # mostly a new window: score it in one call
+            m = _ratio_matrix(values)
+            ii, jj = np.triu_indices(n, k=1)
+            self._store([self._key(values[i], values[j]) for i, j in zip(ii, jj)], m[ii, jj])
+            return m
+        keys = list(todo)
+        scores = ratios([k[0] for k in keys], [k[1] for k in keys])
+        for key, r in zip(keys, scores):
+            for i, j in todo[key]:
+                m[i, j] = m[j, i] = r
+        self._store(keys, scores)
+        return m
+
+    def majority_vote(self, values: list[str]) -> str | None:
+        """
+        The value with the most similar neighbours in the window (itself
+        included); ties go to the earliest. Scored over distinct values,
+        weighted by how often each occurs.
+        """
+        if not values:
+            return None
+        distinct = list(dict.fromkeys(values))
+        if len(distinct) == 1:
+            return distinct[0]
+        counts = np.array([values.count(v) for v in distinct], dtype=np.int64)
+        sim = self.matrix(distinct) >= self.threshold
+        scores = sim.astype(np.int64) @ counts
+        return distinct[int(np.argmax(scores))]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "memo": len(self._memo),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "kernel": "rapidfuzz" if _process is not None else "numpy",
+        }
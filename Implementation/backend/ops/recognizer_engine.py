@@ -0,0 +1,785 @@
+"""
+Pipelined plate recognizer shared by lp_recognizer.py (video file),
+lp_recognizer_live.py (camera / stream) and lp_recognizer_gpio.py.
+
+    capture -> [frames] -> detect (YOLO) -> [plates] -> OCR -> [reads] -> dispatch
+
+Each stage runs in its own thread and hands work on through a bounded queue.
+YOLO, the OCR engine and OpenCV spend their time in native code that releases
+the GIL, so on a multi-core CPU the stages overlap instead of taking turns.
+
+- a live source never waits for the stages behind it: when the frame or the
+  plate queue is full its oldest item is dropped, so slow OCR costs frames,
+  not latency
+- a video file is read with backpressure instead, so every sampled frame is
+  still processed; pass realtime=True to treat it like a live source
+- the capture stage only samples frames that are worth a YOLO pass: a motion
+  gate wakes detection up and it backs off once the scene is still again
+  (motion_gate.py; MOTION_GATE=0 restores the fixed FRAME_SKIP)
+- YOLO only looks at the lane's region of interest (ROI), optionally as a
+  low-resolution pass over the ROI plus a full-resolution re-detect around
+  what it found (plate_cascade.py); the OCR crop always comes from the
+  full-resolution frame
+- OCR is skipped for a tracked plate whose crop hasn't changed since it was
+  read consistently; the cached text is used instead (plate_track.py)
+- dispatch votes, applies the stability/debounce/cooldown guards and queues
+  scans on the ScanSpool, whose own thread talks to the API
+- with display on, the main thread shows the latest annotated frame (OpenCV
+  windows must be driven from the main thread)
+
+One process can also serve several cameras (lp_recognizer_multi.py): each
+Lane has its own capture thread, frame queue, gate_id/mode and voting state,
+while YOLO, the OCR engine and the spool are loaded once and YOLO sees one
+batch with a frame from every lane per call.
+
+Model loading is lazy: detect_batch/read_text can be injected (benchmarks,
+other backends) without importing ultralytics or an OCR library, .onnx
+YOLO_WEIGHTS run on ONNX Runtime without torch (yolo_onnx.py), and OCR_ENGINE
+picks the OCR engine (ocr_engines.py).
+"""
+import collections
+import os
+import queue
+import re
+import resource
+import statistics
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from motion_gate import FrameScheduler, MotionGate
+from ocr_engines import ocr_engine
+from plate_cascade import CascadeDetector, parse_roi, roi_pixels
+from plate_dedup import CooldownIndex
+from plate_track import PlateTracker
+from plate_vote import PlateSimilarity
+from scan_spool import ScanSpool
+
+# -------------------- CONFIG (env-tunable) --------------------
+DEF_REGEX      = r"^[A-Z]{1,2}\d{4}[A-Z]{2}$"      # default: BG-like
+API_BASE       = os.environ.get("API_BASE", "http://api:8000")
+MODE           = os.environ.get("MODE", "entry")    # "entry" or "exit"
+REGION_CODE    = os.environ.get("REGION_CODE", "BG")
+GATE_ID        = os.environ.get("GATE_ID", "GATE-A")
+# Local outbox for scans (see scan_spool.py); keep it on a volume to survive restarts
+SPOOL_PATH     = os.environ.get("SPOOL_PATH", "/tmp/scan_spool.db")
+SPOOL_LIVE_MAX_AGE_SEC = float(os.environ.get("SPOOL_LIVE_MAX_AGE_SEC", "30"))
+YOLO_WEIGHTS   = os.environ.get("YOLO_WEIGHTS", "/assets/best.pt")  # .onnx -> ONNX Runtime (see yolo_onnx.py)
+YOLO_CONF      = float(os.environ.get("YOLO_CONF", "0.5"))
+YOLO_ORT_PROVIDERS = os.environ.get("YOLO_ORT_PROVIDERS", "CPUExecutionProvider").split(",")
+YOLO_THREADS   = int(os.environ.get("YOLO_THREADS", "0"))     # ONNX Runtime intra-op threads, 0 = all cores
+FRAME_SKIP     = int(os.environ.get("FRAME_SKIP", "2"))      # fixed sampling when MOTION_GATE=0
+
+# ROI / CASCADE (see plate_cascade.py)
+ROI            = os.environ.get("ROI", "")                   # x1,y1,x2,y2 in px or fractions; "" = whole frame
+CASCADE        = os.environ.get("CASCADE", "0") == "1"       # low-res pass over the ROI, full-res re-detect
+CASCADE_COARSE_SIZE = int(os.environ.get("CASCADE_COARSE_SIZE", "320"))    # long side of the coarse pass
+CASCADE_COARSE_CONF = float(os.environ.get("CASCADE_COARSE_CONF", "0.25")) # low: the fine pass confirms
+CASCADE_FINE_SIZE = int(os.environ.get("CASCADE_FINE_SIZE", "320"))        # YOLO imgsz of the fine window
+CASCADE_PAD    = float(os.environ.get("CASCADE_PAD", "0.5"))  # fine window margin, fraction of the box
+
+# MOTION GATE (see motion_gate.py): detect only while the scene moves
+MOTION_GATE    = os.environ.get("MOTION_GATE", "1") == "1"
+MOTION_DIFF    = int(os.environ.get("MOTION_DIFF", "25"))      # gray levels a pixel must change by
+MOTION_MIN_AREA = float(os.environ.get("MOTION_MIN_AREA", "0.005"))  # fraction of the frame (ROI if set)
+FRAME_SKIP_MIN = int(os.environ.get("FRAME_SKIP_MIN", "1"))    # while there is motion
+FRAME_SKIP_MAX = int(os.environ.get("FRAME_SKIP_MAX", "8"))    # backing off after it
+MOTION_HOLD_SEC = float(os.environ.get("MOTION_HOLD_SEC", "2"))
+IDLE_DETECT_SEC = float(os.environ.get("IDLE_DETECT_SEC", "10"))  # keep-alive detection when idle, 0 = off
+
+# STABILIZATION / DEDUP
+STABLE_FRAMES  = int(os.environ.get("STABLE_FRAMES", "3"))
+COOLDOWN_SEC   = int(os.environ.get("COOLDOWN_SEC", "10"))
+DEBOUNCE_SEC   = int(os.environ.get("DEBOUNCE_SEC", "8"))
+SIM_RATIO      = float(os.environ.get("SIM_RATIO", "0.88"))    # indel ratio, vote and cooldown alike (plate_vote.pair_ratio)
+VOTE_WINDOW    = int(os.environ.get("VOTE_WINDOW", "8"))
+
+# BBOX sanity
+MIN_AR         = float(os.environ.get("MIN_AR", "2.0"))
+MAX_AR         = float(os.environ.get("MAX_AR", "6.0"))
+MIN_W          = int(os.environ.get("MIN_W", "120"))
+MIN_H          = int(os.environ.get("MIN_H", "30"))
+
+# OCR SKIPPING (see plate_track.py); OCR_REFRESH_SEC=0 reads every crop
+TRACK_IOU      = float(os.environ.get("TRACK_IOU", "0.5"))
+TRACK_MAX_AGE_SEC = float(os.environ.get("TRACK_MAX_AGE_SEC", "1.0"))
+OCR_HASH_MAX   = int(os.environ.get("OCR_HASH_MAX", "6"))
+OCR_CONFIRM    = int(os.environ.get("OCR_CONFIRM", str(STABLE_FRAMES)))
+OCR_REFRESH_SEC = float(os.environ.get("OCR_REFRESH_SEC", "3"))
+
+# OCR engine and options (see ocr_engines.py), e.g. "easyocr:detect=0,allowlist=plate"
+OCR_ENGINE     = os.environ.get("OCR_ENGINE", "easyocr")
+
+# PIPELINE
+FRAME_QUEUE    = int(os.environ.get("FRAME_QUEUE", "1"))   # captured frames waiting for YOLO
+STAGE_QUEUE    = int(os.environ.get("STAGE_QUEUE", "2"))   # plate crops waiting for OCR, reads waiting for dispatch
+BATCH_WAIT_MS  = float(os.environ.get("BATCH_WAIT_MS", "5"))  # how long YOLO waits for the other lanes' frames
+STATS_EVERY_SEC = float(os.environ.get("STATS_EVERY_SEC", "30"))
+
+# Demo helpers
+EXIT_AFTER_FIRST = os.environ.get("EXIT_AFTER_FIRST", "0") == "1"
+LOOP             = os.environ.get("LOOP", "0") == "1"
+
+PLATE_REGEX = os.environ.get("PLATE_REGEX", DEF_REGEX)
+
+# -------------------- HELPERS --------------------
+def normalize_ocr(s: str) -> str:
+    """Uppercase, strip non-alnum, and fix common OCR confusions."""
+    s = (s or "").upper().strip().replace(" ", "")
+    s = re.sub(r"[^A-Z0-9]", "", s)
+    # visual swaps tuned for plates; adjust if country-specific chars matter
+    s = (s.replace("İ", "I").replace("Ø", "O")
+           .replace("O", "0").replace("Q", "0")
+           .replace("I", "1").replace("L", "1")
+           .replace("S", "5").replace("B", "8")
+           .replace("Z", "2").replace("T", "7"))
+    return s
+
+
+def yolo_detector(weights: str = YOLO_WEIGHTS, conf: float = YOLO_CONF, *, imgsz: int | None = None, model=None):
+    """
+    detect_batch(images) -> one (k, 4) int array of xyxy boxes per image, backed by ultralytics,
+    or by ONNX Runtime for .onnx weights. `imgsz` overrides the network input size; pass `model`
+    (detect_batch.model) to share loaded weights.
+    """
+    if weights.endswith(".onnx"):
+        from yolo_onnx import OnnxDetector
+
+        return OnnxDetector(weights, conf=conf, imgsz=imgsz, providers=YOLO_ORT_PROVIDERS,
+                            threads=YOLO_THREADS, model=model)
+    if model is None:
+        from ultralytics import YOLO
+
+        model = YOLO(weights)
+        print(f"[INIT] Loaded YOLO weights: {weights}")
+    options = {"conf": conf, "verbose": False}
+    if imgsz:
+        options["imgsz"] = imgsz
+
+    def detect_batch(images):
+        results = model.predict(images, **options)  # one forward pass for the list
+        return [res.boxes.xyxy.cpu().numpy().astype(int) for res in results]
+
+    detect_batch.model = model
+    return detect_batch
+
+
+# -------------------- QUEUES --------------------
+_END = object()  # end of stream, passed down the pipeline
+
+
+class DropOldestQueue:
+    """
+    Bounded FIFO whose put() never blocks: a full queue discards its oldest
+    item. With `key`, it discards the oldest item of the key holding the most
+    items instead, so one busy lane can't crowd the others out.
+    """
+
+    def __init__(self, maxsize: int, key=None):
+        self.maxsize = max(1, maxsize)
+        self.key = key
+        self._items = collections.deque()
+        self._cv = threading.Condition()
+        self.dropped = 0
+
+    def _evict(self) -> None:
+        if self.key is None:
+            self._items.popleft()
+            return
+        counts = collections.Counter(self.key(item) for item in self._items)
+        busiest = max(counts, key=counts.get)  # ties go to the key seen first
+        for i, item in enumerate(self._items):
+            if self.key(item) == busiest:
+                del self._items[i]
+                return
+
+    def put(self, item, timeout=None) -> None:
+        with self._cv:
+            if len(self._items) >= self.maxsize:
+                self._evict()
+                self.dropped += 1
+            self._items.append(item)
+            self._cv.notify()
+
+    def get(self, timeout=None):
+        with self._cv:
+            if not self._cv.wait_for(lambda: self._items, timeout):
+                raise queue.Empty
+            return self._items.popleft()
+
+    def get_nowait(self):
+        return self.get(timeout=0)
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+
+class BlockingQueue(queue.Queue):
+    dropped = 0
+
+
+# -------------------- PIPELINE ITEMS --------------------
+@dataclass
+class Frame:
+    idx: int
+    captured_at: float   # time.time() when read from the source
+    image: np.ndarray
+    lane: "Lane"
+
+
+@dataclass
+class Detection:
+    frame: Frame
+    box: tuple | None = None      # x1, y1, x2, y2 of the largest box
+    reject: str | None = None     # why the box isn't plate-like
+    gray: np.ndarray | None = None
+
+
+@dataclass
+class Reading:
+    detection: Detection
+    raw: str = ""
+    norm: str = ""
+    candidate: str | None = None
+    cached: bool = False          # raw is the track's earlier OCR text
+
+
+@dataclass
+class StageStats:
+    items: int = 0
+    busy: float = 0.0
+    window: list = field(default_factory=list)  # per-item seconds since the last report
+
+    def record(self, seconds: float) -> None:
+        self.items += 1
+        self.busy += seconds
+        self.window.append(seconds)
+
+
+def crop_plate(frame: Frame, boxes) -> Detection:
+    """The largest plate-like box of `boxes` (xyxy), cropped and denoised for OCR."""
+    if len(boxes) == 0:
+        return Detection(frame)
+
+    # pick largest plate-like bbox
+    areas = [(b[2] - b[0]) * (b[3] - b[1]) for b in boxes]
+    x1, y1, x2, y2 = map(int, boxes[int(np.argmax(areas))])
+    w = max(0, x2 - x1); h = max(0, y2 - y1)
+    ar = (w / max(1, h))
+    if w < MIN_W or h < MIN_H or not (MIN_AR <= ar <= MAX_AR):
+        return Detection(frame, (x1, y1, x2, y2), reject=f"reject w{w} h{h} ar{ar:.1f}")
+
+    crop = frame.image[max(y1,0):max(y2,0), max(x1,0):max(x2,0)]
+    if crop.size == 0:
+        return Detection(frame, (x1, y1, x2, y2), reject="empty crop")
+    return Detection(frame, (x1, y1, x2, y2), gray=prepare_crop(crop))
+
+
+def prepare_crop(crop: np.ndarray) -> np.ndarray:
+    """BGR plate crop -> the gray, denoised image the OCR engine reads."""
+    gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
+    return cv2.bilateralFilter(gray, 5, 75, 75)
+
+
+def _lane_of(det: Detection):
+    return det.frame.lane if det is not _END else None
+
+
+def process_usage() -> tuple[float, float]:
+    """(resident MB, user+system CPU seconds) of this process."""
+    ru = resource.getrusage(resource.RUSAGE_SELF)
+    rss_mb = ru.ru_maxrss / 1024.0  # peak, in kB on Linux
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    rss_mb = int(line.split()[1]) / 1024.0
+                    break
+    except OSError:
+        pass
+    return rss_mb, ru.ru_utime + ru.ru_stime
+
+
+# -------------------- LANE --------------------
+class Lane:
+    """
+    One camera: its capture, its frame queue and its plate state (vote
+    window, stability count, debounce and cooldown). The plate state is only
+    touched by the dispatch thread, apart from `sent_in_view`, which the
+    detect stage reads and clears (see watch()).
+    """
+
+    def __init__(
+        self,
+        source,
+        *,
+        live: bool,
+        gate_id: str = GATE_ID,
+        mode: str = MODE,
+        regex: str = PLATE_REGEX,
+        realtime: bool | None = None,
+        loop: bool = LOOP,
+        capture=None,
+        payload_extra: dict | None = None,
+        roi=ROI,
+    ):
+        self.source = source
+        self.live = live
+        self.gate_id = gate_id
+        self.mode = mode
+        self.name = f"{gate_id}/{mode}"
+        self.loop = loop
+        self.payload_extra = payload_extra or {}
+        self.any_plate = regex.upper() == "ANY"
+        self.plate_re = None if self.any_plate else re.compile(regex)
+        self.roi = parse_roi(roi)
+
+        self.cap = capture if capture is not None else cv2.VideoCapture(source)
+        if not self.cap.isOpened():
+            raise RuntimeError(f"Cannot open source: {source}")
+        # files are read faster than real time, so their scheduler runs on media time
+        self.fps = None if live else (self.cap.get(cv2.CAP_PROP_FPS) or 30.0)
+        self.scheduler = FrameScheduler(
+            MotionGate(diff=MOTION_DIFF) if MOTION_GATE else None,
+            fixed_skip=FRAME_SKIP, min_area=MOTION_MIN_AREA, skip_min=FRAME_SKIP_MIN,
+            skip_max=FRAME_SKIP_MAX, hold_sec=MOTION_HOLD_SEC, idle_sec=IDLE_DETECT_SEC,
+        )
+
+        # realtime: everything queued ahead of OCR (the slowest stage) is replaced
+        # by newer work rather than waited for, which bounds the lag
+        self.realtime = live if realtime is None else realtime
+        self.frames = (DropOldestQueue if self.realtime else BlockingQueue)(FRAME_QUEUE)
+        self.preview = DropOldestQueue(1)
+        self.tracker = PlateTracker(iou_min=TRACK_IOU, hash_max=OCR_HASH_MAX, confirm=OCR_CONFIRM,
+                                    refresh_sec=OCR_REFRESH_SEC, max_age=TRACK_MAX_AGE_SEC)
+
+        self.similarity = PlateSimilarity(SIM_RATIO)
+        self.cooldown = CooldownIndex(COOLDOWN_SEC, SIM_RATIO)  # plates sent in the last COOLDOWN_SEC
+        self.recent_texts = collections.deque(maxlen=VOTE_WINDOW)
+        self.stable_count = 0
+        self.last_candidate = None
+        self.last_success_ts = 0.0
+        self.sent_in_view = False  # a scan went out for the plate in view; cleared once no plate is
+
+        self.processed = 0
+        self.sent = 0
+
+    def candidate(self, raw: str) -> tuple[str, str | None]:
+        """(normalized text, plate candidate or None) for one OCR result."""
+        norm = normalize_ocr(raw)
+
+        # generic "ANY" acceptance or pattern-based
+        if self.any_plate:
+            if 4 <= len(norm) <= 10 and sum(c.isdigit() for c in norm) >= 2:
+                return norm, norm
+            return norm, None
+        if norm and self.plate_re.match(norm):
+            return norm, norm
+        # try the raw (unmapped) string against regex too
+        raw2 = re.sub(r"[^A-Z0-9]", "", raw.upper())
+        if raw2 and self.plate_re.match(raw2):
+            return norm, raw2
+        return norm, None
+
+    def watch(self, det: Detection) -> None:
+        """Detect stage: hold the scheduler at FRAME_SKIP_MIN while a plate is in view that hasn't been sent."""
+        if det.gray is None:
+            self.sent_in_view = False
+        self.scheduler.tracking = det.gray is not None and not self.sent_in_view
+
+    def update(self, candidate: str | None) -> str | None:
+        """Vote and check stability and the dedup guards; the plate to send when they pass."""
+        self.processed += 1
+
+        # maintain a sliding window of similar candidates for voting
+        if candidate:
+            self.recent_texts.append(candidate)
+            vote = self.similarity.majority_vote(list(self.recent_texts)) or candidate
+            # stability by similarity: if similar to last_candidate, count up
+            if self.last_candidate and self.similarity.similar(vote, self.last_candidate):
+                self.stable_count += 1
+            else:
+                self.stable_count = 1
+            self.last_candidate = vote
+        else:
+            self.stable_count, self.last_candidate = 0, None
+
+        # fire once when enough stability AND dedup guards pass
+        if self.stable_count < STABLE_FRAMES or not self.last_candidate:
+            return None
+        now = time.time()
+
+        # global debounce: prevent bursts
+        if now - self.last_success_ts < DEBOUNCE_SEC:
+            return None
+
+        # per-text cooldown: a similar plate sent less than COOLDOWN_SEC ago blocks this one
+        plate = self.last_candidate
+        if self.cooldown.match(plate, now) is not None:
+            return None
+        print(f"[SCAN] {self.name} plate={plate} stable={self.stable_count}")
+        self.cooldown.add(plate, now)
+        self.last_success_ts = now
+        self.sent_in_view = True
+        self.sent += 1
+        # reset window after success to avoid double-firing on trailing frames
+        self.recent_texts.clear()
+        self.stable_count = 0
+        self.last_candidate = None
+        return plate
+
+
+# -------------------- ENGINE --------------------
+class RecognizerEngine:
+    """
+    Runs one source (`source`, `live` and the per-lane keywords) or several
+    (`lanes`). All lanes share one detector, one OCR reader and one spool;
+    the detect stage runs YOLO once per batch holding a frame from every
+    lane that has one. `detect_batch` is the (fine) detector; with
+    `coarse_batch`, or CASCADE=1 and the default models, detection is the
+    two-stage cascade.
+    """
+
+    def __init__(
+        self,
+        source=None,
+        *,
+        live: bool = False,
+        display: bool = False,
+        regex: str = PLATE_REGEX,
+        realtime: bool | None = None,
+        loop: bool = LOOP,
+        capture=None,
+        payload_extra: dict | None = None,
+        lanes: list[Lane] | None = None,
+        detect_batch=None,
+        coarse_batch=None,
+        read_text=None,
+        spool: ScanSpool | None = None,
+        on_response=None,
+        exit_after_first: bool = EXIT_AFTER_FIRST,
+    ):
+        if lanes is None:
+            lanes = [Lane(source, live=live, regex=regex, realtime=realtime, loop=loop,
+                          capture=capture, payload_extra=payload_extra)]
+        self.lanes = lanes
+        self.display = display
+        self.exit_after_first = exit_after_first
+
+        if detect_batch is None:
+            detect_batch = yolo_detector(imgsz=CASCADE_FINE_SIZE if CASCADE else None)
+            if CASCADE and coarse_batch is None:
+                coarse_batch = yolo_detector(conf=CASCADE_COARSE_CONF, imgsz=CASCADE_COARSE_SIZE,
+                                             model=detect_batch.model)
+        self.detector = CascadeDetector(detect_batch, coarse_batch, coarse_size=CASCADE_COARSE_SIZE,
+                                        pad=CASCADE_PAD)
+        self.read_text = read_text or ocr_engine(OCR_ENGINE)
+
+        self.spool = spool or ScanSpool(
+            API_BASE, SPOOL_PATH, live_max_age=SPOOL_LIVE_MAX_AGE_SEC, on_response=on_response
+        ).start()
+        print(f"[INIT] Scan spool at {self.spool.path}")
+
+        if all(lane.realtime for lane in lanes):
+            self._plates = DropOldestQueue(STAGE_QUEUE * len(lanes), key=_lane_of)
+        else:
+            self._plates = BlockingQueue(STAGE_QUEUE * len(lanes))
+        self._reads = BlockingQueue(STAGE_QUEUE * len(lanes))
+        self._frame_ready = threading.Event()
+        self._rotation = 0
+        self._stop = threading.Event()
+
+        self.stats = {name: StageStats() for name in ("capture", "detect", "ocr", "dispatch")}
+        self.batch_sizes: list[int] = []  # frames per YOLO call, since the last report
+        self.lag: list[float] = []        # capture -> dispatch, seconds, since the last report
+        self.sent = 0
+
+    # ---------- queue helpers ----------
+    def _put(self, q, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q):
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.2)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _end(self, q) -> None:
+        # the stop flag may already be set; the end marker must still get through
+        while True:
+            try:
+                q.put(_END, timeout=0.2)
+                return
+            except queue.Full:
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def _next_batch(self, active: list[Lane]) -> list[tuple[Lane, object]] | None:
+        """
+        One item from each lane that has one: waits for the first, then up to
+        BATCH_WAIT_MS for the other lanes. None once stopped. The lanes take
+        turns at the head of the batch, so none is always last in line for OCR.
+        """
+        self._rotation = (self._rotation + 1) % len(active)
+        batch, waiting = [], active[self._rotation:] + active[:self._rotation]
+        deadline = None
+        while waiting and not self._stop.is_set():
+            self._frame_ready.clear()  # before polling, so no put is missed
+            for lane in list(waiting):
+                try:
+                    batch.append((lane, lane.frames.get_nowait()))
+                    waiting.remove(lane)
+                except queue.Empty:
+                    pass
+            if batch and deadline is None:
+                deadline = time.monotonic() + BATCH_WAIT_MS / 1000.0
+            timeout = 0.2 if deadline is None else deadline - time.monotonic()
+            if not waiting or timeout <= 0:
+                break
+            self._frame_ready.wait(timeout)
+        return batch if batch else None
+
+    # ---------- stage work (also callable in a serial loop) ----------
+    def detect(self, frames: list[Frame]) -> list:
+        """Boxes per frame, in frame coordinates, from each lane's ROI."""
+        return self.detector([f.image for f in frames], [f.lane.roi for f in frames])
+
+    def find_plate(self, frame: Frame) -> Detection:
+        return crop_plate(frame, self.detect([frame])[0])
+
+    def read_plate(self, det: Detection) -> Reading:
+        if det.gray is None:
+            return Reading(det)
+        lane, now = det.frame.lane, det.frame.captured_at
+        track, raw = lane.tracker.lookup(det.box, det.gray, now)
+        cached = raw is not None
+        if not cached:
+            raw = self.read_text(det.gray)
+        norm, candidate = lane.candidate(raw)
+        if not cached:
+            lane.tracker.observe(track, raw, candidate, now)
+        return Reading(det, raw, norm, candidate, cached)
+
+    def dispatch(self, reading: Reading) -> None:
+        """Hand the reading to its lane and queue the scan when the lane says so."""
+        frame = reading.detection.frame
+        self.lag.append(time.time() - frame.captured_at)
+        plate = frame.lane.update(reading.candidate)
+        if self.display:
+            self._annotate(reading)
+        if plate is None:
+            return
+        self.post_scan(frame.lane, plate, frame.captured_at)
+        self.sent += 1
+        if self.exit_after_first:
+            print("[INFO] EXIT_AFTER_FIRST=1 -> stopping after first POST")
+            self._stop.set()
+
+    def post_scan(self, lane: Lane, plate_text: str, captured_at: float) -> None:
+        """Queue the scan locally; the spool's sender thread delivers it to the API."""
+        payload = {
+            "plate_text": plate_text,
+            "region_code": REGION_CODE,
+            "gate_id": lane.gate_id,
+            # when the frame was taken, not when the pipeline got to it
+            "captured_at": datetime.utcfromtimestamp(captured_at).isoformat() + "Z",
+            **lane.payload_extra,
+        }
+        self.spool.submit(lane.mode, payload)
+        print(f"[SPOOL] queued {lane.mode} scan for {plate_text} ({self.spool.pending()} pending)")
+
+    def _annotate(self, reading: Reading) -> None:
+        det = reading.detection
+        image = det.frame.image
+        if det.frame.lane.roi is not None:
+            x1, y1, x2, y2 = roi_pixels(det.frame.lane.roi, image.shape[1], image.shape[0])
+            cv2.rectangle(image, (x1, y1), (x2, y2), (255, 128, 0), 1)
+        if det.box is not None:
+            x1, y1, x2, y2 = det.box
+            color = (0, 0, 255) if det.reject else (0, 255, 0)
+            cv2.rectangle(image, (x1, y1), (x2, y2), color, 2)
+            cv2.putText(image, det.reject or reading.norm or "", (x1, max(y1-8, 0)),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+        det.frame.lane.preview.put(image)
+
+    # ---------- stage threads ----------
+    def _timed(self, name: str, fn, item):
+        t0 = time.perf_counter()
+        out = fn(item)
+        self.stats[name].record(time.perf_counter() - t0)
+        return out
+
+    def _capture_loop(self, lane: Lane) -> None:
+        frame_idx = 0
+        try:
+            while not self._stop.is_set():
+                t0 = time.perf_counter()
+                ok, image = lane.cap.read()
+                if not ok:
+                    if lane.loop:
+                        lane.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                        continue
+                    break
+                frame_idx += 1
+                t = time.monotonic() if lane.live else frame_idx / lane.fps
+                x1, y1, x2, y2 = roi_pixels(lane.roi, image.shape[1], image.shape[0])
+                if not lane.scheduler.admit(image[y1:y2, x1:x2], t):  # motion outside the lane doesn't count
+                    continue
+                self.stats["capture"].record(time.perf_counter() - t0)
+                if not self._put(lane.frames, Frame(frame_idx, time.time(), image, lane)):
+                    break
+                self._frame_ready.set()
+        finally:
+            self._end(lane.frames)
+            self._frame_ready.set()
+
+    def _detect_loop(self) -> None:
+        active = list(self.lanes)
+        try:
+            while active:
+                batch = self._next_batch(active)
+                if batch is None:
+                    break
+                frames = []
+                for lane, item in batch:
+                    if item is _END:
+                        active.remove(lane)
+                    else:
+                        frames.append(item)
+                if not frames:
+                    continue
+                self.batch_sizes.append(len(frames))
+                boxes = self._timed("detect", self.detect, frames)
+                for frame, frame_boxes in zip(frames, boxes):
+                    det = crop_plate(frame, frame_boxes)
+                    frame.lane.watch(det)  # a stopped car is no motion, but its plate still needs reading
+                    if not self._put(self._plates, det):
+                        return
+        finally:
+            self._end(self._plates)
+
+    def _stage_loop(self, name: str, src, fn, dst) -> None:
+        try:
+            while True:
+                item = self._get(src)
+                if item is _END:
+                    break
+                out = self._timed(name, fn, item)
+                if dst is not None and not self._put(dst, out):
+                    break
+        finally:
+            if dst is not None:
+                self._end(dst)
+
+    # ---------- run ----------
+    def _show_previews(self) -> None:
+        shown = False
+        for lane in self.lanes:
+            try:
+                image = lane.preview.get_nowait()
+            except queue.Empty:
+                continue
+            cv2.imshow("LP" if len(self.lanes) == 1 else f"LP {lane.name}", image)
+            shown = True
+        if not shown:
+            time.sleep(0.01)
+        if cv2.waitKey(1) == 27:
+            self._stop.set()
+
+    def run(self) -> None:
+        threads = [
+            threading.Thread(target=self._capture_loop, name=f"lp-capture-{i}", daemon=True, args=(lane,))
+            for i, lane in enumerate(self.lanes)
+        ] + [
+            threading.Thread(target=self._detect_loop, name="lp-detect", daemon=True),
+            threading.Thread(target=self._stage_loop, name="lp-ocr", daemon=True,
+                             args=("ocr", self._plates, self.read_plate, self._reads)),
+            threading.Thread(target=self._stage_loop, name="lp-dispatch", daemon=True,
+                             args=("dispatch", self._reads, self.dispatch, None)),
+        ]
+        for t in threads:
+            t.start()
+        dispatcher = threads[-1]
+        started = last_report = time.monotonic()
+        _, cpu_at_report = process_usage()
+        try:
+            while dispatcher.is_alive():
+                if self.display:
+                    self._show_previews()
+                else:
+                    dispatcher.join(timeout=0.5)
+                if time.monotonic() - last_report >= STATS_EVERY_SEC:
+                    cpu_at_report = self.report(time.monotonic() - last_report, cpu_at_report)
+                    last_report = time.monotonic()
+        except KeyboardInterrupt:
+            print("[INFO] interrupted")
+        finally:
+            self._stop.set()
+            for t in threads:
+                t.join(timeout=5.0)
+            for lane in self.lanes:
+                lane.cap.release()
+            self.spool.stop()
+            if self.display:
+                cv2.destroyAllWindows()
+            self.report(time.monotonic() - last_report, cpu_at_report)
+            print(f"[DONE] {self.sent} scan(s) in {time.monotonic() - started:.1f}s")
+
+    def report(self, elapsed: float, cpu_before: float) -> float:
+        """
+        One [ENGINE] line (per-stage rate and mean time, frames sampled for
+        detection out of those read, YOLO batch size, cascade hits, OCR
+        reads vs reused texts, plates cooling down and the slowest cooldown
+        lookup, drops, queue depths, lag, memory and CPU) plus a [LANE] line per lane
+        when there are several. Returns the CPU seconds used so far.
+        """
+        elapsed = max(elapsed, 1e-9)
+        parts = []
+        for name, st in self.stats.items():
+            mean = statistics.fmean(st.window) * 1000.0 if st.window else 0.0
+            parts.append(f"{name}={len(st.window) / elapsed:.1f}fps/{mean:.0f}ms")
+            st.window.clear()
+        batch = statistics.fmean(self.batch_sizes) if self.batch_sizes else 0.0
+        self.batch_sizes = []
+        lag = sorted(self.lag)
+        self.lag = []
+        lag_txt = (f"lag p50={statistics.median(lag) * 1000:.0f}ms max={lag[-1] * 1000:.0f}ms"
+                   if lag else "lag -")
+        dropped = sum(lane.frames.dropped for lane in self.lanes)
+        queued = sum(lane.frames.qsize() for lane in self.lanes)
+        rss_mb, cpu = process_usage()
+        n = len(self.lanes)
+        frames = sum(lane.scheduler.frames for lane in self.lanes)
+        sampled = sum(lane.scheduler.sampled for lane in self.lanes)
+        reads = sum(lane.tracker.reads for lane in self.lanes)
+        reused = sum(lane.tracker.reused for lane in self.lanes)
+        cooling = sum(len(lane.cooldown) for lane in self.lanes)
+        lookup_us = max(lane.cooldown.stats()["max_lookup_us"] for lane in self.lanes)
+        cascade = ""
+        if self.detector.coarse is not None:
+            c = self.detector.stats()
+            cascade = f" cascade={c['fine_hits']}/{c['coarse_hits']}/{c['frames']}"
+        print(f"[ENGINE] {' '.join(parts)} sampled={sampled}/{frames} batch={batch:.1f}{cascade} ocr_reads={reads} ocr_reused={reused} "
+              f"cooldown={cooling} (max lookup {lookup_us:.0f}us) dropped={dropped}+{self._plates.dropped} "
+              f"queues={queued}/{self._plates.qsize()}/{self._reads.qsize()} {lag_txt} "
+              f"rss={rss_mb:.0f}MB ({rss_mb / n:.0f}MB/lane) cpu={100 * (cpu - cpu_before) / elapsed:.0f}%")
+        if n > 1:
+            for lane in self.lanes:
+                print(f"[LANE] {lane.name} source={lane.source} processed={lane.processed} "
+                      f"sent={lane.sent} dropped={lane.frames.dropped} ocr={lane.tracker.stats()} "
+                      f"sampling={lane.scheduler.stats()} cooldown={lane.cooldown.stats()}")
+        return cpu
@@ -0,0 +1,236 @@
+"""
+Store-and-forward outbox for recognizer scans.
+
+submit() only appends the scan to a local SQLite file; a background thread
+delivers it to the API. The capture loop never waits on the network, and an
+API or network outage delays scans instead of losing them.
+
+- fresh scans (younger than live_max_age) go to POST /scans/{entry|exit},
+  so the barrier still reacts to them
+- older ones are replayed oldest-first through POST /scans/batch, which
+  records them with their captured_at but never moves a barrier
+- delivery failures back off exponentially (with jitter) up to backoff_max
+- every scan carries its own Idempotency-Key (the header on a live post, the
+  event's idempotency_key in a batch), so resending one whose response was
+  lost, live or batched, gets the API's first decision back instead of a
+  second one
+"""
+import json
+import random
+import sqlite3
+import threading
+import time
+import uuid
+
+import requests
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id        INTEGER PRIMARY KEY AUTOINCREMENT,
+    direction TEXT    NOT NULL,
+    idem_key  TEXT    NOT NULL,
+    payload   TEXT    NOT NULL,
+    queued_at REAL    NOT NULL,
+    attempts  INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+RETRYABLE_STATUS = {408, 429}
+
+
+class RetryLater(Exception):
+    pass
+
+
+class ScanSpool:
+    def __init__(
+        self,
+        api_base: str,
+        path: str,
+        *,
+        timeout: float = 5.0,
+        live_max_age: float = 30.0,
+        batch_size: int = 500,
+        backoff_min: float = 1.0,
+        backoff_max: float = 60.0,
+        on_response=None,
+    ):
+        self.api_base = api_base.rstrip("/")
+        self.path = path
+        self.timeout = timeout
+        self.live_max_age = live_max_age
+        self.batch_size = batch_size
+        self.backoff_min = backoff_min
+        self.backoff_max = backoff_max
+        self.on_response = on_response  # fn(direction, payload, response_json) for live sends
+
+        self.http = requests.Session()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(SCHEMA)
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.sent = 0
+        self.replayed = 0
+        self.rejected = 0
+        self.failures = 0
+
+    # ---------- capture side ----------
+    def submit(self, direction: str, payload: dict) -> None:
+        """Queue one scan ("entry" | "exit"); returns after a local insert."""
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO outbox (direction, idem_key, payload, queued_at) VALUES (?, ?, ?, ?)",
+                (direction, uuid.uuid4().hex, json.dumps(payload), time.time()),
+            )
+        self._wake.set()
+
+    def pending(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    # ---------- lifecycle ----------
+    def start(self) -> "ScanSpool":
+        n = self.pending()
+        if n:
+            print(f"[SPOOL] {n} scan(s) left from a previous run, delivering in background")
+        self._thread = threading.Thread(target=self._run, name="scan-spool", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Give the sender up to `timeout` seconds to empty the outbox, then stop it.
+        Undelivered scans stay on disk for the next start().
+        """
+        deadline = time.monotonic() + timeout
+        while self._thread is not None and self._thread.is_alive() and time.monotonic() < deadline:
+            if not self.pending():
+                break
+            self._wake.set()
+            time.sleep(0.1)
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(max(0.5, deadline - time.monotonic()))
+        n = self.pending()
+        if n:
+            print(f"[SPOOL] stopping with {n} scan(s) still queued in {self.path}")
+        self.http.close()
+
+    # ---------- sender side ----------
+    def _run(self) -> None:
+        backoff = 0.0
+        while not self._stop.is_set():
+            if backoff:
+                self._stop.wait(backoff * random.uniform(0.8, 1.2))
+            else:
+                self._wake.wait(1.0)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                progressed = self._drain_once()
+            except (requests.RequestException, RetryLater) as e:
+                self.failures += 1
+                backoff = min(self.backoff_max, max(self.backoff_min, backoff * 2))
+                print(f"[SPOOL] delivery failed ({e}); {self.pending()} queued, retry in ~{backoff:.1f}s")
+                continue
+            backoff = 0.0
+            if progressed:
+                self._wake.set()  # keep going until the outbox is empty
+
+    def _rows(self):
+        with self._lock:
+            return self._db.execute(
+                "SELECT id, direction, idem_key, payload, queued_at FROM outbox ORDER BY id LIMIT ?",
+                (self.batch_size,),
+            ).fetchall()
+
+    def _delete(self, ids) -> None:
+        with self._lock:
+            self._db.executemany("DELETE FROM outbox WHERE id = ?", [(i,) for i in ids])
+
+    def _bump_attempts(self, ids) -> None:
+        with self._lock:
+            self._db.executemany("UPDATE outbox SET attempts = attempts + 1 WHERE id = ?", [(i,) for i in ids])
+
+    def _drain_once(self) -> bool:
+        rows = self._rows()
+        if not rows:
+            return False
+        now = time.time()
+        if now - rows[0][4] <= self.live_max_age:
+            self._send_live(rows[0])
+            return True
+        # ids grow with time, so the stale scans are a prefix of the outbox
+        stale = [r for r in rows if now - r[4] > self.live_max_age]
+        self._send_batch(stale)
+        return True
+
+    def _send_live(self, row) -> None:
+        id_, direction, idem_key, payload, _ = row
+        payload = json.loads(payload)
+        url = f"{self.api_base}/scans/{direction}"
+        try:
+            r = self.http.post(url, json=payload, headers={"Idempotency-Key": idem_key}, timeout=self.timeout)
+        except requests.RequestException:
+            self._bump_attempts([id_])
+            raise
+        if r.status_code >= 500 or r.status_code in RETRYABLE_STATUS:
+            self._bump_attempts([id_])
+            raise RetryLater(f"{url} -> {r.status_code}")
+
+        print(f"[API] {url} {r.status_code}: {r.text[:200]}")
+        # 4xx is a final answer (blacklisted, invalid plate, ...): don't resend it
+        if r.ok:
+            self.sent += 1
+        else:
+            self.rejected += 1
+        self._delete([id_])
+        if self.on_response is not None and r.ok:
+            try:
+                body = r.json()
+            except ValueError:
+                body = None
+            self.on_response(direction, payload, body)
+
+    def _send_batch(self, rows) -> None:
+        url = f"{self.api_base}/scans/batch"
+        # the same key as the live post, so a scan whose live response was lost isn't decided twice
+        events = [{"direction": d, "idempotency_key": k, **json.loads(p)} for _, d, k, p, _ in rows]
+        try:
+            r = self.http.post(url, json={"events": events}, timeout=max(self.timeout, 30.0))
+        except requests.RequestException:
+            self._bump_attempts([r_[0] for r_ in rows])
+            raise
+        if r.status_code >= 500 or r.status_code in RETRYABLE_STATUS:
+            self._bump_attempts([r_[0] for r_ in rows])
+            raise RetryLater(f"{url} -> {r.status_code}")
+        if r.status_code == 422 and len(rows) > 1:
+            # one malformed event fails the whole request: isolate it
+            for row in rows:
+                self._send_batch([row])
+            return
+        if not r.ok:
+            print(f"[SPOOL] dropping {len(rows)} scan(s) rejected by {url} {r.status_code}: {r.text[:200]}")
+            self.rejected += len(rows)
+            self._delete([r_[0] for r_ in rows])
+            return
+
+        done, retry = [], []
+        for res in r.json()["results"]:
+            row_id = rows[res["index"]][0]
+            (retry if res["status_code"] >= 500 else done).append(row_id)
+            if 400 <= res["status_code"] < 500:
+                self.rejected += 1
+        self._delete(done)
+        self.replayed += len(done)
+        print(f"[SPOOL] replayed {len(done)} scan(s) via {url}")
+        if retry:
+            self._bump_attempts(retry)
+            raise RetryLater(f"{len(retry)} scan(s) failed server-side")
@@ -0,0 +1,77 @@
+# ops/tests/test_motion_gate.py
+import numpy as np
+
+from motion_gate import FrameScheduler, MotionGate
+
+FRAME = np.zeros((90, 160, 3), dtype=np.uint8)
+
+
+class ScriptedGate:
+    """Motion score per frame from a list of booleans."""
+
+    def __init__(self, moving):
+        self.moving = iter(moving)
+
+    def score(self, image) -> float:
+        return 1.0 if next(self.moving) else 0.0
+
+
+def _sampled(scheduler: FrameScheduler, frames: int, fps: float = 10.0) -> list[int]:
+    return [i for i in range(frames) if scheduler.admit(FRAME, i / fps)]
+
+
+def test_without_a_gate_every_nth_frame_is_sampled():
+    scheduler = FrameScheduler(None, fixed_skip=3)
+    assert _sampled(scheduler, 10) == [2, 5, 8]
+
+
+def test_motion_samples_at_skip_min():
+    scheduler = FrameScheduler(ScriptedGate([True] * 10), fixed_skip=2, skip_min=2)
+    assert _sampled(scheduler, 10) == [1, 3, 5, 7, 9]
+
+
+def test_still_scene_backs_off_then_idles():
+    # one moving frame, then stillness: intervals 1, 2, 4, 8 (skip_max) until hold_sec, then keep-alive only
+    scheduler = FrameScheduler(ScriptedGate([True] + [False] * 199), fixed_skip=2, skip_min=1, skip_max=8,
+                               hold_sec=3.0, idle_sec=5.0)
+    sampled = _sampled(scheduler, 200)
+    assert sampled[:6] == [0, 1, 3, 7, 15, 23]
+    assert sampled[6:] == [73, 123, 173]  # idle from t=3.1s: one frame per idle_sec
+    assert scheduler.stats()["interval"] == 8
+
+
+def test_motion_resets_the_back_off():
+    moving = [True] + [False] * 20 + [True] * 3
+    scheduler = FrameScheduler(ScriptedGate(moving), fixed_skip=2, skip_min=1, skip_max=8, hold_sec=10.0)
+    assert _sampled(scheduler, len(moving))[-3:] == [21, 22, 23]
+
+
+def test_idle_sec_zero_samples_nothing_while_idle():
+    scheduler = FrameScheduler(ScriptedGate([True] + [False] * 99), fixed_skip=2, hold_sec=1.0, idle_sec=0)
+    assert max(_sampled(scheduler, 100)) <= 10
+
+
+def test_motion_gate_sees_change_and_absorbs_a_stopped_object():
+    gate = MotionGate(width=160, diff=25, alpha=0.2)
+    empty = np.full((90, 160, 3), 80, dtype=np.uint8)
+    car = empty.copy()
+    car[30:70, 40:120] = 200
+    assert gate.score(empty) == 1.0  # first frame
+    assert gate.score(empty) == 0.0
+    assert gate.score(car) > 0.1
+    scores = [gate.score(car) for _ in range(30)]
+    assert scores[-1] == 0.0  # the parked car became background
+
+
+def test_tracking_holds_skip_min_on_a_still_scene():
+    # a car stopped at the barrier: no motion after frame 0, but its plate is unsent until frame 60
+    scheduler = FrameScheduler(ScriptedGate([True] + [False] * 99), fixed_skip=2, skip_min=2, skip_max=8,
+                               hold_sec=1.0, idle_sec=10.0)
+    sampled = []
+    for i in range(100):
+        scheduler.tracking = i < 60
+        if scheduler.admit(FRAME, i / 10.0):
+            sampled.append(i)
+    assert sampled[:30] == list(range(1, 60, 2))
+    assert scheduler.stats()["tracked"] == 59
+    assert sampled[30:] == [61, 65]  # sent: back off from t=5.9s, idle after hold_sec
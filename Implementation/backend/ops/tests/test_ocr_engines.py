@@ -0,0 +1,31 @@
+# ops/tests/test_ocr_engines.py
+import sys
+
+import pytest
+
+from ocr_engines import ENGINES, EasyOcrEngine, OcrEngine, RapidOcrEngine, engine_class, parse_spec
+
+
+def test_parse_spec_keeps_values_as_strings():
+    assert parse_spec("easyocr") == ("easyocr", {})
+    assert parse_spec(" EasyOCR : detect=0, allowlist=0123 ,") == ("easyocr", {"detect": "0", "allowlist": "0123"})
+    with pytest.raises(ValueError, match="not key=value"):
+        parse_spec("easyocr:detect")
+
+
+def test_engine_class_checks_name_and_options_without_loading():
+    assert engine_class("easyocr:detect=0,decoder=beamsearch") == (
+        EasyOcrEngine, {"detect": "0", "decoder": "beamsearch"})
+    assert engine_class("rapidocr:allowlist=plate")[0] is RapidOcrEngine
+    assert set(ENGINES) == {"easyocr", "rapidocr", "tesseract"}
+    with pytest.raises(ValueError, match="Unknown OCR engine"):
+        engine_class("paddle")
+    with pytest.raises(ValueError, match="tesseract:decoder=greedy"):
+        engine_class("tesseract:decoder=greedy")
+    assert "easyocr" not in sys.modules and "rapidocr_onnxruntime" not in sys.modules
+
+
+def test_allowlist_filter():
+    engine = OcrEngine(allowlist="plate")
+    assert engine._filter("cb-12 34at!") == "CB1234AT"
+    assert OcrEngine()._filter("cb-12") == "cb-12"
@@ -0,0 +1,66 @@
+# ops/tests/test_plate_cascade.py
+import numpy as np
+import pytest
+
+from plate_cascade import CascadeDetector, parse_roi, roi_pixels
+
+FRAME = np.zeros((1000, 2000, 3), dtype=np.uint8)
+
+
+class Recorder:
+    """Stand-in detector: returns `boxes` for every image and remembers the image shapes it was given."""
+
+    def __init__(self, boxes):
+        self.boxes = np.asarray(boxes, dtype=int).reshape(-1, 4)
+        self.shapes = []
+
+    def __call__(self, images):
+        self.shapes += [img.shape[:2] for img in images]
+        return [self.boxes for _ in images]
+
+
+def test_parse_roi():
+    assert parse_roi("") is None
+    assert parse_roi(None) is None
+    assert parse_roi("0.25, 0.4, 0.75, 1") == (0.25, 0.4, 0.75, 1.0)
+    assert parse_roi([10, 20, 30, 40]) == (10, 20, 30, 40)
+    for bad in ("1,2,3", "0.5,0,0.2,1", "-1,0,5,5"):
+        with pytest.raises(ValueError):
+            parse_roi(bad)
+
+
+def test_roi_pixels_takes_fractions_or_pixels():
+    assert roi_pixels(None, 2000, 1000) == (0, 0, 2000, 1000)
+    assert roi_pixels((0.25, 0.5, 0.75, 1.0), 2000, 1000) == (500, 500, 1500, 1000)
+    assert roi_pixels((100, 200, 5000, 900), 2000, 1000) == (100, 200, 2000, 900)  # clipped to the frame
+    with pytest.raises(ValueError):
+        roi_pixels((3000, 0, 4000, 10), 2000, 1000)
+
+
+def test_single_pass_detects_the_roi_and_maps_boxes_back():
+    fine = Recorder([[10, 20, 110, 50]])
+    detector = CascadeDetector(fine)
+    boxes = detector([FRAME], [(500, 400, 1500, 1000)])[0]
+    assert fine.shapes == [(600, 1000)]
+    assert boxes.tolist() == [[510, 420, 610, 450]]
+
+
+def test_cascade_refines_the_largest_coarse_box_at_full_resolution():
+    # the coarse pass sees the 1000x600 ROI at 320 px (scale 0.32); its largest box maps to
+    # frame (600, 500)-(700, 525), and the fine window pads that by pad * box size, at least 16 px
+    coarse = Recorder([[0, 0, 8, 4], [32, 32, 64, 40]])
+    fine = Recorder([[40, 10, 140, 35]])
+    detector = CascadeDetector(fine, coarse, coarse_size=320, pad=0.5)
+    boxes = detector([FRAME], [(500, 400, 1500, 1000)])[0]
+    assert coarse.shapes == [(192, 320)]
+    assert fine.shapes == [(57, 200)]  # window (550, 484)-(750, 541)
+    assert boxes.tolist() == [[590, 494, 690, 519]]
+    assert detector.stats() == {"frames": 1, "coarse_hits": 1, "fine_hits": 1}
+
+
+def test_cascade_skips_the_fine_pass_when_the_coarse_pass_finds_nothing():
+    fine = Recorder([[0, 0, 10, 10]])
+    detector = CascadeDetector(fine, Recorder([]))
+    assert len(detector([FRAME], [None])[0]) == 0
+    assert fine.shapes == []
+    assert detector.stats()["coarse_hits"] == 0
@@ -0,0 +1,97 @@
+# ops/tests/test_plate_dedup.py
+import random
+
+import pytest
+
+from plate_dedup import CooldownIndex, _bigrams, min_shared
+from plate_vote import PlateSimilarity, pair_ratio
+
+LETTERS = "ABCEHKMOPTXY"
+CONFUSIONS = {"B": "8", "8": "B", "T": "7", "7": "T", "O": "0", "0": "O", "S": "5", "5": "S"}
+
+
+def _plate(rng: random.Random) -> str:
+    return ("".join(rng.choices(LETTERS, k=rng.choice((1, 2)))) + "".join(rng.choices("0123456789", k=4))
+            + "".join(rng.choices(LETTERS, k=2)))
+
+
+def _misread(plate: str, rng: random.Random) -> str:
+    """An OCR reading of `plate`: a confusion, a dropped or an extra character."""
+    chars = list(plate)
+    i = rng.randrange(len(chars))
+    op = rng.choice(("swap", "drop", "add", "same"))
+    if op == "swap":
+        chars[i] = CONFUSIONS.get(chars[i], rng.choice(LETTERS))
+    elif op == "drop" and len(chars) > 2:
+        del chars[i]
+    elif op == "add":
+        chars.insert(i, rng.choice(LETTERS + "0123456789"))
+    return "".join(chars)
+
+
+def _linear_match(sent: dict, text: str, now: float, ttl: float, threshold: float) -> bool:
+    # the scan the index replaced: every plate still cooling down, compared one by one
+    return any(now - at < ttl and pair_ratio(key, text) >= threshold
+               for key, at in sent.items())
+
+
+def test_min_shared_never_exceeds_the_bigrams_a_match_shares():
+    rng = random.Random(1)
+    for threshold in (0.7, 0.8, 0.88, 0.95):
+        for _ in range(2000):
+            text = _plate(rng)
+            key = _misread(_misread(text, rng), rng)
+            if pair_ratio(key, text) >= threshold:
+                assert len(_bigrams(key) & _bigrams(text)) >= min_shared(text, threshold), (key, text)
+
+
+def test_index_agrees_with_linear_scan():
+    rng = random.Random(2)
+    for threshold in (0.6, 0.88):
+        index = CooldownIndex(ttl=10.0, threshold=threshold)
+        sent: dict[str, float] = {}
+        plates = [_plate(rng) for _ in range(60)]
+        now = 0.0
+        for _ in range(3000):
+            now += rng.uniform(0.0, 0.5)
+            text = _misread(rng.choice(plates), rng)
+            expected = _linear_match(sent, text, now, 10.0, threshold)
+            assert (index.match(text, now) is not None) == expected, text
+            if not expected:
+                index.add(text, now)
+                sent[text] = now
+        assert index.stats()["compared"] < index.stats()["lookups"] * len(plates)
+
+
+def test_entries_expire_and_are_bounded():
+    index = CooldownIndex(ttl=10.0, threshold=0.85, max_entries=2)
+    index.add("CB1234AT", 0.0)
+    assert index.match("C81234AT", 5.0) == "CB1234AT"
+    assert index.match("C81234AT", 10.0) is None  # cooled down
+    assert len(index) == 0
+
+    for i, plate in enumerate(("CB1111AA", "CB2222BB", "CB3333CC")):
+        index.add(plate, 20.0 + i)
+    assert len(index) == 2
+    assert index.match("CB1111AA", 23.0) is None  # oldest went first
+    assert index.stats()["evicted"] == 2
+
+
+def test_add_restarts_the_cooldown():
+    index = CooldownIndex(ttl=10.0, threshold=0.88)
+    index.add("CB1234AT", 0.0)
+    index.add("CB1234AT", 8.0)
+    assert index.match("CB1234AT", 15.0) == "CB1234AT"
+    assert len(index) == 1
+
+
+@pytest.mark.parametrize("sent, read, threshold, same", [
+    ("CB1234AT", "C81234AT", 0.875, True),   # one misread character: exactly 14/16
+    ("CB1234AT", "C81234AT", 0.88, False),
+    ("000C077T", "0A001C077T", 0.88, True),  # difflib's greedy match scores this 0.78
+])
+def test_cooldown_and_vote_agree_at_the_threshold(sent, read, threshold, same):
+    index = CooldownIndex(ttl=10.0, threshold=threshold)
+    index.add(sent, 0.0)
+    assert (index.match(read, 1.0) == sent) is same
+    assert PlateSimilarity(threshold).similar(sent, read) is same
@@ -0,0 +1,75 @@
+# ops/tests/test_plate_track.py
+import cv2
+import numpy as np
+
+from plate_track import PlateTracker, hamming, iou, phash
+
+
+def _crop(text: str = "CB1234AT", seed: int = 0, dx: int = 0) -> np.ndarray:
+    # a gray plate crop with sensor noise; dx shifts the text like box jitter does
+    rng = np.random.default_rng(seed)
+    img = np.full((40, 170), 210, dtype=np.uint8)
+    cv2.putText(img, text, (6 + dx, 31), cv2.FONT_HERSHEY_SIMPLEX, 1.0, 30, 2)
+    return np.clip(img + rng.normal(0, 3, img.shape), 0, 255).astype(np.uint8)
+
+
+def _tracker(**kw) -> PlateTracker:
+    options = {"iou_min": 0.5, "hash_max": 6, "confirm": 2, "refresh_sec": 3.0, "max_age": 1.0}
+    return PlateTracker(**{**options, **kw})
+
+
+BOX = (100, 100, 260, 140)
+
+
+def test_confirmed_track_reuses_its_read_for_the_same_crop():
+    tracker = _tracker()
+    for t in (0.0, 0.1):
+        track, cached = tracker.lookup(BOX, _crop(seed=int(t * 10)), t)
+        assert cached is None
+        tracker.observe(track, "CB1234AT", "CB1234AT", t)
+
+    # jittered box, sensor noise: same track, crop within hash_max -> no OCR
+    track2, cached = tracker.lookup((102, 101, 262, 141), _crop(seed=7, dx=2), 0.2)
+    assert track2 is track and cached == "CB1234AT"
+    assert tracker.stats()["reused"] == 1 and tracker.stats()["started"] == 1
+
+
+def test_unconfirmed_changed_or_stale_crops_go_to_ocr():
+    tracker = _tracker(max_age=10.0)
+    track, _ = tracker.lookup(BOX, _crop(), 0.0)
+    tracker.observe(track, "CB1234AT", "CB1234AT", 0.0)
+    assert tracker.lookup(BOX, _crop(), 0.1)[1] is None  # one read isn't confirmed yet
+    tracker.observe(track, "CB1234AT", "CB1234AT", 0.1)
+
+    assert tracker.lookup(BOX, _crop(), 0.2)[1] == "CB1234AT"
+    assert tracker.lookup(BOX, _crop("XK9071MP"), 0.3)[1] is None  # different crop
+    stale, cached = tracker.lookup(BOX, _crop(), 3.5)  # read older than refresh_sec
+    assert stale is track and cached is None
+
+
+def test_disagreeing_reads_reset_confirmation():
+    tracker = _tracker()
+    track, _ = tracker.lookup(BOX, _crop(), 0.0)
+    tracker.observe(track, "CB1234AT", "CB1234AT", 0.0)
+    tracker.observe(track, "C81234AT", "C81234AT", 0.1)
+    assert track.agree == 1
+    tracker.observe(track, "???", None, 0.2)
+    assert track.agree == 0
+
+
+def test_far_box_or_expired_track_starts_a_new_track():
+    tracker = _tracker()
+    first, _ = tracker.lookup(BOX, _crop(), 0.0)
+    other, _ = tracker.lookup((600, 100, 760, 140), _crop(), 0.1)
+    assert other is not first
+    again, _ = tracker.lookup(BOX, _crop(), 2.0)  # not seen for more than max_age
+    assert again is not first and again.id == 3
+
+
+def test_hash_and_iou_helpers():
+    a = _crop(seed=1)
+    assert hamming(phash(a), phash(_crop(seed=2, dx=1))) <= 6
+    assert hamming(phash(a), phash(_crop("XK9071MP"))) > 6
+    assert iou((0, 0, 10, 10), (0, 0, 10, 10)) == 1.0
+    assert iou((0, 0, 10, 10), (5, 0, 15, 10)) == 1 / 3
+    assert iou((0, 0, 10, 10), (20, 20, 30, 30)) == 0.0
@@ -0,0 +1,76 @@
+# ops/tests/test_plate_vote.py
+import random
+
+import numpy as np
+import pytest
+
+import plate_vote
+from plate_vote import PlateSimilarity, ratios
+
+
+def _lcs_ratio(a: str, b: str) -> float:
+    # reference: textbook LCS table, indel ratio 2*LCS / (len(a) + len(b))
+    if not a and not b:
+        return 1.0
+    table = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i, ca in enumerate(a):
+        for j, cb in enumerate(b):
+            table[i + 1][j + 1] = table[i][j] + 1 if ca == cb else max(table[i][j + 1], table[i + 1][j])
+    return 2.0 * table[-1][-1] / (len(a) + len(b))
+
+
+def _strings(rng: random.Random, n: int) -> list[str]:
+    return ["".join(rng.choices("AB8T70", k=rng.randint(0, 9))) for _ in range(n)]
+
+
+def test_numpy_kernel_matches_pure_python_lcs():
+    rng = random.Random(3)
+    a, b = _strings(rng, 500), _strings(rng, 500)
+    expected = [_lcs_ratio(x, y) for x, y in zip(a, b)]
+    np.testing.assert_allclose(ratios(a, b), expected)
+    assert len(ratios([], [])) == 0
+
+
+@pytest.mark.parametrize("kernel", ["default", "numpy"])
+def test_matrix_and_ratio_match_pure_python_lcs(monkeypatch, kernel):
+    if kernel == "numpy":
+        monkeypatch.setattr(plate_vote, "_fuzz", None)
+        monkeypatch.setattr(plate_vote, "_process", None)
+    rng = random.Random(4)
+    values = list(dict.fromkeys(s for s in _strings(rng, 40) if s))
+    sim = PlateSimilarity(0.88)
+
+    m = sim.matrix(values)
+    for i, a in enumerate(values):
+        for j, b in enumerate(values):
+            assert m[i, j] == pytest.approx(_lcs_ratio(a, b))
+    assert sim.ratio(values[0], values[1]) == pytest.approx(_lcs_ratio(values[0], values[1]))
+
+
+def test_sliding_window_is_served_from_the_memo():
+    sim = PlateSimilarity(0.88)
+    stream = ["CB1234AT", "C81234AT", "CB1234A7", "CB1284AT", "CB1Z34AT"]
+    window = 4
+    sim.matrix(stream[:window])
+    first = sim.stats()
+    assert first["hits"] == 0 and first["misses"] == window * (window - 1) // 2
+
+    sim.matrix(stream[1:window + 1])  # the window slides by one plate
+    assert sim.stats()["misses"] - first["misses"] == window - 1  # only the new plate's pairs
+    assert sim.stats()["hits"] == (window - 1) * (window - 2) // 2
+
+
+def test_memo_is_rebuilt_past_its_bound():
+    sim = PlateSimilarity(0.88, memo_max=3)
+    sim.matrix(["AAAA", "AAAB", "AABB"])
+    sim.matrix(["CCCC", "CCCD"])
+    assert sim.stats()["memo"] <= 3
+    assert sim.ratio("CCCC", "CCCD") == pytest.approx(0.75)
+
+
+def test_majority_vote_prefers_the_plate_most_reads_agree_with():
+    sim = PlateSimilarity(0.88)
+    assert sim.majority_vote([]) is None
+    assert sim.majority_vote(["CB1234AT"]) == "CB1234AT"
+    assert sim.majority_vote(["XX0000XX", "CB1234AT", "C81234AT", "CB1234AT"]) == "CB1234AT"
+    assert not sim.similar("", "CB1234AT")
@@ -0,0 +1,64 @@
+# ops/tests/test_recognizer_engine.py
+import queue
+
+import numpy as np
+import pytest
+
+import recognizer_engine
+from recognizer_engine import Detection, DropOldestQueue, Lane, normalize_ocr
+
+
+class OpenCapture:
+    """Just enough of cv2.VideoCapture for a Lane that is never read."""
+
+    def isOpened(self) -> bool:
+        return True
+
+    def get(self, prop) -> float:
+        return 10.0
+
+
+def test_full_queue_drops_its_oldest_item():
+    q = DropOldestQueue(2)
+    for item in (1, 2, 3):
+        q.put(item)
+    assert q.dropped == 1
+    assert [q.get_nowait(), q.get_nowait()] == [2, 3]
+    with pytest.raises(queue.Empty):
+        q.get(timeout=0.01)
+
+
+def test_keyed_queue_evicts_from_the_busiest_key():
+    q = DropOldestQueue(4, key=lambda item: item[0])
+    for item in (("a", 1), ("b", 1), ("a", 2), ("a", 3), ("b", 2)):
+        q.put(item)
+    # "a" held three of four items: its oldest went, "b" kept both
+    assert [q.get_nowait() for _ in range(4)] == [("b", 1), ("a", 2), ("a", 3), ("b", 2)]
+    assert q.dropped == 1
+
+
+def test_keyed_queue_ties_go_to_the_key_seen_first():
+    q = DropOldestQueue(2, key=lambda item: item[0])
+    for item in (("a", 1), ("b", 1), ("b", 2)):
+        q.put(item)
+    assert [q.get_nowait(), q.get_nowait()] == [("b", 1), ("b", 2)]
+
+
+def test_normalize_ocr_folds_plate_confusions():
+    assert normalize_ocr(" cb-1234 at ") == "C81234A7"
+    assert normalize_ocr(None) == ""
+
+
+def test_lane_holds_sampling_until_the_plate_in_view_is_sent():
+    lane = Lane("test", live=False, capture=OpenCapture(), regex="ANY")
+    plate, nothing = Detection(None, (0, 0, 200, 50), gray=np.zeros((50, 200), np.uint8)), Detection(None)
+
+    lane.watch(plate)
+    assert lane.scheduler.tracking
+    sent = [lane.update("CB1234AT") for _ in range(recognizer_engine.STABLE_FRAMES)]
+    assert sent[-1] == "CB1234AT"
+    lane.watch(plate)  # still in view, already sent
+    assert not lane.scheduler.tracking
+    lane.watch(nothing)  # gone; the next plate holds again
+    lane.watch(plate)
+    assert lane.scheduler.tracking
@@ -0,0 +1,45 @@
+# ops/tests/test_yolo_onnx.py
+import numpy as np
+
+from yolo_onnx import letterbox, postprocess, to_blob
+
+
+def test_letterbox_scales_the_long_side_and_pads_to_the_stride():
+    image = np.zeros((480, 640, 3), dtype=np.uint8)
+    padded, scale, pad = letterbox(image, 320, auto=True)
+    assert padded.shape == (256, 320, 3)  # 240 rows padded up to a multiple of 32
+    assert scale == 0.5 and pad == (0, 8)
+    assert padded[0, 0].tolist() == [114, 114, 114]
+
+    square, _, pad = letterbox(image, 320, auto=False)
+    assert square.shape == (320, 320, 3) and pad == (0, 40)
+
+
+def test_to_blob_is_rgb_nchw_in_unit_range():
+    image = np.zeros((2, 3, 3), dtype=np.uint8)
+    image[..., 0] = 255  # blue in BGR
+    blob = to_blob([image])
+    assert blob.shape == (1, 3, 2, 3) and blob.dtype == np.float32
+    assert blob[0, 2].max() == 1.0 and blob[0, 0].max() == 0.0
+
+
+def _pred(rows):
+    """(4 + 1 class, anchors) output from (cx, cy, w, h, score) rows."""
+    return np.asarray(rows, dtype=np.float32).T
+
+
+def test_postprocess_filters_suppresses_and_maps_to_the_image():
+    pred = _pred([
+        (100, 58, 40, 20, 0.9),
+        (102, 58, 40, 20, 0.8),   # overlaps the first: suppressed
+        (200, 108, 40, 20, 0.3),  # under the confidence threshold
+        (250, 158, 60, 20, 0.6),
+    ])
+    boxes = postprocess(pred, 0.5, 0.5, (0, 8), (480, 640))
+    assert boxes.tolist() == [[160, 80, 240, 120], [440, 280, 560, 320]]
+
+
+def test_postprocess_clips_to_the_image_and_handles_no_detections():
+    boxes = postprocess(_pred([(5, 5, 20, 20, 0.9)]), 0.5, 1.0, (0, 0), (100, 100))
+    assert boxes.tolist() == [[0, 0, 15, 15]]
+    assert postprocess(_pred([(5, 5, 20, 20, 0.1)]), 0.5, 1.0, (0, 0), (100, 100)).shape == (0, 4)
@@ -0,0 +1,222 @@
+"""
+ONNX Runtime backend for the plate detector: PyTorch is neither fast nor
+small on the gate boxes' CPUs. The .pt weights are exported once, then
+YOLO_WEIGHTS=/assets/best.onnx makes yolo_detector() use OnnxDetector, which
+returns what the ultralytics backend returns (res.boxes.xyxy as (k, 4) int
+arrays, best first) without importing torch or ultralytics.
+
+    python yolo_onnx.py --weights /assets/best.pt                     # -> /assets/best.onnx
+    python yolo_onnx.py --weights /assets/best.pt --int8 --calib /assets/entry_demo.mp4
+                                                                      # -> /assets/best.int8.onnx
+
+- the export has dynamic batch and input size, so the cascade's coarse and
+  fine passes (plate_cascade.py) and multi-lane batches all use one file
+- --int8 quantizes the weights and activations (QDQ, static) from
+  --calib frames: a video or a directory of images from the gate camera.
+  The head's box/score decoding stays float.
+  Without --calib only the weights are quantized (dynamic), which is
+  usually slower for a conv net; measure with bench_detector.py
+- pre/post-processing follows ultralytics: letterbox (long side to imgsz,
+  pad to a multiple of 32, gray 114), RGB 0..1, and confidence filter + NMS
+  on the (1, 4 + classes, anchors) output
+- export and quantization need ultralytics and onnx; inference needs only
+  onnxruntime (onnxruntime-openvino works too: YOLO_ORT_PROVIDERS)
+"""
+import argparse
+import os
+import re
+
+import cv2
+import numpy as np
+
+NMS_IOU = 0.7   # ultralytics' predict() default
+MAX_DET = 300
+
+
+def letterbox(image: np.ndarray, imgsz: int, auto: bool) -> tuple[np.ndarray, float, tuple[float, float]]:
+    """(padded image, scale, (pad_x, pad_y)) the way ultralytics' LetterBox does it."""
+    h, w = image.shape[:2]
+    r = min(imgsz / h, imgsz / w)
+    new_w, new_h = int(round(w * r)), int(round(h * r))
+    dw, dh = imgsz - new_w, imgsz - new_h
+    if auto:  # rectangular input: only pad up to the stride
+        dw, dh = dw % 32, dh % 32
+    dw, dh = dw / 2, dh / 2
+    if (new_w, new_h) != (w, h):
+        image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
+    left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
+    image = cv2.copyMakeBorder(image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(114, 114, 114))
+    return image, r, (left, top)
+
+
+def to_blob(images: list[np.ndarray]) -> np.ndarray:
+    """BGR HWC uint8 images of one shape -> RGB NCHW float32 in 0..1."""
+    batch = np.stack(images)[..., ::-1].transpose(0, 3, 1, 2)
+    return np.ascontiguousarray(batch, dtype=np.float32) / 255.0
+
+
+def postprocess(pred: np.ndarray, conf: float, scale: float, pad, shape) -> np.ndarray:
+    """One image's (4 + classes, anchors) output -> (k, 4) int xyxy boxes in image coordinates, best first."""
+    pred = pred.T
+    scores = pred[:, 4:].max(axis=1)
+    keep = scores > conf
+    if not keep.any():
+        return np.zeros((0, 4), dtype=int)
+    pred, scores = pred[keep], scores[keep]
+    classes = pred[:, 4:].argmax(axis=1)
+    cx, cy, w, h = pred[:, 0], pred[:, 1], pred[:, 2], pred[:, 3]
+    xywh = np.stack([cx - w / 2, cy - h / 2, w, h], axis=1)
+    # per-class NMS via an offset per class, as ultralytics does
+    shifted = np.hstack([xywh[:, :2] + classes[:, None] * 7680.0, xywh[:, 2:]])
+    idx = cv2.dnn.NMSBoxes(shifted.tolist(), scores.tolist(), conf, NMS_IOU)
+    idx = np.asarray(idx, dtype=int).reshape(-1)[:MAX_DET]
+    boxes = np.hstack([xywh[idx, :2], xywh[idx, :2] + xywh[idx, 2:]])
+    boxes = (boxes - [pad[0], pad[1], pad[0], pad[1]]) / scale
+    boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, shape[1])
+    boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, shape[0])
+    return boxes.astype(int)
+
+
+class OnnxDetector:
+    """detector(images) -> one (k, 4) int array of xyxy boxes per image; `model` is the shared session."""
+
+    def __init__(self, path: str, *, conf: float, imgsz: int | None = None, providers=("CPUExecutionProvider",),
+                 threads: int = 0, model=None):
+        if model is None:
+            import onnxruntime as ort
+
+            options = ort.SessionOptions()
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            if threads > 0:
+                options.intra_op_num_threads = threads
+            model = ort.InferenceSession(path, options, providers=list(providers))
+            print(f"[INIT] Loaded ONNX detector: {path} ({', '.join(model.get_providers())})")
+        self.model = model
+        self.conf = conf
+        inp = model.get_inputs()[0]
+        self.input_name = inp.name
+        batch, _, height, width = inp.shape
+        self.static = isinstance(height, int) and isinstance(width, int)
+        self.batched = not isinstance(batch, int)
+        self.imgsz = max(height, width) if self.static else (imgsz or 640)
+
+    def __call__(self, images: list[np.ndarray]) -> list[np.ndarray]:
+        prepared = [letterbox(img, self.imgsz, auto=not self.static) for img in images]
+        out: list[np.ndarray | None] = [None] * len(images)
+        # one run per input shape (one run per image if the export has a fixed batch size)
+        groups: dict[tuple, list[int]] = {}
+        for i, (padded, _, _) in enumerate(prepared):
+            groups.setdefault(padded.shape if self.batched else (i,), []).append(i)
+        for members in groups.values():
+            pred = self.model.run(None, {self.input_name: to_blob([prepared[i][0] for i in members])})[0]
+            for row, i in enumerate(members):
+                _, scale, pad = prepared[i]
+                out[i] = postprocess(pred[row], self.conf, scale, pad, images[i].shape)
+        return out
+
+
+# -------------------- EXPORT --------------------
+def calibration_frames(source: str, count: int, imgsz: int) -> list[np.ndarray]:
+    """Up to `count` letterboxed frames, spread over a video or taken from an image directory."""
+    if os.path.isdir(source):
+        names = sorted(n for n in os.listdir(source) if n.lower().endswith((".jpg", ".jpeg", ".png")))
+        images = [cv2.imread(os.path.join(source, n)) for n in names[:: max(1, len(names) // count)][:count]]
+    else:
+        cap = cv2.VideoCapture(source)
+        if not cap.isOpened():
+            raise RuntimeError(f"Cannot open calibration source: {source}")
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or count
+        images = []
+        for idx in np.linspace(0, total - 1, count).astype(int):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, int(idx))
+            ok, image = cap.read()
+            if ok:
+                images.append(image)
+        cap.release()
+    images = [img for img in images if img is not None]
+    if not images:
+        raise RuntimeError(f"No calibration frames in {source}")
+    return [letterbox(img, imgsz, auto=False)[0] for img in images]
+
+
+def export(weights: str, out: str | None = None, *, imgsz: int = 640) -> str:
+    from ultralytics import YOLO
+
+    path = YOLO(weights).export(format="onnx", imgsz=imgsz, dynamic=True, simplify=True)
+    if out and os.path.abspath(out) != os.path.abspath(path):
+        os.replace(path, out)
+        path = out
+    print(f"[EXPORT] {weights} -> {path}")
+    return path
+
+
+def head_decode_nodes(path: str) -> list[str]:
+    """
+    The detect head's box/score decoding (the last module minus its conv branches). It must
+    stay float: boxes (0..imgsz) and scores (0..1) end up in one tensor, and one INT8 scale for both
+    rounds every score to zero.
+    """
+    import onnx
+
+    graph = onnx.load(path).graph
+    output = next(n for n in graph.node if graph.output[0].name in n.output)
+    head = re.match(r"/model\.\d+/", output.name).group(0)  # e.g. "/model.22/"
+    branches = re.compile(re.escape(head) + r"cv[23]\.")  # the box and class conv branches quantize fine
+    return [n.name for n in graph.node if n.name.startswith(head) and not branches.match(n.name)]
+
+
+def quantize(src: str, out: str, *, calib: str | None = None, calib_frames: int = 64, imgsz: int = 640) -> str:
+    from onnxruntime.quantization import (CalibrationDataReader, QuantFormat, QuantType, quantize_dynamic,
+                                          quantize_static)
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    prepared = out + ".prep.onnx"
+    quant_pre_process(src, prepared, skip_symbolic_shape=True)
+    exclude = head_decode_nodes(prepared)
+    try:
+        if calib is None:
+            quantize_dynamic(prepared, out, weight_type=QuantType.QUInt8, nodes_to_exclude=exclude)
+            print(f"[EXPORT] {src} -> {out} (INT8 weights, dynamic; pass --calib for static)")
+            return out
+
+        class Frames(CalibrationDataReader):
+            def __init__(self, name, frames):
+                self._items = iter([{name: to_blob([f])} for f in frames])
+
+            def get_next(self):
+                return next(self._items, None)
+
+        import onnxruntime as ort
+
+        name = ort.InferenceSession(src, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+        frames = calibration_frames(calib, calib_frames, imgsz)
+        quantize_static(prepared, out, Frames(name, frames), quant_format=QuantFormat.QDQ,
+                        activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8, per_channel=True,
+                        nodes_to_exclude=exclude)
+        print(f"[EXPORT] {src} -> {out} (INT8 static, {len(frames)} calibration frames from {calib})")
+        return out
+    finally:
+        if os.path.exists(prepared):
+            os.remove(prepared)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="One-time export of the YOLO weights to ONNX (optionally INT8)")
+    parser.add_argument("--weights", required=True, help="ultralytics .pt weights, e.g. /assets/best.pt")
+    parser.add_argument("--out", help="output .onnx (default: next to the weights)")
+    parser.add_argument("--imgsz", type=int, default=640, help="training input size (the export is dynamic)")
+    parser.add_argument("--int8", action="store_true", help="also write an INT8-quantized model")
+    parser.add_argument("--calib", help="video or image directory from the gate camera, for static INT8")
+    parser.add_argument("--calib-frames", type=int, default=64)
+    args = parser.parse_args()
+
+    out = args.out or os.path.splitext(args.weights)[0] + ".onnx"
+    path = export(args.weights, out, imgsz=args.imgsz)
+    if args.int8:
+        quantize(path, os.path.splitext(path)[0] + ".int8.onnx", calib=args.calib,
+                 calib_frames=args.calib_frames, imgsz=args.imgsz)
+
+
+if __name__ == "__main__":
+    main()
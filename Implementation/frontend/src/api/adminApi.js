@@ -65,11 +65,11 @@ export const updateAdmin = (id, payload) =>
 /*                          VEHICLE / ACCESS-LIST API                          */
 /* -------------------------------------------------------------------------- */
 
-export const fetchVehicles = ({ q = "", filter = "all", page = 1, pageSize = 20 }) => {
+export const fetchVehicles = ({ q = "", filter = "all", pageSize = 20 }) => {
   const params = new URLSearchParams();
   if (q) params.set("q", q);
-  params.set("page", String(page));
-  params.set("page_size", String(pageSize));
+  params.set("limit", String(pageSize));
+  params.set("count", "exact");
 
   if (filter !== "all") params.set("filter", filter);
 
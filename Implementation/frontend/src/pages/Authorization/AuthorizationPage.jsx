@@ -37,7 +37,7 @@ export default function AuthorizationPage() {
   async function load() {
     setLoading(true);
     try {
-      const data = await fetchVehicles({ q, filter, page: 1, pageSize: 50 });
+      const data = await fetchVehicles({ q, filter, pageSize: 50 });
       const items = Array.isArray(data) ? data : data.items ?? [];
       const normalized = items.map((v) => ({
         ...v,